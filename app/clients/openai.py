@@ -1,20 +1,191 @@
 from __future__ import annotations
 
-import httpx
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
 import orjson
 
-from app.config import OPENAI_API_KEY, OPENAI_MODEL
+from app.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_BREAKER_FAILURES,
+    OPENAI_BREAKER_RESET_S,
+    OPENAI_HEDGE_PERCENTILE,
+    OPENAI_MAX_RETRIES,
+    OPENAI_MODEL,
+    OPENAI_RETRY_BASE_S,
+    OPENAI_RETRY_CAP_S,
+    OPENAI_TIMEOUT_S,
+    OPENAI_TOTAL_BUDGET_S,
+    OPENAI_VISION_MODEL,
+)
+from app.core.deadline import DeadlineExceeded
+from app.core.deadline import remaining as deadline_remaining
+from app.core.metrics import OPENAI_ERRORS, OPENAI_SECONDS
+from app.core.request_stats import phase
+from app.core.resilience import OPEN, CircuitBreaker, LatencyWindow, backoff_delay
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class OpenAIUnavailable(RuntimeError):
+    """Raised without any network I/O while the circuit breaker is open."""
+
+
+class OpenAIHTTPError(RuntimeError):
+    def __init__(self, status_code: int, body: str, retry_after: float | None = None) -> None:
+        super().__init__(f"OpenAI error {status_code}: {body}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+breaker = CircuitBreaker(failure_threshold=OPENAI_BREAKER_FAILURES, reset_timeout=OPENAI_BREAKER_RESET_S)
+latency = LatencyWindow()
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
 
 
 def _safe_json(obj) -> str:
     return orjson.dumps(obj).decode("utf-8")
 
 
+def openai_available() -> bool:
+    """True when an OpenAI call may be attempted (key configured and breaker not open)."""
+    return bool(OPENAI_API_KEY) and breaker.state != OPEN
+
+
+def _get_client() -> httpx.AsyncClient:
+    # One pooled client per event loop; keeps TLS connections warm between calls.
+    # httpx is imported on first use so it stays out of the startup import graph.
+    import httpx
+
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(timeout=OPENAI_TIMEOUT_S)
+        _client_loop = loop
+    return _client
+
+
+async def openai_ping(timeout: float) -> int:
+    """Open this loop's pooled connection with a cheap authenticated GET; returns the HTTP status.
+
+    Not counted against the breaker: it is a readiness probe, not a call a turn depends on.
+    """
+    resp = await _get_client().get(
+        f"{OPENAI_BASE_URL}/models", headers={"Authorization": f"Bearer {OPENAI_API_KEY}"}, timeout=timeout
+    )
+    return resp.status_code
+
+
+async def aclose_openai() -> None:
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    import httpx
+
+    if isinstance(exc, OpenAIHTTPError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return isinstance(exc, (httpx.TimeoutException, httpx.TransportError))
+
+
+def _retry_after_seconds(resp: httpx.Response) -> float | None:
+    raw = resp.headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return None
+
+
+def _error_kind(exc: BaseException) -> str:
+    import httpx
+
+    if isinstance(exc, OpenAIHTTPError):
+        if exc.status_code == 429:
+            return "http_429"
+        return "http_5xx" if exc.status_code >= 500 else "http_4xx"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, httpx.TransportError):
+        return "transport"
+    return "other"
+
+
+async def _post_once(payload: dict, timeout: float) -> str:
+    started = time.perf_counter()
+    try:
+        resp = await _get_client().post(
+            f"{OPENAI_BASE_URL}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            content=_safe_json(payload),
+            timeout=timeout,
+        )
+        if resp.status_code >= 400:
+            raise OpenAIHTTPError(resp.status_code, resp.text, _retry_after_seconds(resp))
+        data = resp.json()
+    except asyncio.CancelledError:
+        # Losing side of a hedge; not an error.
+        OPENAI_SECONDS.observe(time.perf_counter() - started, "cancelled")
+        raise
+    except Exception as exc:
+        OPENAI_SECONDS.observe(time.perf_counter() - started, "error")
+        OPENAI_ERRORS.inc(_error_kind(exc))
+        raise
+    elapsed = time.perf_counter() - started
+    OPENAI_SECONDS.observe(elapsed, "ok")
+    latency.add(elapsed)
+    return ((data.get("choices") or [{}])[0].get("message") or {}).get("content") or ""
+
+
+async def _post_hedged(payload: dict, timeout: float) -> str:
+    threshold = latency.percentile(OPENAI_HEDGE_PERCENTILE) if OPENAI_HEDGE_PERCENTILE > 0 else None
+    if threshold is None or threshold >= timeout:
+        return await _post_once(payload, timeout)
+
+    first = asyncio.ensure_future(_post_once(payload, timeout))
+    pending: set[asyncio.Future[str]] = {first}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=threshold)
+        if done:
+            return first.result()
+
+        # Slow tail: race a second identical request and take whichever succeeds first.
+        pending.add(asyncio.ensure_future(_post_once(payload, max(0.1, timeout - threshold))))
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                exc = task.exception()
+                if exc is None:
+                    return task.result()
+                error = exc
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
 async def openai_chat(system: str, user: str) -> str:
     if not OPENAI_API_KEY:
         raise RuntimeError("OPENAI_API_KEY missing")
+    if not breaker.allow():
+        OPENAI_ERRORS.inc("breaker_open")
+        raise OpenAIUnavailable("OpenAI circuit open")
 
-    url = "https://api.openai.com/v1/chat/completions"
     payload = {
         "model": OPENAI_MODEL,
         "messages": [
@@ -24,16 +195,83 @@ async def openai_chat(system: str, user: str) -> str:
         "temperature": 0.4,
     }
 
-    async with httpx.AsyncClient(timeout=25.0) as client:
-        resp = await client.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            content=_safe_json(payload),
-        )
-        if resp.status_code >= 400:
-            raise RuntimeError(f"OpenAI error {resp.status_code}: {resp.text}")
-        data = resp.json()
-        return ((data.get("choices") or [{}])[0].get("message") or {}).get("content") or ""
+    with phase("openai"):
+        return await _chat_with_retries(payload)
+
+
+async def openai_vision(system: str, image_url: str, prompt: str = "") -> str:
+    """One image through the chat-completions vision input; same breaker, retries and hedging as text."""
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY missing")
+    if not breaker.allow():
+        OPENAI_ERRORS.inc("breaker_open")
+        raise OpenAIUnavailable("OpenAI circuit open")
+
+    content: list[dict] = [{"type": "image_url", "image_url": {"url": image_url, "detail": "low"}}]
+    if prompt:
+        content.insert(0, {"type": "text", "text": prompt})
+    payload = {
+        "model": OPENAI_VISION_MODEL,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": content},
+        ],
+        "temperature": 0.0,
+        "response_format": {"type": "json_object"},
+    }
+
+    with phase("vision"):
+        return await _chat_with_retries(payload)
+
+
+async def _chat_with_retries(payload: dict) -> str:
+    budget, bounded_by_request = OPENAI_TOTAL_BUDGET_S, False
+    request_left = deadline_remaining()
+    if request_left is not None and request_left < budget:
+        # The request's own deadline (app/core/deadline.py) comes first.
+        budget, bounded_by_request = request_left, True
+    deadline = time.monotonic() + budget
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if bounded_by_request and remaining <= 0:
+            OPENAI_ERRORS.inc("deadline")
+            breaker.release()
+            raise DeadlineExceeded("request deadline passed before the OpenAI call")
+        timeout = min(OPENAI_TIMEOUT_S, max(0.1, remaining))
+        try:
+            text = await _post_hedged(payload, timeout)
+        except Exception as exc:
+            import httpx
+
+            if bounded_by_request and timeout < OPENAI_TIMEOUT_S and isinstance(exc, httpx.TimeoutException):
+                # Cut short by the caller's budget, not an OpenAI failure: the breaker is left alone.
+                OPENAI_ERRORS.inc("deadline")
+                breaker.release()
+                raise DeadlineExceeded("request deadline passed during the OpenAI call") from exc
+            if not _is_retryable(exc):
+                # A 4xx means OpenAI answered; only unexpected errors count against the breaker.
+                if isinstance(exc, OpenAIHTTPError):
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                raise
+            breaker.record_failure()
+            if attempt >= OPENAI_MAX_RETRIES or breaker.state == OPEN:
+                raise
+            delay = backoff_delay(attempt, OPENAI_RETRY_BASE_S, OPENAI_RETRY_CAP_S)
+            retry_after = exc.retry_after if isinstance(exc, OpenAIHTTPError) else None
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if time.monotonic() + delay >= deadline:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # Cancelled (turn timeout, client gone): no answer either way, so a half-open probe
+            # slot must be handed back or the breaker would stay half-open for good.
+            breaker.release()
+            raise
+        breaker.record_success()
+        return text
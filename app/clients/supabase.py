@@ -1,11 +1,86 @@
 from __future__ import annotations
 
-from supabase import Client, create_client
+import time
+from typing import TYPE_CHECKING, Any, cast
 
 from app.config import SUPABASE_SERVICE_KEY, SUPABASE_URL
+from app.core.deadline import check as check_deadline
+from app.core.metrics import SUPABASE_ERRORS, SUPABASE_SECONDS
+from app.core.request_stats import record_query
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+_OPERATIONS = frozenset({"select", "insert", "update", "upsert", "delete"})
+
+_client: Client | None = None
+
+
+class _InstrumentedQuery:
+    """Wraps a postgrest request builder; times `execute()` per table and operation."""
+
+    __slots__ = ("_builder", "_table", "_op")
+
+    def __init__(self, builder: Any, table: str, op: str) -> None:
+        self._builder = builder
+        self._table = table
+        self._op = op
+
+    def __getattr__(self, name: str) -> Any:
+        target = getattr(self._builder, name)
+        if name == "execute":
+            return self._execute
+        op = name if name in _OPERATIONS else self._op
+        if not callable(target):
+            return _InstrumentedQuery(target, self._table, op) if hasattr(target, "execute") else target
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = target(*args, **kwargs)
+            return _InstrumentedQuery(result, self._table, op) if hasattr(result, "execute") else result
+
+        return call
+
+    def _execute(self) -> Any:
+        if self._op == "select":
+            # A read after the deadline feeds a reply nobody waits for; writes still run.
+            check_deadline(f"{self._table}.select")
+        started = time.perf_counter()
+        try:
+            return self._builder.execute()
+        except Exception:
+            SUPABASE_ERRORS.inc(self._table, self._op)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            SUPABASE_SECONDS.observe(elapsed, self._table, self._op)
+            record_query(self._table, self._op, elapsed)
+
+
+class InstrumentedSupabase:
+    def __init__(self, client: Any) -> None:
+        self.raw = client
+
+    def table(self, name: str) -> Any:
+        return _InstrumentedQuery(self.raw.table(name), name, "select")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
 
 
 def get_supabase() -> Client:
-    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-        raise RuntimeError("SUPABASE_URL / SUPABASE_SERVICE_KEY missing")
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    # Reuse one client per process so the underlying HTTP connection pool stays warm.
+    global _client
+    if _client is None:
+        if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+            raise RuntimeError("SUPABASE_URL / SUPABASE_SERVICE_KEY missing")
+        # The SDK (gotrue, realtime, storage3, postgrest) is heavy; import it on first use.
+        from supabase import create_client
+
+        _client = cast("Client", InstrumentedSupabase(create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)))
+    return _client
+
+
+def set_supabase_client(client: Any | None) -> None:
+    """Install a prebuilt client (local harnesses use an in-memory stand-in)."""
+    global _client
+    _client = cast("Client", InstrumentedSupabase(client)) if client is not None else None
@@ -1,17 +1,197 @@
 from __future__ import annotations
 
 import os
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+# Local development reads `.env`; deployments inject real env vars and skip python-dotenv
+# entirely (no import, no directory walk). Existing env vars still win over the file.
+for _dotenv_path in (Path.cwd() / ".env", Path(__file__).resolve().parent.parent / ".env"):
+    if _dotenv_path.is_file():
+        from dotenv import load_dotenv
+
+        load_dotenv(_dotenv_path)
+        break
 
 APP_NAME = "pazarglobal-agent"
 
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
 SUPABASE_URL = (os.getenv("SUPABASE_URL") or "").strip()
 SUPABASE_SERVICE_KEY = (os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY") or "").strip()
 
 OPENAI_API_KEY = (os.getenv("OPENAI_API_KEY") or "").strip()
 OPENAI_MODEL = (os.getenv("OPENAI_MODEL") or "").strip() or "gpt-4o-mini"
+OPENAI_BASE_URL = ((os.getenv("OPENAI_BASE_URL") or "").strip() or "https://api.openai.com/v1").rstrip("/")
+OPENAI_VISION_MODEL = (os.getenv("OPENAI_VISION_MODEL") or "").strip() or OPENAI_MODEL
+
+# OpenAI resilience: per-attempt timeout, total budget across retries, breaker and hedging.
+OPENAI_TIMEOUT_S = _env_float("OPENAI_TIMEOUT_S", 10.0)
+OPENAI_TOTAL_BUDGET_S = _env_float("OPENAI_TOTAL_BUDGET_S", 25.0)
+OPENAI_MAX_RETRIES = _env_int("OPENAI_MAX_RETRIES", 2)
+OPENAI_RETRY_BASE_S = _env_float("OPENAI_RETRY_BASE_S", 0.25)
+OPENAI_RETRY_CAP_S = _env_float("OPENAI_RETRY_CAP_S", 2.0)
+OPENAI_BREAKER_FAILURES = _env_int("OPENAI_BREAKER_FAILURES", 5)
+OPENAI_BREAKER_RESET_S = _env_float("OPENAI_BREAKER_RESET_S", 30.0)
+# Hedge a second request once the first exceeds this latency percentile (0 disables).
+OPENAI_HEDGE_PERCENTILE = _env_float("OPENAI_HEDGE_PERCENTILE", 0.0)
+
+# Per-user / per-phone token buckets for /agent/run and /webchat/media/analyze. Costs are charged
+# per detected intent; UNKNOWN may end in the LLM fallback, COMMIT_REQUEST publishes and
+# MEDIA_ANALYZE fetches, hashes and runs vision on the images, so those cost more.
+RATE_LIMIT_ENABLED = (os.getenv("RATE_LIMIT_ENABLED") or "true").strip().lower() not in {"0", "false", "no"}
+RATE_LIMIT_BURST = _env_float("RATE_LIMIT_BURST", 20.0)
+RATE_LIMIT_PER_MINUTE = _env_float("RATE_LIMIT_PER_MINUTE", 30.0)
+RATE_LIMIT_MAX_KEYS = _env_int("RATE_LIMIT_MAX_KEYS", 100_000)
+# "reply" answers with a polite chat message (WhatsApp edge), "429" returns HTTP 429 + Retry-After.
+RATE_LIMIT_RESPONSE = (os.getenv("RATE_LIMIT_RESPONSE") or "reply").strip().lower()
+RATE_LIMIT_COSTS: dict[str, float] = {
+    "SMALL_TALK": 1.0,
+    "CANCEL": 1.0,
+    "SEARCH_LISTING": 2.0,
+    "AMBIGUOUS": 2.0,
+    "CREATE_LISTING": 2.0,
+    "UNKNOWN": 4.0,
+    "COMMIT_REQUEST": 8.0,
+    "MEDIA_ANALYZE": 4.0,
+}
+# Override as "UNKNOWN=5,COMMIT_REQUEST=10".
+for _item in (os.getenv("RATE_LIMIT_COSTS") or "").split(","):
+    _name, _, _value = _item.partition("=")
+    try:
+        RATE_LIMIT_COSTS[_name.strip().upper()] = float(_value)
+    except ValueError:
+        continue
+
+# Draft storage: "supabase" (every draft turn is a PostgREST round trip) or "local"
+# (SQLite/WAL file on this instance, replicated to Supabase in the background).
+DRAFT_STORE = (os.getenv("DRAFT_STORE") or "supabase").strip().lower()
+DRAFT_STORE_PATH = (os.getenv("DRAFT_STORE_PATH") or "").strip() or "drafts.sqlite3"
+DRAFT_SYNC_INTERVAL_S = _env_float("DRAFT_SYNC_INTERVAL_S", 0.5)
+
+# listings.province_code / district_code (see DEPLOYMENT.md): written on publish and used as
+# indexed equality filters by search. Off by default; enable once the migration and the
+# `app.maintenance.location_codes` backfill have run.
+LOCATION_CODES_ENABLED = (os.getenv("LOCATION_CODES_ENABLED") or "false").strip().lower() in {"1", "true", "yes"}
+
+# Search facets (category / city / price counts) come from an in-memory snapshot of the
+# active listings, rebuilt in the background once older than the TTL.
+FACETS_ENABLED = (os.getenv("FACETS_ENABLED") or "true").strip().lower() not in {"0", "false", "no"}
+FACETS_SNAPSHOT_TTL_S = _env_float("FACETS_SNAPSHOT_TTL_S", 300.0)
+
+# Search typo correction (app/services/spelling.py): a folded vocabulary of listing title and
+# keyword terms, extended as listings are published and fully rebuilt every SPELLING_REBUILD_S.
+SPELLING_ENABLED = (os.getenv("SPELLING_ENABLED") or "true").strip().lower() not in {"0", "false", "no"}
+SPELLING_REBUILD_S = _env_float("SPELLING_REBUILD_S", 3600.0)
+
+# Response format for chat endpoints (see app/core/responses.py): 1 = legacy [SEARCH_CACHE]
+# text, 2 = results once in data.listings. Clients can ask per request; this is the default.
+RESPONSE_VERSION_DEFAULT = _env_int("RESPONSE_VERSION_DEFAULT", 1)
+# Responses larger than this are gzip-compressed when the client accepts it.
+GZIP_MIN_BYTES = _env_int("GZIP_MIN_BYTES", 1024)
+
+# Conversation sessions (app/core/sessions.py): bounded ring of recent turns per user/source.
+SESSION_MAX_TURNS = _env_int("SESSION_MAX_TURNS", 20)
+SESSION_MAX_SESSIONS = _env_int("SESSION_MAX_SESSIONS", 50_000)
+SESSION_IDLE_TTL_S = _env_float("SESSION_IDLE_TTL_S", 3600.0)
+SESSION_TURN_MAX_CHARS = _env_int("SESSION_TURN_MAX_CHARS", 500)
+# A bare location within this window after a search narrows that search.
+SESSION_REFINE_WINDOW_S = _env_float("SESSION_REFINE_WINDOW_S", 600.0)
+
+# Threads for the independent blocking lookups of a turn (app/core/fanout.py); they wait
+# on the network, so this is about queries in flight rather than CPUs.
+FANOUT_THREADS = _env_int("FANOUT_THREADS", 32)
+
+# Per-request deadline (app/core/deadline.py). The edge sends the time it will still wait in
+# `X-Request-Timeout-Ms`; without the header a turn gets REQUEST_DEADLINE_S (0: no deadline).
+# The margin is kept back for the reply to reach the caller. Optional OpenAI steps (LLM
+# keywords, image analysis, LLM fallback) only start with REQUEST_DEADLINE_OPTIONAL_S left,
+# and are cut off with REQUEST_DEADLINE_RESERVE_S still left for the rest of the turn.
+REQUEST_DEADLINE_S = _env_float("REQUEST_DEADLINE_S", 20.0)
+REQUEST_DEADLINE_MARGIN_S = _env_float("REQUEST_DEADLINE_MARGIN_S", 0.5)
+REQUEST_DEADLINE_OPTIONAL_S = _env_float("REQUEST_DEADLINE_OPTIONAL_S", 4.0)
+REQUEST_DEADLINE_RESERVE_S = _env_float("REQUEST_DEADLINE_RESERVE_S", 1.0)
+
+# Admission control for agent turns (app/core/admission.py), per worker: at most
+# ADMISSION_MAX_IN_FLIGHT turns at once (0 disables), ADMISSION_QUEUE_SIZE more wait up to
+# ADMISSION_MAX_WAIT_S, cheapest intent (RATE_LIMIT_COSTS) first; the rest get 503 + Retry-After.
+ADMISSION_MAX_IN_FLIGHT = _env_int("ADMISSION_MAX_IN_FLIGHT", 64)
+ADMISSION_QUEUE_SIZE = _env_int("ADMISSION_QUEUE_SIZE", 64)
+ADMISSION_MAX_WAIT_S = _env_float("ADMISSION_MAX_WAIT_S", 1.0)
+ADMISSION_RETRY_AFTER_S = _env_int("ADMISSION_RETRY_AFTER_S", 2)
+
+# Startup warm-up and `/readyz` (app/core/readiness.py): caches, connection pools and the facet
+# snapshot are warmed in the background after startup; dependencies are then re-probed every
+# READYZ_CHECK_INTERVAL_S and `/readyz` serves the cached results.
+WARMUP_ENABLED = (os.getenv("WARMUP_ENABLED") or "true").strip().lower() not in {"0", "false", "no"}
+READYZ_CHECK_INTERVAL_S = _env_float("READYZ_CHECK_INTERVAL_S", 15.0)
+READYZ_PROBE_TIMEOUT_S = _env_float("READYZ_PROBE_TIMEOUT_S", 5.0)
+
+# Request caps: bodies over MAX_REQUEST_BYTES get 413 before parsing; the rest is validated.
+MAX_REQUEST_BYTES = _env_int("MAX_REQUEST_BYTES", 64 * 1024)
+MAX_MESSAGE_CHARS = _env_int("MAX_MESSAGE_CHARS", 4000)
+MAX_HISTORY_ITEMS = _env_int("MAX_HISTORY_ITEMS", 50)
+MAX_MEDIA_ITEMS = _env_int("MAX_MEDIA_ITEMS", 10)
+
+# Media ingestion (app/services/media.py): uploaded images are fetched concurrently, probed
+# and hashed in a process pool; near-duplicates (dHash Hamming distance) are dropped.
+MEDIA_INGEST_ENABLED = (os.getenv("MEDIA_INGEST_ENABLED") or "true").strip().lower() not in {"0", "false", "no"}
+MEDIA_FETCH_CONCURRENCY = _env_int("MEDIA_FETCH_CONCURRENCY", 8)
+MEDIA_FETCH_TIMEOUT_S = _env_float("MEDIA_FETCH_TIMEOUT_S", 10.0)
+MEDIA_MAX_BYTES = _env_int("MEDIA_MAX_BYTES", 10 * 1024 * 1024)
+# 0 hashes in a thread instead of a process pool.
+MEDIA_HASH_WORKERS = _env_int("MEDIA_HASH_WORKERS", 2)
+MEDIA_DUP_DISTANCE = _env_int("MEDIA_DUP_DISTANCE", 6)
+# Bare storage paths ("listing-images/abc.jpg") are resolved against this base URL.
+MEDIA_BASE_URL = (
+    (os.getenv("MEDIA_BASE_URL") or "").strip() or (f"{SUPABASE_URL.rstrip('/')}/storage/v1/object/public" if SUPABASE_URL else "")
+).rstrip("/")
+
+# Vision analysis of draft images (app/services/vision.py): per-request fan-out cap and an
+# in-memory cache keyed by perceptual hash, so the same photo is analysed once per process.
+VISION_ENABLED = (os.getenv("VISION_ENABLED") or "true").strip().lower() not in {"0", "false", "no"}
+VISION_CONCURRENCY = _env_int("VISION_CONCURRENCY", 4)
+VISION_CACHE_SIZE = _env_int("VISION_CACHE_SIZE", 20_000)
+VISION_MAX_IMAGES = _env_int("VISION_MAX_IMAGES", 6)
+
+# Bulk listing import (app/services/bulk_import.py). The HTTP endpoint is mounted only when
+# IMPORT_API_TOKEN is set and accepts bodies up to IMPORT_MAX_BYTES (exempt from MAX_REQUEST_BYTES).
+IMPORT_API_TOKEN = (os.getenv("IMPORT_API_TOKEN") or "").strip()
+IMPORT_BATCH_SIZE = _env_int("IMPORT_BATCH_SIZE", 500)
+# Rows are prepared in a process pool; the default leaves one core for the API (0 = inline).
+IMPORT_WORKERS = _env_int("IMPORT_WORKERS", max(0, min(4, (os.cpu_count() or 1) - 1)))
+IMPORT_MAX_BYTES = _env_int("IMPORT_MAX_BYTES", 256 * 1024 * 1024)
+IMPORT_MAX_REPORTED_ERRORS = _env_int("IMPORT_MAX_REPORTED_ERRORS", 1000)
+
+# Partner bulk classification (app/routers/classify.py): mounted only when CLASSIFY_API_TOKENS
+# (comma-separated, one per partner) is set. Items are classified in chunks of
+# CLASSIFY_CHUNK_SIZE, in a process pool when CLASSIFY_WORKERS > 0.
+CLASSIFY_API_TOKENS = tuple(t.strip() for t in (os.getenv("CLASSIFY_API_TOKENS") or "").split(",") if t.strip())
+CLASSIFY_MAX_ITEMS = _env_int("CLASSIFY_MAX_ITEMS", 5000)
+CLASSIFY_MAX_BYTES = _env_int("CLASSIFY_MAX_BYTES", 4 * 1024 * 1024)
+CLASSIFY_CHUNK_SIZE = _env_int("CLASSIFY_CHUNK_SIZE", 250)
+CLASSIFY_WORKERS = _env_int("CLASSIFY_WORKERS", max(0, min(4, (os.cpu_count() or 1) - 1)))
+
+# /debug/* exposes raw table samples; mount it only where explicitly enabled.
+ENABLE_DEBUG_ROUTES = (os.getenv("ENABLE_DEBUG_ROUTES") or "false").strip().lower() in {"1", "true", "yes"}
 
 # CORS can be customized later; keep permissive for now.
 CORS_ALLOW_ORIGINS = ["*"]
@@ -0,0 +1,127 @@
+"""Admission control for agent turns: a bounded number in flight per worker, a short queue, shedding.
+
+Without a limit a traffic spike is accepted whole, every turn slows down together, and the edge
+times them all out. Here at most `ADMISSION_MAX_IN_FLIGHT` turns run at once per worker;
+the next `ADMISSION_QUEUE_SIZE` wait for a slot, for up to `ADMISSION_MAX_WAIT_S` (or until
+the request deadline, whichever comes first), and the rest are refused at once with
+`Overloaded`, which the router turns into 503 + `Retry-After`.
+
+Waiters are ordered by priority, lowest first: the router passes the intent's
+`RATE_LIMIT_COSTS`, so SMALL_TALK and CANCEL are let in before searches, and those before
+the LLM fallback and publishing. When the queue is full, a cheaper turn takes the place of
+the most expensive waiter, which is shed instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from app.config import ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_WAIT_S, ADMISSION_QUEUE_SIZE, ADMISSION_RETRY_AFTER_S
+from app.core.metrics import ADMISSION_SHED, ADMISSION_WAIT_SECONDS, gauge
+from app.core.request_stats import phase
+
+
+class Overloaded(Exception):
+    """The turn was not admitted; `reason` is queue_full, evicted or wait_timeout."""
+
+    def __init__(self, reason: str, retry_after: int = ADMISSION_RETRY_AFTER_S) -> None:
+        super().__init__(f"overloaded: {reason}")
+        self.reason = reason
+        self.retry_after = max(1, int(retry_after))
+
+
+# (priority, arrival order, future resolved when a slot is handed over)
+_Waiter = tuple[float, int, "asyncio.Future[None]"]
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, queue_size: int, max_wait: float) -> None:
+        self.max_in_flight = max(0, int(max_in_flight))
+        self.queue_size = max(0, int(queue_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self.in_flight = 0
+        self._waiters: list[_Waiter] = []
+        self._order = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def hold(self, priority: float, label: str = "", max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold a slot for the enclosed turn; raises `Overloaded` if none frees up in time."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            with phase("admission"):
+                await self._acquire(priority, self.max_wait if max_wait is None else min(self.max_wait, max_wait))
+        except Overloaded as exc:
+            ADMISSION_SHED.inc(label, exc.reason)
+            raise
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, label)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: float, max_wait: float) -> None:
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            worst = max(self._waiters, default=None)
+            if worst is None or worst[0] <= priority:
+                raise Overloaded("queue_full")
+            # A cheaper turn displaces the most expensive (and latest) waiter.
+            self._remove(worst)
+            worst[2].set_exception(Overloaded("evicted"))
+        if max_wait <= 0:
+            raise Overloaded("wait_timeout")
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiter: _Waiter = (priority, next(self._order), future)
+        heapq.heappush(self._waiters, waiter)
+        try:
+            async with asyncio.timeout(max_wait):
+                await future
+        except BaseException as exc:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as the wait ended: pass it on.
+                self._release()
+            else:
+                self._remove(waiter)
+            if isinstance(exc, TimeoutError):
+                raise Overloaded("wait_timeout") from None
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)  # the slot moves to the waiter; in_flight is unchanged
+                return
+        self.in_flight -= 1
+
+    def _remove(self, waiter: _Waiter) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+
+
+admission = AdmissionController(ADMISSION_MAX_IN_FLIGHT, ADMISSION_QUEUE_SIZE, ADMISSION_MAX_WAIT_S)
+
+gauge("pazarglobal_admission_in_flight", "Agent turns holding an admission slot.", lambda: admission.in_flight)
+gauge("pazarglobal_admission_queued", "Agent turns waiting for an admission slot.", lambda: admission.queued)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Any
+
+_TOO_LARGE = '{"detail":"İstek gövdesi çok büyük"}'.encode("utf-8")
+
+
+class BodySizeLimitMiddleware:
+    """Pure ASGI middleware: reject request bodies over `max_bytes` with 413 before parsing.
+
+    A declared Content-Length over the cap is rejected without reading the body. Chunked
+    bodies are counted while the app receives them and cut off as soon as they pass the cap.
+    `path_limits` gives individual paths (e.g. the bulk import upload) their own cap.
+    """
+
+    def __init__(self, app: Any, max_bytes: int, path_limits: dict[str, int] | None = None) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = dict(path_limits or {})
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        max_bytes = self.path_limits.get(scope.get("path") or "", self.max_bytes)
+        if scope.get("type") != "http" or max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers") or ():
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > max_bytes:
+                    await _reject(send)
+                    return
+                break
+
+        received = 0
+        rejected = False
+
+        async def send_unless_rejected(message: dict[str, Any]) -> None:
+            # After a 413 went out, whatever the app answers to the disconnect is dropped.
+            if not rejected:
+                await send(message)
+
+        async def receive_limited() -> dict[str, Any]:
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body") or b"")
+                if received > max_bytes:
+                    rejected = True
+                    await _reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        await self.app(scope, receive_limited, send_unless_rejected)
+
+
+async def _reject(send: Any) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json; charset=utf-8"),
+                (b"content-length", str(len(_TOO_LARGE)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": _TOO_LARGE})
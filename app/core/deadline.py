@@ -0,0 +1,116 @@
+"""Per-request time budget shared by every Supabase and OpenAI call of a turn.
+
+The edge function stops waiting for a turn after its own timeout, and anything the agent
+does after that is wasted. `agent_run` opens a `deadline_scope` for the time the edge
+announced in `X-Request-Timeout-Ms` (or `REQUEST_DEADLINE_S`), less
+`REQUEST_DEADLINE_MARGIN_S`. The deadline lives in a context variable, so it follows
+the request into fan-out threads:
+
+- each OpenAI attempt is capped at the time left, and no attempt or retry starts after
+  the deadline (app/clients/openai.py);
+- Supabase reads are refused once the deadline has passed (app/clients/supabase.py).
+  Writes still go through, and a sequence that must finish once it has started (the
+  listing insert, the credit deduction and the draft deletion of a publish) runs under
+  `suspended()`;
+- optional steps call `allows(step)` first. With less than `REQUEST_DEADLINE_OPTIONAL_S`
+  left they are skipped, and the deterministic result is used instead. They run under
+  `reserve()`, so a slow model is cut off while the turn still has time to finish
+  without it.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.config import (
+    REQUEST_DEADLINE_MARGIN_S,
+    REQUEST_DEADLINE_OPTIONAL_S,
+    REQUEST_DEADLINE_RESERVE_S,
+    REQUEST_DEADLINE_S,
+)
+from app.core.metrics import DEADLINE_SKIPPED
+
+HEADER = "x-request-timeout-ms"
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before the call could be made."""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def request_budget(header_value: Optional[str]) -> Optional[float]:
+    """Seconds a turn may take: the header (ms) if valid, else `REQUEST_DEADLINE_S`, less the margin.
+
+    None means no deadline (no header and `REQUEST_DEADLINE_S` = 0).
+    """
+    seconds = REQUEST_DEADLINE_S
+    try:
+        announced = float((header_value or "").strip()) / 1000.0
+    except ValueError:
+        announced = 0.0
+    if announced > 0:
+        seconds = announced
+    if seconds <= 0:
+        return None
+    return max(0.0, seconds - REQUEST_DEADLINE_MARGIN_S)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Run the enclosed code with `seconds` left; an earlier enclosing deadline still wins."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def reserve(seconds: float = REQUEST_DEADLINE_RESERVE_S) -> Iterator[None]:
+    """Run the enclosed calls with the deadline `seconds` earlier, keeping that much for what follows."""
+    left = remaining()
+    with deadline_scope(None if left is None else max(0.0, left - seconds)):
+        yield
+
+
+@contextmanager
+def suspended() -> Iterator[None]:
+    """Run the enclosed calls without a deadline."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds until the current request's deadline (may be negative); None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check(what: str) -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"request deadline passed before {what}")
+
+
+def allows(step: str, needed: float = REQUEST_DEADLINE_OPTIONAL_S) -> bool:
+    """True if an optional step may start; otherwise counts it as skipped."""
+    left = remaining()
+    if left is None or left >= needed:
+        return True
+    DEADLINE_SKIPPED.inc(step)
+    return False
@@ -0,0 +1,54 @@
+"""Run the independent blocking lookups of a turn at the same time.
+
+The Supabase SDK is synchronous, so a handler's queries otherwise run one after another
+on the event loop thread, and the turn takes the sum of their latencies. These helpers
+start each call in a thread pool of `FANOUT_THREADS` instead; the request's context variables go
+along, so every query still lands in the request's `Server-Timing`. A turn then waits
+for its slowest lookup, not for all of them in a row.
+
+Cancellation only stops the waiting: a query already running in a thread finishes in the
+background and its result is dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from app.config import FANOUT_THREADS
+from app.core.request_stats import phase
+
+T = TypeVar("T")
+
+# I/O-bound calls: sized by how many queries may be in flight, not by the CPU count
+# (the loop's default executor has min(32, cpus + 4) threads).
+_executor = ThreadPoolExecutor(max_workers=max(1, FANOUT_THREADS), thread_name_prefix="fanout")
+
+
+def start_blocking(call: Callable[[], T]) -> asyncio.Future[T]:
+    """Submit `call` to a thread right away; await the future where the result is needed.
+
+    Submitted here rather than from a task (as `asyncio.to_thread` would), so it overlaps
+    even with synchronous code that runs before the handler next yields to the loop.
+    """
+    context = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(_executor, partial(context.run, call))
+
+
+async def gather_blocking(**calls: Optional[Callable[[], Any]]) -> dict[str, Any]:
+    """Run the given calls concurrently and return their results by name (None calls are skipped).
+
+    The first failure cancels the others and is raised unchanged.
+    """
+    tasks = {name: start_blocking(call) for name, call in calls.items() if call is not None}
+    try:
+        with phase("fanout"):
+            results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return dict(zip(tasks, results))
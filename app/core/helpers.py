@@ -20,10 +20,46 @@ def normalize_phone(raw: str | None) -> str | None:
     return digits or None
 
 
+_PRICE_RE = re.compile(r"(?<!\d)(\d{2,7})(?:\s*(?:tl|₺))?(?!\d)")
+_LOCATION_TAIL_RE = re.compile(r"(?:konum\s*:\s*)?([A-Za-zÇĞİÖŞÜçğıöşü\s]{3,20})$")
+_WORD_RE = re.compile(r"[A-Za-zÇĞİÖŞÜçğıöşü]+")
+
+# Intent keyword tables (module level: built once, shared by pre-forked workers).
+_GREETING_TOKENS = ("selam", "merhaba", "hey", "sa", "selamlar", "günaydın", "iyi akşamlar", "iyi günler")
+_SMALLTALK_TOKENS = ("nasılsın", "naber", "ne haber", "hayat nasıl", "nasıl gidiyor", "iyisin", "iyi misin")
+_CANCEL_TOKENS = ("iptal", "vazgeç", "kapat", "cancel", "stop")
+_COMMIT_TOKENS = ("onaylıyorum", "yayınla", "yayınlayalım", "paylaş", "publish")
+_CREATE_PATTERNS = (
+    "ilan ver", "ilan vermek", "ilan oluştur", "ilan yayınla",
+    "sat", "satılık", "satmak", "yayına", "ürün sat",
+    "ekle", "eklemek", "paylaş", "paylaşmak",
+)
+_SEARCH_VERBS = ("ara", "bul", "listele", "göster", "aranır", "bulabilir", "lazım", "bakmak")
+_SEARCH_MARKERS = ("arıyorum", "aramak", "var mı", "varmı", "var mi", "varmi", "ilanları", "ilanlar", "ilanlara")
+_PRICE_RESEARCH_TOKENS = ("fiyat araştır", "fiyat bak", "ne kadar", "piyasa fiyatı")
+_ACK_TOKENS = (
+    "tamam", "tamamdır", "ok", "okey", "peki", "olur", "evet",
+    "teşekkürler", "teşekkür ederim", "teşekkür", "sağol", "sağ ol", "sağolun", "eyvallah",
+)
+_FILLER_TOKENS = ("istiyorum", "lütfen", "bir", "bi", "hemen", "şimdi", "çok")
+# A message made only of greetings, acknowledgements and command phrases ("ilan ver", "tamam").
+_COMMAND_ONLY_RE = re.compile(
+    r"(?:(?:"
+    + "|".join(
+        re.escape(k)
+        for k in sorted(
+            {*_GREETING_TOKENS, *_ACK_TOKENS, *_CANCEL_TOKENS, *_COMMIT_TOKENS, *_CREATE_PATTERNS, *_FILLER_TOKENS},
+            key=lambda k: (-len(k), k),
+        )
+    )
+    + r")\b[\s\W]*)+"
+)
+
+
 def extract_price_try(text: str) -> Optional[float]:
     if not text:
         return None
-    m = re.search(r"(?<!\d)(\d{2,7})(?:\s*(?:tl|₺))?(?!\d)", text.lower())
+    m = _PRICE_RE.search(text.lower())
     if not m:
         return None
     try:
@@ -32,8 +68,14 @@ def extract_price_try(text: str) -> Optional[float]:
         return None
 
 
+def is_command_only(message: str) -> bool:
+    """True when the message carries no content of its own: "selam", "tamam", "ilan ver", "teşekkürler"."""
+    msg = (message or "").replace("İ", "i").replace("I", "ı").lower().strip(" \t\n.,!?")
+    return bool(msg) and _COMMAND_ONLY_RE.fullmatch(msg) is not None
+
+
 def _looks_like_location(msg: str) -> bool:
-    mloc = re.search(r"(?:konum\s*:\s*)?([A-Za-zÇĞİÖŞÜçğıöşü\s]{3,20})$", msg)
+    mloc = _LOCATION_TAIL_RE.search(msg)
     if not mloc:
         return False
     candidate = mloc.group(1).strip()
@@ -43,7 +85,7 @@ def _looks_like_location(msg: str) -> bool:
 def _looks_like_listing_packet(msg: str) -> bool:
     has_price = extract_price_try(msg) is not None
     has_location = _looks_like_location(msg)
-    has_words = len(re.findall(r"[A-Za-zÇĞİÖŞÜçğıöşü]+", msg)) >= 2
+    has_words = len(_WORD_RE.findall(msg)) >= 2
     return has_price and (has_location or has_words)
 
 
@@ -52,37 +94,28 @@ def detect_intent(message: str) -> Tuple[str, float]:
     if not msg:
         return "UNKNOWN", 0.0
 
-    greeting_tokens = ["selam", "merhaba", "hey", "sa", "selamlar", "günaydın", "iyi akşamlar", "iyi günler"]
-    smalltalk_tokens = ["nasılsın", "naber", "ne haber", "hayat nasıl", "nasıl gidiyor", "iyisin", "iyi misin"]
-    if any(k == msg or msg.startswith(f"{k} ") for k in greeting_tokens):
+    if any(k == msg or msg.startswith(f"{k} ") for k in _GREETING_TOKENS):
         if len(msg.split()) <= 2 and extract_price_try(msg) is None:
             return "SMALL_TALK", 0.9
-    if any(k in msg for k in smalltalk_tokens):
+    if any(k in msg for k in _SMALLTALK_TOKENS):
         if extract_price_try(msg) is None:
             return "SMALL_TALK", 0.85
 
-    if any(k in msg for k in ["iptal", "vazgeç", "kapat", "cancel", "stop"]):
+    if any(k in msg for k in _CANCEL_TOKENS):
         return "CANCEL", 0.95
 
-    if any(k in msg for k in ["onaylıyorum", "yayınla", "yayınlayalım", "paylaş", "publish"]):
+    if any(k in msg for k in _COMMIT_TOKENS):
         return "COMMIT_REQUEST", 0.9
 
     # CREATE intent - önce kontrol et (SEARCH'ten önce!)
-    create_patterns = [
-        "ilan ver", "ilan vermek", "ilan oluştur", "ilan yayınla",
-        "sat", "satılık", "satmak", "yayına", "ürün sat",
-        "ekle", "eklemek", "paylaş", "paylaşmak"
-    ]
-    if any(k in msg for k in create_patterns):
+    if any(k in msg for k in _CREATE_PATTERNS):
         return "CREATE_LISTING", 0.85
 
     # SEARCH intent - güçlendirilmiş pattern matching
-    search_verbs = ["ara", "bul", "listele", "göster", "aranır", "bulabilir", "lazım", "bakmak"]
-    search_markers = ["arıyorum", "aramak", "var mı", "varmı", "var mi", "varmi", "ilanları", "ilanlar", "ilanlara"]
     search_confidence = 0.0
     
     # "istiyorum" sadece CREATE pattern'leri yoksa SEARCH olarak kabul et
-    for verb in search_verbs:
+    for verb in _SEARCH_VERBS:
         if verb in msg:
             search_confidence = max(search_confidence, 0.75)
             break
@@ -91,13 +124,13 @@ def detect_intent(message: str) -> Tuple[str, float]:
     if "istiyorum" in msg and search_confidence == 0.0:
         search_confidence = 0.75
     
-    for marker in search_markers:
+    for marker in _SEARCH_MARKERS:
         if marker in msg:
             search_confidence = max(search_confidence, 0.8)
             break
     
     # "fiyat araştır" patterns
-    if any(k in msg for k in ["fiyat araştır", "fiyat bak", "ne kadar", "piyasa fiyatı"]):
+    if any(k in msg for k in _PRICE_RESEARCH_TOKENS):
         return "SEARCH_LISTING", 0.85
     
     if search_confidence > 0.0:
@@ -0,0 +1,46 @@
+"""Per-key ordered execution lanes.
+
+Turns for the same key (user) run one at a time in arrival order, while different keys
+run fully concurrently. A lane exists only while a turn holds or waits on it, so idle
+users cost nothing and the map cannot grow without bound.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class _Lane:
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class KeyedLanes:
+    def __init__(self) -> None:
+        self._lanes: dict[str, _Lane] = {}
+
+    def __len__(self) -> int:
+        return len(self._lanes)
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+        lane.users += 1
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, which keeps same-user turns ordered.
+            async with lane.lock:
+                yield
+        finally:
+            lane.users -= 1
+            if lane.users == 0:
+                self._lanes.pop(key, None)
+
+
+user_lanes = KeyedLanes()
@@ -0,0 +1,231 @@
+"""Minimal Prometheus metrics (counters, histograms) with text exposition.
+
+Hot-path updates are a dict lookup plus integer/float increments under a per-metric lock
+(fan-out threads update the same series as the event loop); rendering happens only
+when `/metrics` is scraped. Caches are not counted on the hot path either: they register a
+callable returning `(hits, misses)` that is read at scrape time.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        values = self._values
+        with self._lock:
+            values[labels] = values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf bucket, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[bucket] += 1
+            series[-1] += seconds
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        bounds = (*self.buckets, float("inf"))
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, n in zip(bounds, series):
+                cumulative += n
+                le = 'le="' + _fmt(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_fmt(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {_fmt(cumulative)}"
+
+
+class Gauge:
+    """A value read from a callable at scrape time (queue depths, pool sizes)."""
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_fmt(self.read())}"
+
+
+_metrics: list[Counter | Histogram | Gauge] = []
+_caches: dict[str, Callable[[], tuple[int, int]]] = {}
+
+
+def counter(name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    metric = Counter(name, help_text, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(
+    name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+) -> Histogram:
+    metric = Histogram(name, help_text, labelnames, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def gauge(name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+    metric = Gauge(name, help_text, read)
+    _metrics.append(metric)
+    return metric
+
+
+def register_cache(name: str, stats: Callable[[], tuple[int, int]]) -> None:
+    """Expose a cache's `(hits, misses)` at scrape time."""
+    _caches[name] = stats
+
+
+def register_lru_cache(name: str, fn: Callable[..., object]) -> None:
+    info = getattr(fn, "cache_info")
+    register_cache(name, lambda: (info().hits, info().misses))
+
+
+def _render_caches() -> Iterable[str]:
+    if not _caches:
+        return
+    snapshot = {name: stats() for name, stats in sorted(_caches.items())}
+    yield "# HELP pazarglobal_cache_hits_total Cache hits."
+    yield "# TYPE pazarglobal_cache_hits_total counter"
+    for name, (hits, _) in snapshot.items():
+        yield f'pazarglobal_cache_hits_total{{cache="{_escape(name)}"}} {hits}'
+    yield "# HELP pazarglobal_cache_misses_total Cache misses."
+    yield "# TYPE pazarglobal_cache_misses_total counter"
+    for name, (_, misses) in snapshot.items():
+        yield f'pazarglobal_cache_misses_total{{cache="{_escape(name)}"}} {misses}'
+    yield "# HELP pazarglobal_cache_hit_ratio Hits / (hits + misses) since start."
+    yield "# TYPE pazarglobal_cache_hit_ratio gauge"
+    for name, (hits, misses) in snapshot.items():
+        total = hits + misses
+        yield f'pazarglobal_cache_hit_ratio{{cache="{_escape(name)}"}} {_fmt(hits / total if total else 0.0)}'
+
+
+def render_latest() -> str:
+    lines: list[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    lines.extend(_render_caches())
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_SECONDS = histogram(
+    "pazarglobal_agent_request_seconds",
+    "Agent turn latency by resolved intent.",
+    ("intent",),
+)
+SUPABASE_SECONDS = histogram(
+    "pazarglobal_supabase_call_seconds",
+    "Supabase (PostgREST) call latency by table and operation.",
+    ("table", "operation"),
+)
+SUPABASE_ERRORS = counter(
+    "pazarglobal_supabase_errors_total",
+    "Supabase calls that raised, by table and operation.",
+    ("table", "operation"),
+)
+OPENAI_SECONDS = histogram(
+    "pazarglobal_openai_call_seconds",
+    "OpenAI HTTP attempt latency by outcome.",
+    ("outcome",),
+)
+OPENAI_ERRORS = counter(
+    "pazarglobal_openai_errors_total",
+    "OpenAI failures by kind (http_429, http_4xx, http_5xx, timeout, transport, breaker_open, deadline).",
+    ("kind",),
+)
+RATE_LIMITED = counter(
+    "pazarglobal_rate_limited_total",
+    "Turns rejected by the per-user rate limiter, by detected intent.",
+    ("intent",),
+)
+DEADLINE_SKIPPED = counter(
+    "pazarglobal_deadline_skipped_total",
+    "Optional steps skipped for lack of request budget, and turns cut off at the deadline (step=turn).",
+    ("step",),
+)
+ADMISSION_WAIT_SECONDS = histogram(
+    "pazarglobal_admission_wait_seconds",
+    "Time admitted agent turns waited for a slot, by detected intent.",
+    ("intent",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+ADMISSION_SHED = counter(
+    "pazarglobal_admission_shed_total",
+    "Agent turns refused with 503, by detected intent and reason (queue_full, evicted, wait_timeout).",
+    ("intent", "reason"),
+)
+SEARCH_CORRECTIONS = counter(
+    "pazarglobal_search_corrections_total",
+    "Search query tokens rewritten before the listings query, by kind (diacritics, typo).",
+    ("kind",),
+)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+# Representative messages: running the hot functions once compiles every regex they use
+# into `re`'s cache and fills the category lru_cache with the canonical ids.
+_SAMPLES = (
+    "merhaba",
+    "nasılsın",
+    "iptal",
+    "onaylıyorum",
+    "iPhone 13 128GB satıyorum 25000 TL konum: Kadıköy",
+    "2018 model Egea 85.000 km dizel manuel 650bin",
+    "3+1 satılık daire Çankaya 4.500.000 TL",
+    "istanbulda 10000-20000 tl arası bisiklet arıyorum",
+    "50k altı laptop var mı ankara",
+)
+
+
+def preload() -> dict[str, Any]:
+    """Import the app, build every immutable table and warm regex/lru caches in the current process.
+
+    Called by the pre-fork launcher (`app.prefork`) in the master before `gc.freeze()` and
+    `fork()`, so workers share these objects copy-on-write instead of each rebuilding them.
+    Returns the sizes of what was built, for logging.
+    """
+    import main  # noqa: F401  # app, routers, pydantic models
+
+    return warm_caches()
+
+
+def warm_caches() -> dict[str, Any]:
+    """The table / cache part of `preload`; the lifespan warm-up runs it in every worker."""
+    from app.core.helpers import detect_intent
+    from app.services import category_library, description_composer, gazetteer, search
+    from app.services.metadata_keywords import generate_listing_keywords_deterministic
+    from app.services.parsing import extract_simple_fields
+
+    for text in _SAMPLES:
+        detect_intent(text)
+        fields = extract_simple_fields(text)
+        search._extract_price_range(text)
+        search._extract_location_hint(text)
+        category_library.classify_category(text)
+        generate_listing_keywords_deterministic(
+            title=str(fields.get("title") or text), category=str(fields.get("category") or ""), description=text
+        )
+        description_composer.compose_description(fields, {})
+        description_composer.get_description_question(str(fields.get("category") or ""), fields)
+    for option in category_library.CATEGORY_OPTIONS:
+        category_library.normalize_category_id(option.id)
+        category_library.normalize_category_id(option.label)
+
+    return {
+        "categories": len(category_library._COMPILED_CATEGORIES),
+        "category_token_patterns": len(category_library._TOKEN_PATTERNS),
+        "provinces": len(gazetteer.GAZETTEER.provinces),
+        "districts": len(gazetteer.GAZETTEER.districts),
+        "regex_cache": len(getattr(re, "_cache", {})),
+    }
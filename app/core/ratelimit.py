@@ -0,0 +1,72 @@
+"""In-memory token-bucket rate limiter.
+
+Each key owns a two-slot list `[tokens, last_refill]` in an insertion-ordered dict that is
+kept in least-recently-used order. The dict is bounded by `max_keys`; entries idle longer
+than `idle_ttl` are dropped from the cold end (an idle bucket would be full again anyway).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    def __init__(self, capacity: float, refill_per_s: float, max_keys: int = 100_000, idle_ttl: float = 600.0) -> None:
+        self.capacity = float(capacity)
+        self.refill_per_s = float(refill_per_s)
+        self.max_keys = max(1, int(max_keys))
+        self.idle_ttl = float(idle_ttl)
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._calls = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if len(buckets) <= self.max_keys and now - bucket[1] < self.idle_ttl:
+                break
+            del buckets[key]
+
+    def acquire(self, keys: tuple[str, ...], cost: float = 1.0, now: float | None = None) -> float:
+        """Charge `cost` to every key atomically.
+
+        Returns 0.0 when allowed, otherwise the seconds to wait before the call would pass.
+        Nothing is charged on rejection.
+        """
+        if now is None:
+            now = time.monotonic()
+        capacity = self.capacity
+        refill = self.refill_per_s
+        if cost > capacity:
+            cost = capacity
+        buckets = self._buckets
+        touched: list[list[float]] = []
+        wait = 0.0
+        for key in keys:
+            if not key:
+                continue
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [capacity, now]
+            else:
+                buckets.move_to_end(key)
+                tokens = bucket[0] + (now - bucket[1]) * refill
+                bucket[0] = tokens if tokens < capacity else capacity
+                bucket[1] = now
+            if bucket[0] < cost:
+                deficit = (cost - bucket[0]) / refill if refill > 0 else float("inf")
+                if deficit > wait:
+                    wait = deficit
+            touched.append(bucket)
+        if wait <= 0.0:
+            for bucket in touched:
+                bucket[0] -= cost
+        # Size-bound eviction runs on every overflow; the idle sweep only every 1024 calls.
+        self._calls += 1
+        if len(buckets) > self.max_keys or not self._calls & 1023:
+            self._evict(now)
+        return wait
@@ -0,0 +1,173 @@
+"""Startup warm-up and the readiness state behind `/readyz`.
+
+`/healthz` answers as soon as the process serves HTTP, which makes it the liveness check.
+Readiness waits for the warm-up that the app lifespan starts in the background:
+
+- hot-path tables and regex caches (`app.core.preload.warm_caches`): intent detection,
+  field extraction and category classification over sample messages, plus the category
+  and city tables;
+- the Supabase client and its connection pool, opened with one cheap query, then the
+  facet snapshot and the typo-correction vocabulary that searches read;
+- this event loop's OpenAI connection pool, when a key is configured.
+
+After warm-up, the dependencies are re-probed every `READYZ_CHECK_INTERVAL_S` in the
+background. `/readyz` only reads the cached results, so a probe from the platform never
+adds I/O. The instance is ready once warm-up has finished and Supabase answered the last
+probe. OpenAI problems are reported but leave it ready, because every turn has a
+deterministic path without the model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+from app.clients.openai import aclose_openai, breaker, openai_ping
+from app.clients.supabase import get_supabase
+from app.config import (
+    FACETS_ENABLED,
+    OPENAI_API_KEY,
+    READYZ_CHECK_INTERVAL_S,
+    READYZ_PROBE_TIMEOUT_S,
+    SPELLING_ENABLED,
+    WARMUP_ENABLED,
+)
+from app.core.helpers import now_iso
+
+logger = logging.getLogger("pazarglobal.readiness")
+
+
+class Readiness:
+    def __init__(self) -> None:
+        self.warmed_up = False
+        self.warmup_ms: Optional[float] = None
+        self.warmed: dict[str, Any] = {}
+        self.dependencies: dict[str, dict[str, Any]] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed_up and bool(self.dependencies.get("supabase", {}).get("ok", True))
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmed_up": self.warmed_up,
+            "warmup_ms": self.warmup_ms,
+            "warmed": self.warmed,
+            "dependencies": self.dependencies,
+        }
+
+
+state = Readiness()
+
+
+def _probe_supabase() -> dict[str, Any]:
+    # Runs in a thread: the SDK is synchronous, and the first call also imports it.
+    started = time.perf_counter()
+    try:
+        get_supabase().table("listings").select("id").limit(1).execute()
+    except Exception as exc:
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"[:200], "checked_at": now_iso()}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000.0, 1), "checked_at": now_iso()}
+
+
+async def _probe_openai() -> dict[str, Any]:
+    if not OPENAI_API_KEY:
+        return {"configured": False}
+    started = time.perf_counter()
+    try:
+        status = await openai_ping(READYZ_PROBE_TIMEOUT_S)
+    except Exception as exc:
+        return {"ok": False, "error": type(exc).__name__, "breaker": breaker.state, "checked_at": now_iso()}
+    return {
+        "ok": status == 200,
+        "status": status,
+        "latency_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        "breaker": breaker.state,
+        "checked_at": now_iso(),
+    }
+
+
+def _warm_snapshot() -> Optional[int]:
+    if not FACETS_ENABLED:
+        return None
+    from app.services.facets import warm_snapshot
+
+    snapshot = warm_snapshot(get_supabase())
+    return snapshot.size if snapshot is not None else None
+
+
+def _warm_vocabulary() -> Optional[int]:
+    if not SPELLING_ENABLED:
+        return None
+    from app.services.spelling import warm_vocabulary
+
+    vocab = warm_vocabulary(get_supabase())
+    return vocab.size if vocab is not None else None
+
+
+async def _warm_supabase() -> tuple[dict[str, Any], Optional[int], Optional[int]]:
+    probe = await asyncio.to_thread(_probe_supabase)
+    if not probe["ok"]:
+        return probe, None, None
+    facet_rows, terms = await asyncio.gather(asyncio.to_thread(_warm_snapshot), asyncio.to_thread(_warm_vocabulary))
+    return probe, facet_rows, terms
+
+
+async def warm_up() -> None:
+    from app.core.preload import warm_caches
+
+    started = time.perf_counter()
+    built, (supabase, facet_rows, terms), openai = await asyncio.gather(
+        asyncio.to_thread(warm_caches), _warm_supabase(), _probe_openai()
+    )
+    state.dependencies.update(supabase=supabase, openai=openai)
+    state.warmed = {**built, "facet_snapshot_rows": facet_rows, "search_vocabulary_terms": terms}
+    state.warmup_ms = round((time.perf_counter() - started) * 1000.0, 1)
+    state.warmed_up = True
+    logger.info("warm-up done in %.0f ms (%s)", state.warmup_ms, ", ".join(f"{k}={v}" for k, v in state.warmed.items()))
+
+
+async def probe_dependencies() -> None:
+    supabase, openai = await asyncio.gather(asyncio.to_thread(_probe_supabase), _probe_openai())
+    if supabase["ok"] != state.dependencies.get("supabase", {}).get("ok", True):
+        logger.warning("supabase %s", "recovered" if supabase["ok"] else f"probe failed: {supabase.get('error')}")
+    state.dependencies.update(supabase=supabase, openai=openai)
+
+
+async def _monitor() -> None:
+    if WARMUP_ENABLED:
+        try:
+            await warm_up()
+        except Exception:
+            logger.exception("warm-up failed; serving cold")
+    state.warmed_up = True
+    while True:
+        # Until Supabase answers, probe every second so the instance turns ready quickly.
+        await asyncio.sleep(READYZ_CHECK_INTERVAL_S if state.ready else min(1.0, READYZ_CHECK_INTERVAL_S))
+        try:
+            await probe_dependencies()
+        except Exception:
+            logger.exception("dependency probe failed")
+
+
+@asynccontextmanager
+async def lifespan(app: Any) -> AsyncIterator[None]:
+    """Warm up and probe in the background (startup does not wait), close the pools at shutdown."""
+    from app.services.media import check_pillow
+
+    check_pillow()
+    monitor = asyncio.create_task(_monitor(), name="readiness")
+    try:
+        yield
+    finally:
+        monitor.cancel()
+        from app.services.classify import close_classify
+        from app.services.media import aclose_media
+
+        await aclose_openai()
+        await aclose_media()
+        close_classify()
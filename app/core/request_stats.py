@@ -0,0 +1,113 @@
+"""Per-request accounting of database calls, OpenAI time and handler phases.
+
+`ServerTimingMiddleware` opens a `RequestStats` in a context variable for every HTTP request
+and renders it as a `Server-Timing` response header. Instrumented code records into the
+current stats through `record_query` / `phase`; both are no-ops outside a request.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+
+class RequestStats:
+    __slots__ = ("started", "queries", "phases")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries: list[tuple[str, str, float]] = []
+        self.phases: dict[str, float] = {}
+
+    @property
+    def query_count(self) -> int:
+        return len(self.queries)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def by_table(self) -> dict[str, tuple[int, float]]:
+        out: dict[str, tuple[int, float]] = {}
+        for table, _, seconds in self.queries:
+            n, total = out.get(table, (0, 0.0))
+            out[table] = (n + 1, total + seconds)
+        return out
+
+    def server_timing(self) -> str:
+        db_total = sum(q[2] for q in self.queries)
+        parts = [f'db;dur={db_total * 1000:.1f};desc="{len(self.queries)} queries"']
+        for table, (n, seconds) in sorted(self.by_table().items()):
+            parts.append(f'db.{table};dur={seconds * 1000:.1f};desc="{n}"')
+        for name, seconds in self.phases.items():
+            parts.append(f"{name};dur={seconds * 1000:.1f}")
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+    def as_debug(self) -> dict[str, Any]:
+        return {
+            "query_count": len(self.queries),
+            "queries": [{"table": t, "operation": op, "ms": round(s * 1000, 3)} for t, op, s in self.queries],
+            "phases_ms": {name: round(s * 1000, 3) for name, s in self.phases.items()},
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 3),
+        }
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track_request() -> Iterator[RequestStats]:
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def record_query(table: str, operation: str, seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.queries.append((table, operation, seconds))
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_phase(name, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware: one RequestStats per HTTP request, emitted as `Server-Timing`."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_request() as stats:
+
+            async def send_with_timing(message: dict[str, Any]) -> None:
+                if message.get("type") == "http.response.start":
+                    headers = list(message.get("headers") or [])
+                    headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,96 @@
+"""Resilience primitives for outbound dependencies (circuit breaker, jittered backoff, latency window)."""
+
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from typing import Deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with half-open probing.
+
+    - closed: calls pass; `failure_threshold` consecutive failures open the breaker.
+    - open: calls are rejected until `reset_timeout` seconds have passed.
+    - half_open: up to `half_open_max` probe calls pass; a success closes, a failure re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max: int = 1) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = max(0.0, float(reset_timeout))
+        self.half_open_max = max(1, int(half_open_max))
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_max:
+            self._probes += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._trip()
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._trip()
+
+    def release(self) -> None:
+        """Hand back a half-open probe slot whose call ended without an answer either way."""
+        if self._state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._failures = 0
+        self._probes = 0
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0.0, min(cap, base * (2 ** max(0, attempt))))
+
+
+class LatencyWindow:
+    """Ring of recent successful latencies (seconds) used for hedging thresholds."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20) -> None:
+        self._samples: Deque[float] = deque(maxlen=max(1, int(size)))
+        self.min_samples = max(1, int(min_samples))
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, int(round((pct / 100.0) * (len(ordered) - 1)))))
+        return ordered[idx]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import zlib
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from app.config import RESPONSE_VERSION_DEFAULT
+
+# Response format versions for /agent/run and /webchat/message:
+#   1  search results embedded in `response` as "[SEARCH_CACHE]{json}" and repeated in data.listings
+#   2  results sent once in data.listings, projected (fields / max_images); text stays plain
+LATEST_RESPONSE_VERSION = 2
+
+# v2 defaults: the chat cards only render the cover image.
+DEFAULT_MAX_IMAGES = 1
+
+
+def response_version(requested: Optional[int], header: Optional[str]) -> int:
+    """Body field wins over the `X-Response-Version` header; both fall back to RESPONSE_VERSION_DEFAULT."""
+    version = requested
+    if version is None and header:
+        try:
+            version = int(header)
+        except ValueError:
+            version = None
+    if version is None:
+        version = RESPONSE_VERSION_DEFAULT
+    return max(1, min(LATEST_RESPONSE_VERSION, version))
+
+
+def project_listings(
+    rows: Iterable[dict[str, Any]], fields: Optional[list[str]] = None, max_images: Optional[int] = DEFAULT_MAX_IMAGES
+) -> list[dict[str, Any]]:
+    """Keep only `fields` (all when None) and at most `max_images` image URLs per listing."""
+    wanted = set(fields) if fields else None
+    out: list[dict[str, Any]] = []
+    for row in rows:
+        item = {k: v for k, v in row.items() if wanted is None or k in wanted or k == "id"}
+        images = item.get("images")
+        if max_images is not None and isinstance(images, list):
+            item["images"] = images[: max(0, max_images)]
+        out.append(item)
+    return out
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """gzip a streamed body, flushing after every chunk.
+
+    GZipMiddleware only emits compressed bytes once zlib's window fills, which holds back a
+    slow NDJSON stream; a response that sets Content-Encoding itself is passed through.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,82 @@
+"""Bounded in-memory conversation sessions.
+
+One `Session` per (user_id, source) keeps a ring of the last `max_turns` turns (text
+truncated) and a small derived context: the last intent and the last search (query and
+time). Clients no longer need to resend `conversation_history`; when they do and the
+session is empty (new instance, eviction) its tail seeds the ring once.
+
+Sessions live in an insertion-ordered dict kept in least-recently-used order, bounded by
+`max_sessions`; sessions idle longer than `idle_ttl` are dropped from the cold end. Like
+the rate limiter and the user lanes, the store is per process.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Iterable
+
+from app.config import SESSION_IDLE_TTL_S, SESSION_MAX_SESSIONS, SESSION_MAX_TURNS, SESSION_TURN_MAX_CHARS
+
+
+class Session:
+    __slots__ = ("turns", "context", "touched")
+
+    def __init__(self, max_turns: int) -> None:
+        self.turns: deque[tuple[str, str, float]] = deque(maxlen=max_turns)  # (role, text, unix ts)
+        self.context: dict[str, Any] = {}
+        self.touched = time.monotonic()
+
+    def add(self, role: str, text: str, max_chars: int = SESSION_TURN_MAX_CHARS) -> None:
+        self.turns.append((role, (text or "")[:max_chars], time.time()))
+
+    def seed(self, history: Iterable[dict[str, Any]]) -> None:
+        """Fill an empty ring from client-sent history ({"role", "content"} items, oldest first)."""
+        if self.turns:
+            return
+        for item in list(history)[-(self.turns.maxlen or 0) :]:
+            if isinstance(item, dict) and isinstance(item.get("content"), str):
+                self.add(str(item.get("role") or "user"), item["content"])
+
+    def recent_search(self, window_s: float) -> dict[str, Any] | None:
+        last = self.context.get("last_search")
+        if isinstance(last, dict) and time.time() - float(last.get("ts") or 0.0) <= window_s:
+            return last
+        return None
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 50_000, max_turns: int = 20, idle_ttl: float = 3600.0) -> None:
+        self.max_sessions = max(1, int(max_sessions))
+        self.max_turns = max(1, int(max_turns))
+        self.idle_ttl = float(idle_ttl)
+        self._sessions: OrderedDict[tuple[str, str], Session] = OrderedDict()
+        self._calls = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        sessions = self._sessions
+        while sessions:
+            key, session = next(iter(sessions.items()))
+            if len(sessions) <= self.max_sessions and now - session.touched < self.idle_ttl:
+                break
+            del sessions[key]
+
+    def get(self, user_id: str, source: str) -> Session:
+        now = time.monotonic()
+        key = (user_id, source)
+        session = self._sessions.get(key)
+        if session is None or now - session.touched >= self.idle_ttl:
+            session = self._sessions[key] = Session(self.max_turns)
+        else:
+            self._sessions.move_to_end(key)
+        session.touched = now
+        self._calls += 1
+        if len(self._sessions) > self.max_sessions or not self._calls & 1023:
+            self._evict(now)
+        return session
+
+
+sessions = SessionStore(SESSION_MAX_SESSIONS, SESSION_MAX_TURNS, SESSION_IDLE_TTL_S)
@@ -0,0 +1,74 @@
+"""Backfill listings.province_code / district_code from the free-text `location` column.
+
+    python -m app.maintenance.location_codes                    # all listings without codes
+    python -m app.maintenance.location_codes --batch-size 1000
+
+Run after the migration in DEPLOYMENT.md. Rows are read in keyset order on `id`
+(`id > last_id ORDER BY id LIMIT n`, so every page is an index range scan however far
+the run has got) and written back with one UPDATE ... WHERE id IN (...) per distinct
+code pair in the page. Locations the gazetteer cannot resolve keep NULL codes; running
+the command again only revisits those.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Optional
+
+from app.services.gazetteer import location_codes
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger("pazarglobal.maintenance")
+
+
+def backfill_location_codes(supabase: Client, batch_size: int = 500) -> dict[str, int]:
+    stats = {"scanned": 0, "resolved": 0, "unresolved": 0, "updates": 0}
+    last_id: Optional[str] = None
+    while True:
+        query = supabase.table("listings").select("id,location").is_("province_code", "null")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows: list[dict[str, Any]] = query.order("id").limit(batch_size).execute().data or []
+        if not rows:
+            break
+        last_id = str(rows[-1]["id"])
+
+        by_codes: dict[tuple[int, Optional[int]], list[str]] = defaultdict(list)
+        for row in rows:
+            province_code, district_code = location_codes(str(row.get("location") or ""))
+            if province_code is None:
+                stats["unresolved"] += 1
+                continue
+            by_codes[(province_code, district_code)].append(str(row["id"]))
+        for (province_code, district_code), ids in by_codes.items():
+            supabase.table("listings").update({"province_code": province_code, "district_code": district_code}).in_(
+                "id", ids
+            ).execute()
+            stats["updates"] += 1
+            stats["resolved"] += len(ids)
+
+        stats["scanned"] += len(rows)
+        logger.info("scanned=%d resolved=%d last_id=%s", stats["scanned"], stats["resolved"], last_id)
+        if len(rows) < batch_size:
+            break
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from app.clients.supabase import get_supabase
+
+    logging.basicConfig(level="INFO", format="%(asctime)s %(name)s %(message)s")
+    stats = backfill_location_codes(get_supabase(), max(1, args.batch_size))
+    print(", ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Pre-fork multi-worker launcher.
+
+    python -m app.prefork --workers 4 --port $PORT
+    python -m app.prefork --workers 4 --no-preload      # fork first, import per worker
+
+`uvicorn --workers N` spawns fresh interpreters, so every worker re-imports the app and
+rebuilds the category taxonomy, intent tables, city lists, templates and regex caches.
+Here the master imports the app and runs `app.core.preload.preload()` once, moves every
+object it created out of GC tracking (`gc.freeze()`, so collections in the workers do
+not write to those pages) and only then forks. The workers share the listening socket
+and all of that memory copy-on-write. The master restarts crashed workers and forwards
+SIGTERM/SIGINT.
+
+State that is per process stays per worker: rate-limit buckets, per-user lanes and the
+OpenAI breaker. Route a user to one worker (or run one worker per instance) if those
+need to be global. The local draft store's file is shared; a lease in it lets one
+worker at a time replicate its outbox.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any
+
+logger = logging.getLogger("pazarglobal.prefork")
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app_ref: str, app: Any, sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app if app is not None else app_ref, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(app_ref: str, host: str, port: int, workers: int, preload: bool, log_level: str, backlog: int = 2048) -> None:
+    app: Any = None
+    if preload:
+        from uvicorn.importer import import_from_string
+
+        from app.core.preload import preload as preload_tables
+
+        started = time.perf_counter()
+        app = import_from_string(app_ref)
+        built = preload_tables()
+        gc.collect()
+        gc.freeze()
+        logger.info(
+            "preloaded in %.0f ms (%s); %d objects frozen",
+            (time.perf_counter() - started) * 1000.0,
+            ", ".join(f"{k}={v}" for k, v in built.items()),
+            gc.get_freeze_count(),
+        )
+
+    sock = _bind(host, port, backlog)
+    children: dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app_ref, app, sock, log_level)
+            except BaseException:
+                logger.exception("worker %d crashed", slot)
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = slot
+
+    def stop(signum: int, _frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("listening on %s:%d with %d workers (preload=%s)", host, port, workers, preload)
+    for slot in range(workers):
+        spawn(slot)
+
+    restarts: list[float] = []
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        now = time.monotonic()
+        restarts = [t for t in restarts if now - t < 60.0] + [now]
+        logger.warning("worker %d (pid %d) exited with %d; restarting", slot, pid, os.waitstatus_to_exitcode(status))
+        if len(restarts) > workers * 5:
+            # Crash loop: back off instead of forking as fast as the workers die.
+            time.sleep(1.0)
+        spawn(slot)
+    sock.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="main:app")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT") or 8000))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1))
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="fork before importing the app")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if sys.platform == "win32":
+        raise SystemExit("pre-fork mode needs os.fork(); use `uvicorn main:app` on Windows")
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(message)s")
+    serve(args.app, args.host, args.port, max(1, args.workers), args.preload, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
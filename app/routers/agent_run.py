@@ -1,55 +1,270 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import math
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 
-from app.clients.openai import openai_chat
+from app.clients.openai import openai_available, openai_chat
 from app.clients.supabase import get_supabase
-from app.config import OPENAI_API_KEY
+from app.config import (
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_COSTS,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_PER_MINUTE,
+    RATE_LIMIT_RESPONSE,
+    SESSION_REFINE_WINDOW_S,
+)
+from app.core.admission import Overloaded, admission
+from app.core.deadline import HEADER as DEADLINE_HEADER
+from app.core.deadline import allows as deadline_allows
+from app.core.deadline import deadline_scope, request_budget
+from app.core.deadline import reserve as deadline_reserve
+from app.core.deadline import remaining as deadline_remaining
+from app.core.fanout import gather_blocking, start_blocking
 from app.core.helpers import detect_intent, is_uuid, normalize_phone, now_iso
+from app.core.lanes import user_lanes
+from app.core.metrics import DEADLINE_SKIPPED, RATE_LIMITED, REQUEST_SECONDS
+from app.core.ratelimit import TokenBucketLimiter
+from app.core.request_stats import current_stats, phase
+from app.core.responses import DEFAULT_MAX_IMAGES, project_listings, response_version
+from app.core.sessions import Session, sessions
 from app.schemas import AgentRunRequest
 from app.services.audit import append_audit
-from app.services.drafts import get_or_create_draft, patch_draft_fields, store_media_urls, draft_missing_fields, format_preview
+from app.services.drafts import (
+    delete_user_drafts,
+    draft_missing_fields,
+    format_preview,
+    get_or_create_draft,
+    latest_draft,
+    patch_draft_fields,
+)
 from app.services.parsing import extract_simple_fields
 from app.services.description_composer import compose_description, enrich_title, get_description_question
 from app.services.publish import publish_listing_from_draft
+from app.services.facets import facet_hint, listing_facets
+from app.services.media import attach_media
+from app.services.gazetteer import extract_place
 from app.services.search import search_listings
+from app.services.spelling import correct_query
+from app.services.vision import attach_vision
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 router = APIRouter()
 
+rate_limiter = TokenBucketLimiter(RATE_LIMIT_BURST, RATE_LIMIT_PER_MINUTE / 60.0, max_keys=RATE_LIMIT_MAX_KEYS)
 
-async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[str, Any]:
-    supabase = get_supabase()
 
-    user_id = payload.user_id
+def _rate_limit_keys(payload: AgentRunRequest) -> tuple[str, ...]:
     phone = normalize_phone(payload.phone)
-    if not phone and is_uuid(user_id):
+    return (f"u:{payload.user_id}", f"p:{phone}" if phone else "")
+
+
+def _without_place(text: str) -> tuple[str, bool]:
+    """`text` with the place mention removed, and whether a place was found."""
+    place = extract_place(text)
+    if place is None:
+        return text, False
+    for start, end in sorted(place.spans, reverse=True):
+        while end < len(text) and not text[end].isspace():  # case suffix: "ankara'da", "kadıköyde"
+            end += 1
+        text = text[:start] + " " + text[end:]
+    return " ".join(text.split()), True
+
+
+def _refined_query(session: Session | None, message: str) -> str:
+    """A bare location right after a search re-runs it there: "iphone" then "istanbul" searches "iphone istanbul"."""
+    last = session.recent_search(SESSION_REFINE_WINDOW_S) if session is not None else None
+    if not last or not last.get("base"):
+        return message
+    rest, found = _without_place(message)
+    if not found or any(ch.isalnum() for ch in rest):
+        return message
+    return f"{last['base']} {message}"
+
+
+def _session_source(payload: AgentRunRequest) -> str:
+    ctx = payload.user_context if isinstance(payload.user_context, dict) else {}
+    session_ctx = ctx.get("session") if isinstance(ctx.get("session"), dict) else {}
+    return str(session_ctx.get("source") or "whatsapp")
+
+
+def _remember(session: Session, payload: AgentRunRequest, result: dict[str, Any]) -> None:
+    intent = str(result.get("intent") or "")
+    session.context["last_intent"] = intent
+    text = str(result.get("response") or "")
+    session.add("assistant", text.split("[SEARCH_CACHE]", 1)[0].rstrip())
+    if intent == "search_completed":
+        data = result.get("data") if isinstance(result.get("data"), dict) else {}
+        query = str(data.get("query") or "") or _refined_query(session, payload.message)
+        base, _ = _without_place(query)
+        session.context["last_search"] = {"query": query, "base": base, "ts": time.time()}
+
+
+def _facet_line(facets: dict[str, Any] | None) -> str:
+    hint = facet_hint(facets)
+    return f"Filtre önerisi: {hint}\n\n" if hint else ""
+
+
+def _search_reply(
+    payload: AgentRunRequest,
+    request: Request | None,
+    confidence: float,
+    results: list[dict[str, Any]],
+    facets: dict[str, Any] | None,
+    lead: str,
+    query: str | None = None,
+) -> dict[str, Any]:
+    """search_completed turn in the response version the client asked for."""
+    query = query or payload.message
+    header = request.headers.get("x-response-version") if request is not None else None
+    if response_version(payload.response_version, header) >= 2:
+        max_images = payload.max_images if payload.max_images is not None else DEFAULT_MAX_IMAGES
+        return {
+            "success": True,
+            "intent": "search_completed",
+            "confidence": confidence,
+            "response": f"{lead}\n\n{_facet_line(facets)}".rstrip(),
+            "data": {
+                "listings": project_listings(results, payload.listing_fields, max_images),
+                "facets": facets,
+                "query": query,
+                "ts": now_iso(),
+            },
+            "version": 2,
+        }
+    cache: dict[str, Any] = {"results": results, "query": query, "ts": now_iso()}
+    return {
+        "success": True,
+        "intent": "search_completed",
+        "confidence": confidence,
+        "response": f"{lead}\n\n{_facet_line(facets)}[SEARCH_CACHE]{json.dumps(cache, ensure_ascii=False)}",
+        "data": {"listings": results, "facets": facets},
+    }
+
+
+def _rate_limited_response(retry_after: float) -> dict[str, Any]:
+    seconds = max(1, math.ceil(retry_after))
+    if RATE_LIMIT_RESPONSE == "429":
+        raise HTTPException(
+            status_code=429,
+            detail="Çok fazla istek. Lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(seconds)},
+        )
+    return {
+        "success": True,
+        "intent": "rate_limited",
+        "response": f"⏳ Kısa sürede çok fazla mesaj aldım. Lütfen {seconds} saniye sonra tekrar yazın.",
+        "retry_after": seconds,
+    }
+
+
+def _deadline_response() -> dict[str, Any]:
+    return {
+        "success": True,
+        "intent": "deadline_exceeded",
+        "response": "⏳ Yanıtım gecikti, kusura bakmayın. Mesajınızı tekrar gönderir misiniz?",
+    }
+
+
+def _context_display_name(payload: AgentRunRequest) -> str | None:
+    ctx = payload.user_context
+    if not isinstance(ctx, dict):
+        return None
+    return ctx.get("display_name") or ctx.get("full_name") or ctx.get("name")
+
+
+class _ProfileLookup:
+    """The user's `profiles` row, fetched in a thread as soon as the turn starts.
+
+    Only the audit log (phone) and the small-talk greeting (display name) read it, so the
+    turn does its own queries meanwhile and waits for the row only where it is used.
+    """
+
+    def __init__(self, supabase: Client, payload: AgentRunRequest, intent: str) -> None:
+        self.known_phone = normalize_phone(payload.phone)
+        columns: list[str] = []
+        if not self.known_phone:
+            columns.append("phone")
+        if intent == "SMALL_TALK" and not _context_display_name(payload):
+            columns += ["display_name", "full_name"]
+        self._task: asyncio.Future[dict[str, Any]] | None = None
+        if columns and is_uuid(payload.user_id):
+            self._task = start_blocking(partial(self._fetch, supabase, payload.user_id, ",".join(columns)))
+
+    @staticmethod
+    def _fetch(supabase: Client, user_id: str, columns: str) -> dict[str, Any]:
         try:
-            profile_res = supabase.table("profiles").select("phone").eq("id", user_id).limit(1).execute()
+            profile_res = supabase.table("profiles").select(columns).eq("id", user_id).limit(1).execute()
             rows = (profile_res.data or []) if hasattr(profile_res, "data") else []
-            if rows and isinstance(rows[0], dict):
-                phone = normalize_phone(rows[0].get("phone"))
+            return rows[0] if rows and isinstance(rows[0], dict) else {}
         except Exception:
-            phone = None
+            return {}
 
-    intent, confidence = detect_intent(payload.message)
+    async def row(self) -> dict[str, Any]:
+        return await self._task if self._task is not None else {}
 
-    if intent == "SMALL_TALK":
-        display_name: str | None = None
-        if isinstance(payload.user_context, dict):
-            display_name = payload.user_context.get("display_name") or payload.user_context.get("full_name") or payload.user_context.get("name")
+    async def phone(self) -> str | None:
+        return self.known_phone or normalize_phone((await self.row()).get("phone"))
 
-        if not display_name and is_uuid(user_id):
-            try:
-                profile_res = supabase.table("profiles").select("display_name,full_name").eq("id", user_id).limit(1).execute()
-                rows = (profile_res.data or []) if hasattr(profile_res, "data") else []
-                if rows and isinstance(rows[0], dict):
-                    display_name = rows[0].get("display_name") or rows[0].get("full_name")
-            except Exception:
-                display_name = None
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+
+async def _search(supabase: Client, query: str) -> tuple[list[dict[str, Any]], dict[str, Any] | None, str]:
+    """Listings and facet counts for `query` with misspelt terms corrected, looked up concurrently.
+
+    Also returns the corrected query, which the reply and the session remember.
+    """
+    query = correct_query(supabase, query)
+    found = await gather_blocking(
+        results=partial(search_listings, supabase, query), facets=partial(listing_facets, supabase, query)
+    )
+    return found["results"], found["facets"], query
+
+
+async def handle_agent_run(
+    payload: AgentRunRequest,
+    request: Request,
+    detected: tuple[str, float] | None = None,
+    session: Session | None = None,
+) -> dict[str, Any]:
+    supabase = get_supabase()
+    intent, confidence = detected or detect_intent(payload.message)
+    profile = _ProfileLookup(supabase, payload, intent)
+    try:
+        return await _run_intent(supabase, payload, request, intent, confidence, session, profile)
+    finally:
+        profile.cancel()
+
+
+async def _run_intent(
+    supabase: Client,
+    payload: AgentRunRequest,
+    request: Request,
+    intent: str,
+    confidence: float,
+    session: Session | None,
+    profile: _ProfileLookup,
+) -> dict[str, Any]:
+    user_id = payload.user_id
+
+    async def audit(action: str, status: int = 200, error: str | None = None) -> None:
+        append_audit(supabase, user_id, await profile.phone(), action, payload.audit_dump(), status, error)
+
+    if intent == "SMALL_TALK":
+        row = await profile.row()
+        display_name = _context_display_name(payload) or row.get("display_name") or row.get("full_name")
 
         if isinstance(display_name, str):
             display_name = display_name.strip()
@@ -57,7 +272,7 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
             response_text = "Selam! PazarGlobal'e hoş geldiniz. Size nasıl yardımcı olabilirim? İlan vermek ya da ilan aramak için yazabilirsiniz."
         else:
             response_text = f"Selam {display_name}! PazarGlobal'e hoş geldiniz. Size nasıl yardımcı olabilirim? İlan vermek ya da ilan aramak için yazabilirsiniz."
-        append_audit(supabase, user_id, phone, "small_talk", payload.model_dump(), 200)
+        await audit("small_talk")
         return {
             "success": True,
             "intent": "small_talk",
@@ -66,23 +281,19 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
         }
 
     if intent == "SEARCH_LISTING":
-        results = search_listings(supabase, payload.message)
-        cache: dict[str, Any] = {"results": results, "query": payload.message, "ts": now_iso()}
-        response_text = (
-            "🔎 Bulabildiğim ilanlar aşağıda. İsterseniz filtre de söyleyin (şehir, bütçe, kategori).\n\n"
-            f"[SEARCH_CACHE]{json.dumps(cache, ensure_ascii=False)}"
+        query = _refined_query(session, payload.message)
+        results, facets, query = await _search(supabase, query)
+        await audit("search_listings")
+        return _search_reply(
+            payload,
+            request,
+            confidence,
+            results,
+            facets,
+            "🔎 Bulabildiğim ilanlar aşağıda. İsterseniz filtre de söyleyin (şehir, bütçe, kategori).",
+            query=query,
         )
 
-        append_audit(supabase, user_id, phone, "search_listings", payload.model_dump(), 200)
-
-        return {
-            "success": True,
-            "intent": "search_completed",
-            "confidence": confidence,
-            "response": response_text,
-            "data": {"listings": results},
-        }
-
     if intent == "AMBIGUOUS":
         patch = extract_simple_fields(payload.message)
 
@@ -94,7 +305,8 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
 
             media_urls = payload.media_paths or []
             if media_urls and draft_id:
-                draft = store_media_urls(supabase, draft_id, media_urls)
+                draft, _ = await attach_media(supabase, draft_id, media_urls)
+                draft = await attach_vision(supabase, draft_id, draft)
 
             if patch and draft_id:
                 draft = patch_draft_fields(supabase, draft_id, patch)
@@ -116,7 +328,7 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
             + "2️⃣ Benzer ilanları aramak istiyorsanız → 'ara' veya 'bul' yazın"
         )
 
-        append_audit(supabase, user_id, phone, "intent_clarify", payload.model_dump(), 200)
+        await audit("intent_clarify")
         return {
             "success": True,
             "intent": "intent_clarify",
@@ -154,7 +366,7 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
 
         # If message doesn't look like listing info, respond with a gentle prompt
         if intent == "UNKNOWN" and not patch:
-            append_audit(supabase, user_id, phone, "unknown_no_listing", payload.model_dump(), 200)
+            await audit("unknown_no_listing")
             return {
                 "success": True,
                 "intent": "unknown",
@@ -162,22 +374,19 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
                 "response": "Size nasıl yardımcı olabilirim? İlan vermek istiyorsanız ürün bilgilerini, ilan aramak istiyorsanız aradığınız ürünü yazabilirsiniz.",
             }
 
+        # The latest draft is read at most once per turn: the location-only check, the
+        # stale-draft check and the draft flow below share it.
+        known_draft: dict[str, Any] | None = None
+        draft_known = False
+
         if intent == "UNKNOWN" and _is_location_only(patch):
             # Check if there's an active recent draft that needs location
             # BUT don't create a draft just for this check
             if is_uuid(user_id):
                 try:
-                    existing = (
-                        supabase.table("active_drafts")
-                        .select("*")
-                        .eq("user_id", user_id)
-                        .order("updated_at", desc=True)
-                        .limit(1)
-                        .execute()
-                    )
-                    rows = (existing.data or []) if hasattr(existing, "data") else []
-                    if rows:
-                        draft = rows[0]
+                    draft = known_draft = latest_draft(supabase, user_id)
+                    draft_known = True
+                    if draft:
                         missing = draft_missing_fields(draft)
                         # Only use draft if it's recent AND needs location
                         if "location" in missing and _draft_recent(draft, 30):
@@ -185,80 +394,67 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
                             pass
                         else:
                             # This is a search query, not draft completion
-                            results = search_listings(supabase, payload.message)
-                            cache: dict[str, Any] = {"results": results, "query": payload.message, "ts": now_iso()}
-                            response_text = (
+                            query = _refined_query(session, payload.message)
+                            results, facets, query = await _search(supabase, query)
+                            await audit("search_location_only")
+                            return _search_reply(
+                                payload,
+                                request,
+                                confidence,
+                                results,
+                                facets,
                                 f"🔎 Şehir filtresi olarak algıladım. {payload.message} için bulabildiğim ilanlar aşağıda. "
-                                "İsterseniz bütçe veya kategori de söyleyin.\n\n"
-                                f"[SEARCH_CACHE]{json.dumps(cache, ensure_ascii=False)}"
+                                "İsterseniz bütçe veya kategori de söyleyin.",
+                                query=query,
                             )
-
-                            append_audit(supabase, user_id, phone, "search_location_only", payload.model_dump(), 200)
-                            return {
-                                "success": True,
-                                "intent": "search_completed",
-                                "confidence": confidence,
-                                "response": response_text,
-                                "data": {"listings": results},
-                            }
                     else:
                         # No draft exists, this is definitely a search
-                        results = search_listings(supabase, payload.message)
-                        cache: dict[str, Any] = {"results": results, "query": payload.message, "ts": now_iso()}
-                        response_text = (
+                        query = _refined_query(session, payload.message)
+                        results, facets, query = await _search(supabase, query)
+                        await audit("search_location_only")
+                        return _search_reply(
+                            payload,
+                            request,
+                            confidence,
+                            results,
+                            facets,
                             f"🔎 Şehir filtresi olarak algıladım. {payload.message} için bulabildiğim ilanlar aşağıda. "
-                            "İsterseniz bütçe veya kategori de söyleyin.\n\n"
-                            f"[SEARCH_CACHE]{json.dumps(cache, ensure_ascii=False)}"
+                            "İsterseniz bütçe veya kategori de söyleyin.",
+                            query=query,
                         )
-
-                        append_audit(supabase, user_id, phone, "search_location_only", payload.model_dump(), 200)
-                        return {
-                            "success": True,
-                            "intent": "search_completed",
-                            "confidence": confidence,
-                            "response": response_text,
-                            "data": {"listings": results},
-                        }
                 except Exception:
                     # Error checking draft, treat as search
-                    results = search_listings(supabase, payload.message)
-                    cache: dict[str, Any] = {"results": results, "query": payload.message, "ts": now_iso()}
-                    response_text = (
+                    query = _refined_query(session, payload.message)
+                    results, facets, query = await _search(supabase, query)
+                    await audit("search_location_only")
+                    return _search_reply(
+                        payload,
+                        request,
+                        confidence,
+                        results,
+                        facets,
                         f"🔎 Şehir filtresi olarak algıladım. {payload.message} için bulabildiğim ilanlar aşağıda. "
-                        "İsterseniz bütçe veya kategori de söyleyin.\n\n"
-                        f"[SEARCH_CACHE]{json.dumps(cache, ensure_ascii=False)}"
+                        "İsterseniz bütçe veya kategori de söyleyin.",
+                        query=query,
                     )
 
-                    append_audit(supabase, user_id, phone, "search_location_only", payload.model_dump(), 200)
-                    return {
-                        "success": True,
-                        "intent": "search_completed",
-                        "confidence": confidence,
-                        "response": response_text,
-                        "data": {"listings": results},
-                    }
-
         if intent == "UNKNOWN" and patch:
             has_title_or_category = any(k in patch for k in ["title", "category"])
             has_price_or_location = any(k in patch for k in ["price", "location"])
             if has_title_or_category and not has_price_or_location:
-                results = search_listings(supabase, payload.message)
-                cache: dict[str, Any] = {"results": results, "query": payload.message, "ts": now_iso()}
-                response_text = (
+                results, facets, query = await _search(supabase, payload.message)
+                await audit("search_query_unknown")
+                return _search_reply(
+                    payload,
+                    request,
+                    confidence,
+                    results,
+                    facets,
                     "🔎 Bunu arama talebi olarak algıladım. Bulabildiğim ilanlar aşağıda. "
-                    "İsterseniz şehir, bütçe veya kategori de söyleyin.\n\n"
-                    f"[SEARCH_CACHE]{json.dumps(cache, ensure_ascii=False)}"
+                    "İsterseniz şehir, bütçe veya kategori de söyleyin.",
+                    query=query,
                 )
 
-                append_audit(supabase, user_id, phone, "search_query_unknown", payload.model_dump(), 200)
-                return {
-                    "success": True,
-                    "intent": "search_completed",
-                    "confidence": confidence,
-                    "response": response_text,
-                    "data": {"listings": results},
-                }
-
         # ⭐ YENİ MANTIK: Eski draft'ı sadece şu durumlarda sil:
         # 1. Eski draft TAMAMLANMIŞ (eksik alan yok)
         # 2. VE yeni bir ilan bilgisi (title+price gibi) gelmiş
@@ -267,18 +463,10 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
         
         if intent in ["CREATE_LISTING", "UNKNOWN"] and patch:
             try:
-                existing = (
-                    supabase.table("active_drafts")
-                    .select("*")
-                    .eq("user_id", user_id)
-                    .order("updated_at", desc=True)
-                    .limit(1)
-                    .execute()
-                )
-                rows = (existing.data or []) if hasattr(existing, "data") else []
-                
-                if rows:
-                    old_draft = rows[0]
+                old_draft = known_draft if draft_known else latest_draft(supabase, user_id)
+                known_draft, draft_known = old_draft, True
+
+                if old_draft:
                     missing_fields = draft_missing_fields(old_draft)
                     
                     # Eski draft tamamlanmışsa VE yeni tam bilgi (title+price) geliyorsa → yeni ilan başlatıyoruz
@@ -297,18 +485,22 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
         
         if should_clear_old_draft:
             try:
-                supabase.table("active_drafts").delete().eq("user_id", user_id).execute()
+                delete_user_drafts(supabase, user_id)
             except Exception:
                 pass
 
-        draft = get_or_create_draft(supabase, user_id)
+        if known_draft and not should_clear_old_draft:
+            draft = known_draft
+        else:
+            draft = get_or_create_draft(supabase, user_id)
 
         media_urls = payload.media_paths or []
         if media_urls:
             draft_id = draft.get("id")
             if not draft_id or not isinstance(draft_id, str):
                 raise HTTPException(status_code=500, detail="Draft ID eksik")
-            draft = store_media_urls(supabase, draft_id, media_urls)
+            draft, _ = await attach_media(supabase, draft_id, media_urls)
+            draft = await attach_vision(supabase, draft_id, draft)
 
         if patch:
             draft_id = draft.get("id")
@@ -337,7 +529,7 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
             }
             question = ask_map.get(missing[0]) or "Biraz daha detay yazar mısınız?"
 
-            append_audit(supabase, user_id, phone, "draft_collect", payload.model_dump(), 200)
+            await audit("draft_collect")
             return {
                 "success": True,
                 "intent": "draft_collect",
@@ -357,7 +549,7 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
                     draft_id = draft.get("id")
                     if isinstance(draft_id, str):
                         draft = patch_draft_fields(supabase, draft_id, {"description_pending": True})
-                    append_audit(supabase, user_id, phone, "description_collect", payload.model_dump(), 200)
+                    await audit("description_collect")
                     return {
                         "success": True,
                         "intent": "description_collect",
@@ -389,7 +581,7 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
                     draft = patch_draft_fields(supabase, draft_id, updated_patch)
 
         preview = format_preview(draft)
-        append_audit(supabase, user_id, phone, "draft_preview", payload.model_dump(), 200)
+        await audit("draft_preview")
         return {
             "success": True,
             "intent": "draft_preview",
@@ -416,7 +608,7 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
         created = await publish_listing_from_draft(supabase, user_id, draft)
         response_text = f"✅ İlan yayınlandı!\nID: {created.get('id')}"
 
-        append_audit(supabase, user_id, phone, "publish", payload.model_dump(), 200)
+        await audit("publish")
         return {
             "success": True,
             "intent": "completion_published",
@@ -428,25 +620,26 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
         if is_uuid(user_id):
             try:
                 # Delete draft instead of just marking as cancelled
-                supabase.table("active_drafts").delete().eq("user_id", user_id).execute()
+                delete_user_drafts(supabase, user_id)
             except Exception:
                 pass
-        append_audit(supabase, user_id, phone, "cancel", payload.model_dump(), 200)
+        await audit("cancel")
         return {"success": True, "intent": "completion_cancelled", "response": "✅ İşlem iptal edildi. Yeni bir işlem için mesaj gönderebilirsiniz."}
 
-    if OPENAI_API_KEY:
+    if openai_available() and deadline_allows("llm_fallback"):
         try:
             system = (
                 "Sen PazarGlobal ilan asistanısın. Kısa ve net cevap ver.\n"
                 "Kullanıcı ilan vermek veya ilan aramak isteyebilir. Emin değilsen tek bir netleştirici soru sor."
             )
-            text = await openai_chat(system, payload.message)
-            append_audit(supabase, user_id, phone, "llm_fallback", payload.model_dump(), 200)
+            with deadline_reserve():
+                text = await openai_chat(system, payload.message)
+            await audit("llm_fallback")
             return {"success": True, "intent": "llm_fallback", "response": text}
         except Exception as e:
-            append_audit(supabase, user_id, phone, "llm_fallback", payload.model_dump(), 500, str(e))
+            await audit("llm_fallback", 500, str(e))
 
-    append_audit(supabase, user_id, phone, "unknown", payload.model_dump(), 200)
+    await audit("unknown")
     return {
         "success": True,
         "intent": "unknown",
@@ -455,5 +648,75 @@ async def handle_agent_run(payload: AgentRunRequest, request: Request) -> dict[s
 
 
 @router.post("/agent/run")
+async def agent_run_route(payload: AgentRunRequest, request: Request) -> ORJSONResponse:
+    # Replies are plain JSON types already; rendering them directly skips FastAPI's
+    # jsonable_encoder pass, which costs more than the orjson encoding itself.
+    return ORJSONResponse(await agent_run(payload, request))
+
+
+async def _run_turn(payload: AgentRunRequest, request: Request, detected: tuple[str, float]) -> dict[str, Any]:
+    # Same-user turns are serialized so draft read-modify-write cycles never interleave.
+    async with user_lanes.hold(payload.user_id):
+        session = sessions.get(payload.user_id, _session_source(payload))
+        if payload.conversation_history:
+            session.seed(payload.conversation_history)
+        session.add("user", payload.message)
+        result = await handle_agent_run(payload, request, detected, session)
+        _remember(session, payload, result)
+    return result
+
+
+async def guarded(keys: tuple[str, ...], label: str, turn: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+    """Run `turn` behind the per-user rate limit, admission control and the request deadline.
+
+    `label` is the intent (RATE_LIMIT_COSTS key). The caller holds the `deadline_scope`.
+    Returns the turn's reply, or the rate-limited / deadline reply; a shed turn raises 503.
+    """
+    cost = RATE_LIMIT_COSTS.get(label, 1.0)
+    if RATE_LIMIT_ENABLED:
+        # Checked before any I/O so a flooding client costs no database or OpenAI calls.
+        wait = rate_limiter.acquire(keys, cost)
+        if wait > 0:
+            RATE_LIMITED.inc(label)
+            return _rate_limited_response(wait)
+
+    try:
+        # Cheap intents are admitted first when the worker is saturated.
+        async with admission.hold(cost, label, max_wait=deadline_remaining()):
+            # Optional steps already give way as the budget runs low; this stops whatever
+            # is still awaited at the deadline, so the caller gets a reply before giving up.
+            async with asyncio.timeout(deadline_remaining()):
+                return await turn()
+    except Overloaded as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Sunucu şu an yoğun. Lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from None
+    except TimeoutError:
+        DEADLINE_SKIPPED.inc("turn")
+        return _deadline_response()
+
+
 async def agent_run(payload: AgentRunRequest, request: Request) -> dict[str, Any]:
-    return await handle_agent_run(payload, request)
+    started = time.perf_counter()
+    intent_label = "error"
+    budget = request_budget(request.headers.get(DEADLINE_HEADER) if request is not None else None)
+    try:
+        with deadline_scope(budget):
+            with phase("intent"):
+                detected = detect_intent(payload.message)
+            try:
+                result = await guarded(
+                    _rate_limit_keys(payload), detected[0], partial(_run_turn, payload, request, detected)
+                )
+            except HTTPException as exc:
+                intent_label = {503: "shed", 429: "rate_limited"}.get(exc.status_code, "error")
+                raise
+        intent_label = str(result.get("intent") or "unknown")
+        stats = current_stats()
+        if stats is not None and request is not None and request.headers.get("x-debug-timing"):
+            result = {**result, "debug": {"timing": stats.as_debug()}}
+        return result
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, intent_label)
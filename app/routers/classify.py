@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import hmac
+from typing import Any, AsyncIterator
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.config import CLASSIFY_API_TOKENS
+from app.core.responses import gzip_stream
+from app.schemas import ClassifyBatchRequest
+from app.services.classify import classify_batch
+
+router = APIRouter()
+
+
+def _authorize(request: Request) -> None:
+    supplied = (request.headers.get("authorization") or "").removeprefix("Bearer ").strip()
+    # Every token is compared, so the time taken does not tell which one nearly matched.
+    matches = [hmac.compare_digest(supplied, token) for token in CLASSIFY_API_TOKENS]
+    if not supplied or not any(matches):
+        raise HTTPException(status_code=401, detail="Geçersiz API anahtarı")
+
+
+@router.post("/classify/batch", dependencies=[Depends(_authorize)])
+async def classify_batch_endpoint(payload: ClassifyBatchRequest, request: Request) -> StreamingResponse:
+    """Category, extracted fields and keywords per item, streamed as NDJSON in input order.
+
+    One line per item (`index`, the caller's `id`, `category`, `fields`, `keywords`, or
+    `error`), then a trailer `{"done": true, "items": n, "errors": k}`; a stream without
+    the trailer was cut short.
+    """
+    items = [(i, item.id, item.text) for i, item in enumerate(payload.items)]
+
+    async def lines() -> AsyncIterator[bytes]:
+        count = errors = 0
+        async for chunk in classify_batch(items):
+            count += len(chunk)
+            errors += sum(1 for result in chunk if "error" in result)
+            yield b"".join(orjson.dumps(result) + b"\n" for result in chunk)
+        trailer: dict[str, Any] = {"done": True, "items": count, "errors": errors}
+        yield orjson.dumps(trailer) + b"\n"
+
+    if "gzip" in (request.headers.get("accept-encoding") or ""):
+        return StreamingResponse(
+            gzip_stream(lines()),
+            media_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
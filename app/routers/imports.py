@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.clients.supabase import get_supabase
+from app.config import IMPORT_API_TOKEN, IMPORT_MAX_REPORTED_ERRORS
+from app.core.helpers import is_uuid
+from app.services.bulk_import import detect_format, iter_lines, read_rows, run_import
+
+router = APIRouter()
+
+_MAX_JOBS = 100
+# Progress of recent imports in this process, for GET polling while the upload runs.
+_jobs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+
+def _authorize(request: Request) -> None:
+    supplied = (request.headers.get("authorization") or "").removeprefix("Bearer ").strip()
+    if not IMPORT_API_TOKEN or not hmac.compare_digest(supplied, IMPORT_API_TOKEN):
+        raise HTTPException(status_code=401, detail="Geçersiz import anahtarı")
+
+
+def _blocking_chunks(stream: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop) -> Iterator[bytes]:
+    """Pull the request body from the event loop one chunk at a time (called from the import thread)."""
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(stream.__anext__(), loop).result()  # type: ignore[arg-type]
+        except StopAsyncIteration:
+            return
+
+
+@router.post("/listings/import")
+async def import_listings(
+    request: Request, user_id: str, format: str | None = None, dry_run: bool = False, import_id: str | None = None
+) -> dict[str, Any]:
+    """Stream a CSV / JSONL body into `listings`; rows are processed as the upload arrives."""
+    _authorize(request)
+    if not is_uuid(user_id):
+        raise HTTPException(status_code=400, detail="user_id uuid olmalı")
+    fmt = format or detect_format("", request.headers.get("content-type") or "")
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="format csv veya jsonl olmalı")
+    import_id = import_id or str(uuid.uuid4())
+    if import_id in _jobs:
+        raise HTTPException(status_code=409, detail="import_id zaten kullanılıyor")
+
+    job: dict[str, Any] = {"import_id": import_id, "status": "running", "rows": 0, "imported": 0, "failed": 0}
+    _jobs[import_id] = job
+    while len(_jobs) > _MAX_JOBS:
+        _jobs.popitem(last=False)
+    errors: list[dict[str, Any]] = []
+
+    def on_error(n: int, error: str) -> None:
+        if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+            errors.append({"row": n, "error": error})
+
+    supabase = None if dry_run else get_supabase()
+    chunks = _blocking_chunks(request.stream().__aiter__(), asyncio.get_running_loop())
+    try:
+        stats = await asyncio.to_thread(
+            run_import,
+            supabase,
+            read_rows(iter_lines(chunks), fmt),
+            user_id,
+            import_id=import_id,
+            dry_run=dry_run,
+            on_error=on_error,
+            on_progress=job.update,
+        )
+    except Exception:
+        job["status"] = "failed"
+        raise
+    job.update(stats, status="done")
+    return {
+        "success": True,
+        "data": {**stats, "dry_run": dry_run, "errors": errors, "errors_truncated": stats["failed"] > len(errors)},
+    }
+
+
+@router.get("/listings/import/{import_id}")
+async def import_progress(import_id: str, request: Request) -> dict[str, Any]:
+    _authorize(request)
+    job = _jobs.get(import_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import bulunamadı")
+    return {"success": True, "data": dict(job)}
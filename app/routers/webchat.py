@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 
 from app.clients.supabase import get_supabase
+from app.core.deadline import HEADER as DEADLINE_HEADER
+from app.core.deadline import deadline_scope, request_budget
 from app.core.helpers import is_uuid
+from app.core.lanes import user_lanes
 from app.schemas import AgentRunRequest, WebchatMediaAnalyzeRequest, WebchatMessageRequest
 from app.services.audit import append_audit
 from app.services.category_library import get_category_options
-from app.services.drafts import get_or_create_draft, store_media_urls
-from app.routers.agent_run import handle_agent_run
+from app.services.drafts import get_or_create_draft
+from app.services.media import attach_media
+from app.services.vision import attach_vision
+from app.routers.agent_run import agent_run, guarded
 
 router = APIRouter()
 
@@ -21,7 +28,7 @@ def webchat_categories() -> dict[str, Any]:
 
 
 @router.post("/webchat/message")
-async def webchat_message(payload: WebchatMessageRequest, request: Request) -> dict[str, Any]:
+async def webchat_message(payload: WebchatMessageRequest, request: Request) -> ORJSONResponse:
     merged_context: dict[str, Any] = {"session": {"source": "webchat"}}
     if isinstance(payload.user_context, dict):
         ctx_session = payload.user_context.get("session") if isinstance(payload.user_context.get("session"), dict) else {}
@@ -40,29 +47,50 @@ async def webchat_message(payload: WebchatMessageRequest, request: Request) -> d
         draft_listing_id=None,
         session_token=None,
         user_context=merged_context,
+        response_version=payload.response_version,
+        listing_fields=payload.listing_fields,
+        max_images=payload.max_images,
     )
 
-    return await handle_agent_run(run_payload, request)
+    return ORJSONResponse(await agent_run(run_payload, request))
 
 
 @router.post("/webchat/media/analyze")
 async def webchat_media_analyze(payload: WebchatMediaAnalyzeRequest, request: Request) -> dict[str, Any]:
-    supabase = get_supabase()
-
     if not is_uuid(payload.user_id):
         raise HTTPException(status_code=400, detail="user_id uuid olmalı (webchat login gerekli)")
 
-    draft = get_or_create_draft(supabase, payload.user_id)
-    draft_id = draft.get("id")
-    if not draft_id or not isinstance(draft_id, str):
-        raise HTTPException(status_code=500, detail="Draft ID eksik")
-    draft = store_media_urls(supabase, draft_id, payload.media_urls)
+    # Same rate limit, admission and deadline as /agent/run: a batch of images is a fetch,
+    # hash and vision call per image.
+    with deadline_scope(request_budget(request.headers.get(DEADLINE_HEADER))):
+        result = await guarded((f"u:{payload.user_id}",), "MEDIA_ANALYZE", partial(_analyze_media, payload))
+    if "message" not in result:  # rate-limited / deadline reply, worded for chat
+        result = {**result, "message": result.get("response")}
+    return result
+
+
+async def _analyze_media(payload: WebchatMediaAnalyzeRequest) -> dict[str, Any]:
+    supabase = get_supabase()
+
+    async with user_lanes.hold(payload.user_id):
+        draft = get_or_create_draft(supabase, payload.user_id)
+        draft_id = draft.get("id")
+        if not draft_id or not isinstance(draft_id, str):
+            raise HTTPException(status_code=500, detail="Draft ID eksik")
+        draft, dropped = await attach_media(supabase, draft_id, payload.media_urls)
+        draft = await attach_vision(supabase, draft_id, draft)
 
+    received = len(dict.fromkeys(payload.media_urls)) - len(dropped)
+    skipped = f" ({len(dropped)} benzer görsel atlandı)" if dropped else ""
     msg = (
-        f"✅ {len(payload.media_urls)} görsel alındı.\n\n"
+        f"✅ {received} görsel alındı{skipped}.\n\n"
         "İlan başlığını ve fiyatını yazarsanız taslağı tamamlayıp önizleme gönderebilirim."
     )
 
     append_audit(supabase, payload.user_id, None, "webchat_media_analyze", payload.model_dump(), 200)
 
-    return {"success": True, "message": msg, "data": {"draft_listing_id": draft.get("id")}}
+    return {
+        "success": True,
+        "message": msg,
+        "data": {"draft_listing_id": draft.get("id"), "duplicates": dropped},
+    }
@@ -4,29 +4,53 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.config import CLASSIFY_MAX_ITEMS, MAX_HISTORY_ITEMS, MAX_MEDIA_ITEMS, MAX_MESSAGE_CHARS
+
 
 class AgentRunRequest(BaseModel):
     user_id: str
     phone: str | None = None
-    message: str
-    conversation_history: list[dict[str, Any]] = Field(default_factory=list)
-    media_paths: list[str] | None = None
+    message: str = Field(max_length=MAX_MESSAGE_CHARS)
+    # Deprecated: the server keeps its own bounded session (app/core/sessions.py). Still
+    # accepted (capped) so older clients keep working; it only seeds an empty session.
+    conversation_history: list[dict[str, Any]] = Field(default_factory=list, max_length=MAX_HISTORY_ITEMS)
+    media_paths: list[str] | None = Field(default=None, max_length=MAX_MEDIA_ITEMS)
     media_type: str | None = None
     draft_listing_id: str | None = None
     session_token: str | None = None
     user_context: dict[str, Any] | None = None
+    # Response format (app/core/responses.py); None = X-Response-Version header or server default.
+    response_version: int | None = None
+    listing_fields: list[str] | None = None
+    max_images: int | None = None
+
+    def audit_dump(self) -> dict[str, Any]:
+        """Request as stored in audit_logs (without the client-side history)."""
+        return self.model_dump(exclude={"conversation_history"})
 
 
 class WebchatMessageRequest(BaseModel):
     session_id: str | None = None
     user_id: str
-    message: str
+    message: str = Field(max_length=MAX_MESSAGE_CHARS)
     media_url: str | None = None
-    media_urls: list[str] | None = None
+    media_urls: list[str] | None = Field(default=None, max_length=MAX_MEDIA_ITEMS)
     user_context: dict[str, Any] | None = None
+    response_version: int | None = None
+    listing_fields: list[str] | None = None
+    max_images: int | None = None
 
 
 class WebchatMediaAnalyzeRequest(BaseModel):
     session_id: str | None = None
     user_id: str
-    media_urls: list[str] = Field(min_length=1)
+    media_urls: list[str] = Field(min_length=1, max_length=MAX_MEDIA_ITEMS)
+
+
+class ClassifyItem(BaseModel):
+    id: str | None = Field(default=None, max_length=200)
+    text: str = Field(max_length=MAX_MESSAGE_CHARS)
+
+
+class ClassifyBatchRequest(BaseModel):
+    items: list[ClassifyItem] = Field(min_length=1, max_length=CLASSIFY_MAX_ITEMS)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import Any
-
-from supabase import Client
+from typing import TYPE_CHECKING, Any
 
 from app.config import APP_NAME
 from app.core.helpers import is_uuid
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 
 def append_audit(
     supabase: Client,
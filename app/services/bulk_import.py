@@ -0,0 +1,396 @@
+"""Bulk listing import from CSV or JSONL, through the same extraction stack as a chat turn.
+
+    python -m app.services.bulk_import shop.csv --user-id <uuid>
+    python -m app.services.bulk_import shop.jsonl --user-id <uuid> --dry-run --errors errors.jsonl
+
+Columns (CSV header or JSONL keys): `title`, `description`, `category`, `price`,
+`location`, `condition`, `images` (JSON list or "|"-separated URLs) and `text`. `text`
+is free text like a chat message; it and the title/description go through
+`extract_simple_fields`, and explicit columns win over whatever it extracts. Each row
+then gets `normalize_category_id` (`classify_category` when the category is blank),
+`enrich_title`, `compose_description` and `generate_listing_keywords_deterministic`,
+exactly as a published draft would, and becomes a `listings` row with
+`metadata.source = "import"`.
+
+Rows are read lazily and prepared in a process pool in chunks of `batch_size`, with at
+most `workers + 1` chunks in flight; each prepared chunk is one multi-row INSERT (rows of
+a failed INSERT are retried one by one to isolate the bad ones). Memory therefore stays
+bounded by the chunk size whatever the file size. Invalid rows are reported with their
+row number and skipped. Credits are not charged: this is an operator action.
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import logging
+import multiprocessing
+import re
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+import orjson
+
+from app.config import IMPORT_BATCH_SIZE, IMPORT_WORKERS, LOCATION_CODES_ENABLED
+from app.core.helpers import now_iso
+from app.services.category_library import classify_category, normalize_category_id
+from app.services.description_composer import compose_description, description_inputs, enrich_title
+from app.services.gazetteer import extract_place, location_codes
+from app.services.metadata_keywords import generate_listing_keywords_deterministic
+from app.services.parsing import extract_simple_fields
+from app.services.spelling import add_listing
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger("pazarglobal.import")
+
+FORMATS = ("csv", "jsonl")
+_MAX_IMAGES = 10
+
+# (row number, listing payload or None, error or None)
+Prepared = tuple[int, Optional[dict[str, Any]], Optional[str]]
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+# -- reading -----------------------------------------------------------------
+def detect_format(name: str, content_type: str = "") -> Optional[str]:
+    name, content_type = name.lower(), content_type.lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "jsonl"
+    return None
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode a byte stream (UTF-8, optional BOM) into lines that keep their line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def read_rows(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, Any]]:
+    """(row number, raw dict) pairs; a row that cannot be parsed comes as (row number, error str)."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for n, row in enumerate(reader, start=1):
+            yield n, row
+        return
+    n = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield n, "Geçersiz JSON satırı"
+            continue
+        yield n, row if isinstance(row, dict) else "Satır bir JSON nesnesi olmalı"
+
+
+# -- preparing (runs in the worker processes) --------------------------------
+def _text(row: dict[str, Any], key: str) -> str:
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def parse_price(value: Any) -> Optional[float]:
+    """Prices as shops write them: 12500, "12.500", "12.500,50 TL", "1,250.00", "₺900"."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raw = re.sub(r"(?i)\s|tl|try|₺", "", str(value or ""))
+    if not raw or not re.fullmatch(r"\d[\d.,]*", raw):
+        return None
+    if "," in raw and "." in raw:
+        decimal = "," if raw.rfind(",") > raw.rfind(".") else "."
+        raw = raw.replace("." if decimal == "," else ",", "").replace(",", ".")
+    elif "," in raw or "." in raw:
+        sep = "," if "," in raw else "."
+        head, _, tail = raw.rpartition(sep)
+        # One separator followed by exactly three digits is a thousands separator.
+        raw = raw.replace(sep, "") if len(tail) == 3 or raw.count(sep) > 1 else f"{head.replace(sep, '')}.{tail}"
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _images(value: Any) -> list[str]:
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("["):
+            try:
+                value = orjson.loads(value)
+            except orjson.JSONDecodeError:
+                return []
+        else:
+            value = value.split("|")
+    if not isinstance(value, list):
+        return []
+    urls = [str(u).strip() for u in value if isinstance(u, str) and u.strip().startswith(("http://", "https://"))]
+    return list(dict.fromkeys(urls))[:_MAX_IMAGES]
+
+
+def prepare_row(raw: dict[str, Any], user_id: str, import_id: str, row_number: int = 0) -> dict[str, Any]:
+    """One import row as a `listings` insert payload; raises ImportRowError when it cannot be published."""
+    row = {str(k).strip().lower(): v for k, v in raw.items() if k is not None}
+    title_col, description_col = _text(row, "title"), _text(row, "description")
+    text = _text(row, "text") or " ".join(p for p in (title_col, description_col) if p)
+    extracted = extract_simple_fields(text) if text else {}
+
+    title = title_col or str(extracted.get("title") or "")
+    category_col = _text(row, "category")
+    if category_col:
+        # Like publish: a category the taxonomy does not know is kept as the shop wrote it.
+        category = normalize_category_id(category_col) or category_col
+    else:
+        category = extracted.get("category") or classify_category(text)
+    price = parse_price(row.get("price")) if _text(row, "price") else extracted.get("price")
+    location_col = _text(row, "location")
+    if location_col:
+        place = extract_place(location_col)
+        location = place.label if place is not None else location_col
+    else:
+        location = str(extracted.get("location") or "")
+
+    missing = [
+        name
+        for name, value in (("title", title), ("category", category), ("price", price), ("location", location))
+        if not value
+    ]
+    if missing:
+        raise ImportRowError(f"Eksik alanlar: {', '.join(missing)}")
+    assert price is not None
+    if price <= 0:
+        raise ImportRowError("Fiyat pozitif olmalı")
+
+    condition = _text(row, "condition") or "used"
+    listing_data: dict[str, Any] = {
+        "title": title,
+        "category": category,
+        "price": price,
+        "location": location,
+        "condition": condition,
+        "description": description_col,
+        "attributes": extracted.get("attributes") or {},
+    }
+    title_value = enrich_title(title, listing_data, {}) or title
+    description_value = description_col or compose_description(listing_data)
+    keywords = generate_listing_keywords_deterministic(
+        title=title, category=str(category), description=description_col, condition=condition, max_keywords=12
+    )
+
+    payload: dict[str, Any] = {
+        "user_id": user_id,
+        "title": title_value[:120],
+        "description": description_value[:2000],
+        "category": category,
+        "price": float(price),
+        "condition": condition,
+        "location": location,
+        "images": _images(row.get("images")),
+        "status": "active",
+        "metadata": {
+            "source": "import",
+            "import_id": import_id,
+            "import_row": row_number,
+            "published_at": now_iso(),
+            "keywords": keywords.get("keywords") or [],
+            "keywords_text": keywords.get("keywords_text") or "",
+        },
+        "view_count": 0,
+    }
+    if not description_col:
+        payload["metadata"]["description_inputs"] = description_inputs(listing_data)
+    if LOCATION_CODES_ENABLED:
+        payload["province_code"], payload["district_code"] = location_codes(location)
+    return payload
+
+
+def prepare_rows(chunk: list[tuple[int, Any]], user_id: str, import_id: str) -> list[Prepared]:
+    out: list[Prepared] = []
+    for n, raw in chunk:
+        if isinstance(raw, str):
+            out.append((n, None, raw))
+            continue
+        try:
+            out.append((n, prepare_row(raw, user_id, import_id, n), None))
+        except ImportRowError as exc:
+            out.append((n, None, str(exc)))
+        except Exception as exc:  # noqa: BLE001 - one bad row must not stop the import
+            out.append((n, None, f"{type(exc).__name__}: {exc}"))
+    return out
+
+
+# -- writing -----------------------------------------------------------------
+def _insert(supabase: Client, prepared: list[tuple[int, dict[str, Any]]]) -> list[tuple[int, str]]:
+    """Multi-row INSERT; if it fails, rows go one by one. Returns (row number, error) for failed rows."""
+    if not prepared:
+        return []
+    try:
+        supabase.table("listings").insert([payload for _, payload in prepared]).execute()
+        for _, payload in prepared:
+            add_listing(payload["title"], payload["metadata"]["keywords_text"])
+        return []
+    except Exception:
+        logger.warning("batch insert of %d rows failed; retrying row by row", len(prepared))
+    errors: list[tuple[int, str]] = []
+    for n, payload in prepared:
+        try:
+            supabase.table("listings").insert(payload).execute()
+        except Exception as exc:  # noqa: BLE001 - reported per row
+            errors.append((n, f"Kayıt hatası: {exc}"[:300]))
+            continue
+        add_listing(payload["title"], payload["metadata"]["keywords_text"])
+    return errors
+
+
+def run_import(
+    supabase: Optional[Client],
+    rows: Iterable[tuple[int, Any]],
+    user_id: str,
+    *,
+    import_id: Optional[str] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    workers: int = IMPORT_WORKERS,
+    dry_run: bool = False,
+    on_error: Optional[Callable[[int, str], None]] = None,
+    on_progress: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> dict[str, Any]:
+    """Prepare and insert `rows`; returns counters. `supabase` may be None with `dry_run`."""
+    import_id = import_id or str(uuid.uuid4())
+    batch_size = max(1, int(batch_size))
+    stats: dict[str, Any] = {"import_id": import_id, "rows": 0, "imported": 0, "failed": 0, "batches": 0, "seconds": 0.0}
+    started = time.perf_counter()
+
+    executor: Optional[Executor] = None
+    if workers > 0:
+        # spawn: the API process runs an event loop and threads, which must not be forked.
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(chunk: list[tuple[int, Any]]) -> Future[list[Prepared]]:
+        if executor is not None:
+            return executor.submit(prepare_rows, chunk, user_id, import_id)
+        done: Future[list[Prepared]] = Future()
+        done.set_result(prepare_rows(chunk, user_id, import_id))
+        return done
+
+    def report(n: int, error: str) -> None:
+        stats["failed"] += 1
+        if on_error is not None:
+            on_error(n, error)
+
+    def drain(future: Future[list[Prepared]]) -> None:
+        ready: list[tuple[int, dict[str, Any]]] = []
+        for n, payload, error in future.result():
+            stats["rows"] += 1
+            if error is not None or payload is None:
+                report(n, error or "Bilinmeyen hata")
+            else:
+                ready.append((n, payload))
+        failed = [] if dry_run or supabase is None else _insert(supabase, ready)
+        for n, error in failed:
+            report(n, error)
+        stats["imported"] += len(ready) - len(failed)
+        stats["batches"] += 1
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        if on_progress is not None:
+            on_progress(dict(stats))
+
+    try:
+        in_flight: deque[Future[list[Prepared]]] = deque()
+        chunk: list[tuple[int, Any]] = []
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= batch_size:
+                in_flight.append(submit(chunk))
+                chunk = []
+                if len(in_flight) > max(1, workers):
+                    drain(in_flight.popleft())
+        if chunk:
+            in_flight.append(submit(chunk))
+        while in_flight:
+            drain(in_flight.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or JSONL file ('-' reads stdin; then pass --format)")
+    parser.add_argument("--user-id", required=True, help="owner of the imported listings")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="prepare and validate only; nothing is written")
+    parser.add_argument("--errors", help="write per-row errors to this JSONL file (default: stderr)")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format csv|jsonl")
+
+    logging.basicConfig(level="INFO", format="%(asctime)s %(name)s %(message)s")
+    supabase = None
+    if not args.dry_run:
+        from app.clients.supabase import get_supabase
+
+        supabase = get_supabase()
+
+    errors_out = open(args.errors, "wb") if args.errors else None
+
+    def on_error(n: int, error: str) -> None:
+        line = orjson.dumps({"row": n, "error": error})
+        if errors_out is not None:
+            errors_out.write(line + b"\n")
+        else:
+            sys.stderr.write(line.decode("utf-8") + "\n")
+
+    def on_progress(stats: dict[str, Any]) -> None:
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+        logger.info("rows=%d imported=%d failed=%d (%.0f rows/s)", stats["rows"], stats["imported"], stats["failed"], rate)
+
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        chunks = iter(lambda: source.read(1 << 16), b"")
+        stats = run_import(
+            supabase,
+            read_rows(iter_lines(chunks), fmt),
+            args.user_id,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            dry_run=args.dry_run,
+            on_error=on_error,
+            on_progress=on_progress,
+        )
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if errors_out is not None:
+            errors_out.close()
+    print(", ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
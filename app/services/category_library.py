@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Sequence, Set, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from app.core.metrics import register_lru_cache
 
 
 _TR_MAP = str.maketrans({
@@ -70,6 +73,17 @@ CATEGORY_OPTIONS: Tuple[CategoryOption, ...] = (
 SUPPORTED_CATEGORIES: Tuple[str, ...] = tuple(opt.id for opt in CATEGORY_OPTIONS)
 
 
+def _option_ids_by_norm() -> Dict[str, str]:
+    ids: Dict[str, str] = {}
+    for opt in CATEGORY_OPTIONS:
+        ids.setdefault(_norm(opt.id), opt.id)
+        ids.setdefault(_norm(opt.label), opt.id)
+    return ids
+
+
+_OPTION_IDS_BY_NORM: Dict[str, str] = _option_ids_by_norm()
+
+
 def get_supported_categories() -> List[str]:
     return list(SUPPORTED_CATEGORIES)
 
@@ -78,6 +92,7 @@ def get_category_options() -> List[Dict[str, str]]:
     return [{"id": opt.id, "label": opt.label} for opt in CATEGORY_OPTIONS]
 
 
+@lru_cache(maxsize=4096)
 def normalize_category_id(text: str) -> Optional[str]:
     raw = (text or "").strip()
     if not raw:
@@ -87,11 +102,9 @@ def normalize_category_id(text: str) -> Optional[str]:
     if not raw_norm:
         return None
 
-    for opt in CATEGORY_OPTIONS:
-        if _norm(opt.id) == raw_norm:
-            return opt.id
-        if _norm(opt.label) == raw_norm:
-            return opt.id
+    option_id = _OPTION_IDS_BY_NORM.get(raw_norm)
+    if option_id:
+        return option_id
 
     guessed = classify_category(raw)
     if guessed:
@@ -112,7 +125,10 @@ def _count_matches(text_norm: str, tokens: Set[str], phrases: Sequence[str]) ->
         if _contains_phrase(text_norm, p):
             score += 1
     for t in tokens:
-        if re.search(rf"\b{re.escape(t)}\b", text_norm):
+        pattern = _TOKEN_PATTERNS.get(t)
+        if pattern is None:
+            pattern = re.compile(rf"\b{re.escape(t)}\b")
+        if pattern.search(text_norm):
             score += 1
     return score
 
@@ -465,6 +481,59 @@ _CATEGORIES: Tuple[CategorySpec, ...] = (
 )
 
 
+@dataclass(frozen=True)
+class _CompiledSpec:
+    label: str
+    strong_tokens: FrozenSet[str]
+    strong_multi: Tuple[str, ...]
+    weak_tokens: FrozenSet[str]
+    weak_multi: Tuple[str, ...]
+
+
+def _compile_spec(spec: CategorySpec) -> _CompiledSpec:
+    strong_phrases = [_norm(p) for p in spec.strong if p]
+    weak_phrases = [_norm(p) for p in spec.weak if p]
+    return _CompiledSpec(
+        label=spec.label,
+        strong_tokens=frozenset(p for p in strong_phrases if " " not in p),
+        strong_multi=tuple(p for p in strong_phrases if " " in p),
+        weak_tokens=frozenset(p for p in weak_phrases if " " not in p),
+        weak_multi=tuple(p for p in weak_phrases if " " in p),
+    )
+
+
+# The taxonomy is normalized once at import (shared copy-on-write by pre-forked workers)
+# instead of on every classify_category call.
+_COMPILED_CATEGORIES: Tuple[_CompiledSpec, ...] = tuple(_compile_spec(spec) for spec in _CATEGORIES)
+_TOKEN_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    t: re.compile(rf"\b{re.escape(t)}\b")
+    for spec in _COMPILED_CATEGORIES
+    for t in (*spec.strong_tokens, *spec.weak_tokens)
+}
+_ROOM_FORMAT_RE = re.compile(r"\b\d\+\d\b")
+_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+_KM_RE = re.compile(r"\b\d{1,3}(?:\s*\.?\s*\d{3})?\s*km\b")
+_EMLAK_CONTEXT_TOKENS: FrozenSet[str] = frozenset(
+    {
+        "emlak",
+        "daire",
+        "ev",
+        "konut",
+        "apart",
+        "apartman",
+        "rezidans",
+        "villa",
+        "yazlik",
+        "müstakil",
+        "mustakil",
+        "arsa",
+        "tarla",
+        "ofis",
+        "dukkan",
+    }
+)
+
+
 def classify_category(text: str) -> Optional[str]:
     text_norm = _norm(text)
     if not text_norm:
@@ -472,48 +541,23 @@ def classify_category(text: str) -> Optional[str]:
 
     token_set = set(_tokenize(text))
 
-    has_room_format = bool(re.search(r"\b\d\+\d\b", text_norm))
+    has_room_format = bool(_ROOM_FORMAT_RE.search(text_norm))
     if has_room_format:
-        emlak_context_tokens = {
-            "emlak",
-            "daire",
-            "ev",
-            "konut",
-            "apart",
-            "apartman",
-            "rezidans",
-            "villa",
-            "yazlik",
-            "müstakil",
-            "mustakil",
-            "arsa",
-            "tarla",
-            "ofis",
-            "dukkan",
-        }
-        if token_set & emlak_context_tokens or _contains_phrase(text_norm, "studyo daire"):
+        if token_set & _EMLAK_CONTEXT_TOKENS or _contains_phrase(text_norm, "studyo daire"):
             return "Emlak"
 
     best: Optional[Tuple[str, int, int]] = None
 
-    for spec in _CATEGORIES:
-        strong_phrases = [_norm(p) for p in spec.strong if p]
-        weak_phrases = [_norm(p) for p in spec.weak if p]
-
-        strong_tokens = {p for p in strong_phrases if " " not in p}
-        strong_multi = [p for p in strong_phrases if " " in p]
-        weak_tokens = {p for p in weak_phrases if " " not in p}
-        weak_multi = [p for p in weak_phrases if " " in p]
-
-        strong_score = _count_matches(text_norm, strong_tokens & token_set, strong_multi)
-        weak_score = _count_matches(text_norm, weak_tokens & token_set, weak_multi)
+    for spec in _COMPILED_CATEGORIES:
+        strong_score = _count_matches(text_norm, spec.strong_tokens & token_set, spec.strong_multi)
+        weak_score = _count_matches(text_norm, spec.weak_tokens & token_set, spec.weak_multi)
 
         if strong_score <= 0:
             if weak_score >= 2:
                 pass
             elif spec.label == "Otomotiv" and weak_score >= 1:
-                has_year = bool(re.search(r"\b(19|20)\d{2}\b", text_norm))
-                has_km = bool(re.search(r"\b\d{1,3}(?:\s*\.?\s*\d{3})?\s*km\b", text_norm)) or (
+                has_year = bool(_YEAR_RE.search(text_norm))
+                has_km = bool(_KM_RE.search(text_norm)) or (
                     "kilometre" in text_norm
                 )
                 has_model_signal = "model" in text_norm
@@ -531,3 +575,6 @@ def classify_category(text: str) -> Optional[str]:
             best = candidate
 
     return best[0] if best else None
+
+
+register_lru_cache("category", normalize_category_id)
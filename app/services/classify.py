@@ -0,0 +1,99 @@
+"""Side-effect-free classification of free-text product titles, for partner batches.
+
+Each item goes through the chat turn's extraction stack and nothing else: no drafts, no
+audit log, no OpenAI. `extract_simple_fields` gives price / location / attributes, the
+category comes from it or `normalize_category_id` on the text, and the search keywords
+from `generate_listing_keywords_deterministic`.
+
+Batches are cut into chunks of `CLASSIFY_CHUNK_SIZE`; a batch of more than one chunk is
+spread over a process pool (`CLASSIFY_WORKERS`) with at most `workers + 1` chunks in
+flight per request, and chunks are handed back in input order as soon as each is done,
+so the caller can stream them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Optional
+
+from app.config import CLASSIFY_CHUNK_SIZE, CLASSIFY_WORKERS
+from app.services.category_library import normalize_category_id
+from app.services.metadata_keywords import generate_listing_keywords_deterministic
+from app.services.parsing import extract_simple_fields
+
+logger = logging.getLogger("pazarglobal.classify")
+
+# (position in the batch, caller's id, text)
+Item = tuple[int, Optional[str], str]
+
+_executor: Optional[Executor] = None
+
+
+def classify_text(text: str) -> dict[str, Any]:
+    """Category, extracted fields and keywords for one product title / description."""
+    fields = extract_simple_fields(text)
+    category = fields.pop("category", None) or normalize_category_id(text)
+    keywords = generate_listing_keywords_deterministic(
+        title=text, category=category or "", condition=str(fields.get("condition") or ""), max_keywords=12
+    )
+    return {"category": category, "fields": fields, "keywords": keywords.get("keywords") or []}
+
+
+def classify_chunk(items: list[Item]) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    for index, item_id, text in items:
+        result: dict[str, Any] = {"index": index}
+        if item_id is not None:
+            result["id"] = item_id
+        try:
+            result.update(classify_text(text))
+        except Exception as exc:  # noqa: BLE001 - reported on the item, the batch goes on
+            result["error"] = f"{type(exc).__name__}: {exc}"[:300]
+        out.append(result)
+    return out
+
+
+def _get_executor() -> Optional[Executor]:
+    global _executor
+    if CLASSIFY_WORKERS <= 0:
+        return None
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and worker threads is unsafe.
+        _executor = ProcessPoolExecutor(CLASSIFY_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def close_classify() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def classify_batch(items: list[Item], chunk_size: int = CLASSIFY_CHUNK_SIZE) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield classified chunks of `items` in input order."""
+    chunk_size = max(1, int(chunk_size))
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    executor = _get_executor() if len(chunks) > 1 else None
+    if executor is None:
+        for chunk in chunks:
+            yield await asyncio.to_thread(classify_chunk, chunk)
+        return
+
+    loop = asyncio.get_running_loop()
+    in_flight: deque[asyncio.Future[list[dict[str, Any]]]] = deque()
+    try:
+        for chunk in chunks:
+            in_flight.append(loop.run_in_executor(executor, classify_chunk, chunk))
+            if len(in_flight) > CLASSIFY_WORKERS:
+                yield await in_flight.popleft()
+        while in_flight:
+            yield await in_flight.popleft()
+    finally:
+        # Client went away mid-stream: drop the chunks nobody will read.
+        for future in in_flight:
+            future.cancel()
@@ -20,6 +20,40 @@ _TR_MAP = str.maketrans({
 })
 
 
+# Response templates and field tables (module level, shared by pre-forked workers).
+_VEHICLE_FIELDS = (
+    ("Yıl", "year"),
+    ("KM", "km"),
+    ("Yakıt", "fuel"),
+    ("Vites", "transmission"),
+    ("Motor", "engine"),
+    ("Tramer", "tramer"),
+    ("Renk", "color"),
+)
+_GENERIC_FIELDS = (
+    ("Marka", "brand"),
+    ("Model", "model"),
+    ("Renk", "color"),
+    ("Depolama", "storage"),
+    ("RAM", "ram"),
+    ("Garanti", "warranty"),
+)
+_DESCRIPTION_QUESTIONS = {
+    "vehicle": (
+        "Açıklamayı daha iyi hazırlamak için isterseniz şu bilgileri paylaşabilirsiniz: "
+        "Yıl, KM, Yakıt, Vites, Tramer/hasar durumu, servis geçmişi. "
+        "İstemiyorsanız atlayabilirsiniz."
+    ),
+    "electronic": (
+        "Açıklamayı netleştirmek için isterseniz ürün özelliklerini paylaşabilirsiniz: "
+        "Depolama/kapasite, RAM, garanti durumu. "
+        "İstemiyorsanız atlayabilirsiniz."
+    ),
+    "apparel": "Açıklama için isterseniz beden ve materyal bilgisini paylaşabilirsiniz. İstemiyorsanız atlayabilirsiniz.",
+    "home": "Açıklama için isterseniz ölçü/boyut bilgisini paylaşabilirsiniz. İstemiyorsanız atlayabilirsiniz.",
+}
+
+
 def _norm(text: str) -> str:
     return (text or "").strip().lower().translate(_TR_MAP)
 
@@ -110,6 +144,17 @@ def enrich_title(title: str, listing_data: dict[str, Any], vision: dict[str, Any
     return f"{base} {', '.join(suffix_parts)}".strip()
 
 
+def description_inputs(listing_data: dict[str, Any], vision: dict[str, Any] | None = None) -> dict[str, Any]:
+    """What a composed description used besides the listing columns, kept in `metadata` to recompose it."""
+    inputs: dict[str, Any] = {
+        key: listing_data[key] for key in ("title", "attributes", "description_notes", "notes") if listing_data.get(key)
+    }
+    vision_data = _as_dict(vision)
+    if vision_data:
+        inputs["vision"] = vision_data
+    return inputs
+
+
 def compose_description(listing_data: dict[str, Any], vision: dict[str, Any] | None = None) -> str:
     vision_data = _as_dict(vision)
     title = _as_str(listing_data.get("title"))
@@ -138,15 +183,7 @@ def compose_description(listing_data: dict[str, Any], vision: dict[str, Any] | N
 
     if is_vehicle:
         vehicle_bits: list[str] = []
-        for label, key in [
-            ("Yıl", "year"),
-            ("KM", "km"),
-            ("Yakıt", "fuel"),
-            ("Vites", "transmission"),
-            ("Motor", "engine"),
-            ("Tramer", "tramer"),
-            ("Renk", "color"),
-        ]:
+        for label, key in _VEHICLE_FIELDS:
             val = attrs.get(key)
             if val:
                 vehicle_bits.append(f"{label}: {val}")
@@ -154,14 +191,7 @@ def compose_description(listing_data: dict[str, Any], vision: dict[str, Any] | N
             lines.append("Öne çıkanlar: " + ", ".join(vehicle_bits) + ".")
     else:
         generic_bits: list[str] = []
-        for label, key in [
-            ("Marka", "brand"),
-            ("Model", "model"),
-            ("Renk", "color"),
-            ("Depolama", "storage"),
-            ("RAM", "ram"),
-            ("Garanti", "warranty"),
-        ]:
+        for label, key in _GENERIC_FIELDS:
             val = attrs.get(key)
             if val:
                 generic_bits.append(f"{label}: {val}")
@@ -206,28 +236,20 @@ def get_description_question(category: str, listing_data: dict[str, Any]) -> str
     if is_vehicle:
         needed = [k for k in ["year", "km", "fuel", "transmission", "tramer"] if not _as_str(attrs.get(k))]
         if needed:
-            return (
-                "Açıklamayı daha iyi hazırlamak için isterseniz şu bilgileri paylaşabilirsiniz: "
-                "Yıl, KM, Yakıt, Vites, Tramer/hasar durumu, servis geçmişi. "
-                "İstemiyorsanız atlayabilirsiniz."
-            )
+            return _DESCRIPTION_QUESTIONS["vehicle"]
 
     if is_electronic:
         needed = [k for k in ["storage", "ram", "warranty"] if not _as_str(attrs.get(k))]
         if needed:
-            return (
-                "Açıklamayı netleştirmek için isterseniz ürün özelliklerini paylaşabilirsiniz: "
-                "Depolama/kapasite, RAM, garanti durumu. "
-                "İstemiyorsanız atlayabilirsiniz."
-            )
+            return _DESCRIPTION_QUESTIONS["electronic"]
 
     if is_apparel:
         needed = [k for k in ["size", "material"] if not _as_str(attrs.get(k))]
         if needed:
-            return "Açıklama için isterseniz beden ve materyal bilgisini paylaşabilirsiniz. İstemiyorsanız atlayabilirsiniz."
+            return _DESCRIPTION_QUESTIONS["apparel"]
 
     if is_home:
         if not _as_str(attrs.get("dimensions")):
-            return "Açıklama için isterseniz ölçü/boyut bilgisini paylaşabilirsiniz. İstemiyorsanız atlayabilirsiniz."
+            return _DESCRIPTION_QUESTIONS["home"]
 
     return None
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, cast
+
+import orjson
+
+from app.config import DRAFT_STORE, DRAFT_STORE_PATH, DRAFT_SYNC_INTERVAL_S
+from app.core.helpers import now_iso
+from app.core.resilience import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+_TABLE = "active_drafts"
+
+
+class DraftStore(ABC):
+    """Storage for `active_drafts` rows; `app.services.drafts` only talks to this interface."""
+
+    @abstractmethod
+    def latest_for_user(self, user_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def get(self, draft_id: str, columns: str = "*") -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def create(self, user_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def update(self, draft_id: str, values: dict[str, Any]) -> dict[str, Any] | None:
+        """Apply `values` and return the full row as stored afterwards."""
+
+    @abstractmethod
+    def delete(self, draft_id: str) -> None: ...
+
+    @abstractmethod
+    def delete_for_user(self, user_id: str) -> None: ...
+
+
+def _first(result: Any) -> dict[str, Any] | None:
+    rows = (result.data or []) if hasattr(result, "data") else []
+    return cast(dict[str, Any], rows[0]) if rows else None
+
+
+class SupabaseDraftStore(DraftStore):
+    """Every operation is a PostgREST round trip (the original behaviour)."""
+
+    def __init__(self, supabase: Any) -> None:
+        self.supabase = supabase
+
+    def latest_for_user(self, user_id: str) -> dict[str, Any] | None:
+        return _first(
+            self.supabase.table(_TABLE)
+            .select("*")
+            .eq("user_id", user_id)
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+
+    def get(self, draft_id: str, columns: str = "*") -> dict[str, Any] | None:
+        return _first(self.supabase.table(_TABLE).select(columns).eq("id", draft_id).limit(1).execute())
+
+    def create(self, user_id: str) -> dict[str, Any] | None:
+        return _first(
+            self.supabase.table(_TABLE)
+            .insert({"user_id": user_id, "state": "DISCOVERY_MODE", "listing_data": {}, "images": []})
+            .execute()
+        )
+
+    def update(self, draft_id: str, values: dict[str, Any]) -> dict[str, Any] | None:
+        self.supabase.table(_TABLE).update(values).eq("id", draft_id).execute()
+        return self.get(draft_id)
+
+    def delete(self, draft_id: str) -> None:
+        self.supabase.table(_TABLE).delete().eq("id", draft_id).execute()
+
+    def delete_for_user(self, user_id: str) -> None:
+        self.supabase.table(_TABLE).delete().eq("user_id", user_id).execute()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    row BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drafts_user_updated ON drafts (user_id, updated_at);
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    draft_id TEXT,
+    row BLOB
+);
+CREATE TABLE IF NOT EXISTS sync_lease (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+class LocalDraftStore(DraftStore):
+    """SQLite (WAL) draft store with write-behind replication to Supabase.
+
+    Draft turns read and write the local file only. Every mutation also appends to an
+    `outbox` table in the same transaction; a background thread drains it into Supabase
+    (upsert by id / delete) in order, coalescing repeated upserts of one draft. The outbox
+    survives restarts, so nothing is lost if the process dies before a sync.
+
+    The first time a user is seen, a local miss falls back to Supabase once and caches the
+    row locally (drafts written by an older deploy or a previous instance). Drafts live on
+    the instance that serves the user: use it with a single instance or sticky routing.
+
+    Pre-fork workers (`app.prefork`) open the same file. Each runs a sync thread, but only
+    the holder of the `sync_lease` row drains the outbox, so rows are applied once and in
+    order; another worker takes over when the lease is released or expires. `lease_s` must
+    exceed the longest single Supabase call.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        supabase_factory: Callable[[], Any] | None,
+        sync_interval_s: float = 0.5,
+        batch_size: int = 100,
+        lease_s: float = 30.0,
+    ) -> None:
+        self.path = path
+        self._supabase_factory = supabase_factory
+        self._sync_interval_s = sync_interval_s
+        self._batch_size = batch_size
+        self._lease_s = lease_s
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        # Users whose local state is authoritative: no Supabase fallback on a miss.
+        self._known_users: set[str] = {
+            r[0] for r in self._db.execute("SELECT user_id FROM drafts UNION SELECT user_id FROM outbox")
+        }
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._stopped = False
+        self._worker: threading.Thread | None = None
+        if supabase_factory is not None:
+            self._worker = threading.Thread(target=self._sync_loop, name="draft-sync", daemon=True)
+            self._worker.start()
+
+    # -- local storage ------------------------------------------------------
+    def _load(self, sql: str, *params: Any) -> dict[str, Any] | None:
+        with self._lock:
+            found = self._db.execute(sql, params).fetchone()
+        return cast(dict[str, Any], orjson.loads(found[0])) if found else None
+
+    def _write(self, row: dict[str, Any]) -> None:
+        blob = orjson.dumps(row)
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT OR REPLACE INTO drafts (id, user_id, updated_at, row) VALUES (?, ?, ?, ?)",
+                (row["id"], row["user_id"], row.get("updated_at") or "", blob),
+            )
+            self._db.execute(
+                "INSERT INTO outbox (op, user_id, draft_id, row) VALUES ('upsert', ?, ?, ?)",
+                (row["user_id"], row["id"], blob),
+            )
+            self._db.execute("COMMIT")
+        self._wake.set()
+
+    def _hydrate(self, user_id: str) -> None:
+        if user_id in self._known_users or self._supabase_factory is None:
+            return
+        with self._lock:
+            # Another worker on the same file may already own this user's drafts (or a
+            # pending delete whose remote copy must not be brought back).
+            local = self._db.execute(
+                "SELECT 1 FROM drafts WHERE user_id = ? UNION ALL SELECT 1 FROM outbox WHERE user_id = ? LIMIT 1",
+                (user_id, user_id),
+            ).fetchone()
+        if local is not None:
+            self._known_users.add(user_id)
+            return
+        try:
+            remote = SupabaseDraftStore(self._supabase_factory()).latest_for_user(user_id)
+        except Exception:
+            logger.warning("draft hydrate failed for %s", user_id, exc_info=True)
+            return
+        if remote and remote.get("id"):
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR IGNORE INTO drafts (id, user_id, updated_at, row) VALUES (?, ?, ?, ?)",
+                    (remote["id"], user_id, remote.get("updated_at") or "", orjson.dumps(remote)),
+                )
+        if len(self._known_users) > 200_000:
+            self._known_users.clear()
+        self._known_users.add(user_id)
+
+    # -- DraftStore ---------------------------------------------------------
+    def latest_for_user(self, user_id: str) -> dict[str, Any] | None:
+        self._hydrate(user_id)
+        return self._load(
+            "SELECT row FROM drafts WHERE user_id = ? ORDER BY updated_at DESC LIMIT 1", user_id
+        )
+
+    def get(self, draft_id: str, columns: str = "*") -> dict[str, Any] | None:
+        row = self._load("SELECT row FROM drafts WHERE id = ?", draft_id)
+        if row is None or columns.strip() == "*":
+            return row
+        return {c.strip(): row.get(c.strip()) for c in columns.split(",") if c.strip()}
+
+    def create(self, user_id: str) -> dict[str, Any] | None:
+        ts = now_iso()
+        row: dict[str, Any] = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "state": "DISCOVERY_MODE",
+            "listing_data": {},
+            "images": [],
+            "created_at": ts,
+            "updated_at": ts,
+        }
+        self._known_users.add(user_id)
+        self._write(row)
+        return row
+
+    def update(self, draft_id: str, values: dict[str, Any]) -> dict[str, Any] | None:
+        row = self.get(draft_id)
+        if row is None:
+            return None
+        row.update(values)
+        self._write(row)
+        return row
+
+    def delete(self, draft_id: str) -> None:
+        with self._lock:
+            found = self._db.execute("SELECT user_id FROM drafts WHERE id = ?", (draft_id,)).fetchone()
+            if found is None:
+                return
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM drafts WHERE id = ?", (draft_id,))
+            self._db.execute(
+                "INSERT INTO outbox (op, user_id, draft_id) VALUES ('delete', ?, ?)", (found[0], draft_id)
+            )
+            self._db.execute("COMMIT")
+        self._wake.set()
+
+    def delete_for_user(self, user_id: str) -> None:
+        # Also clears rows that only exist remotely, so no hydrate check is needed first.
+        self._known_users.add(user_id)
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM drafts WHERE user_id = ?", (user_id,))
+            self._db.execute("INSERT INTO outbox (op, user_id) VALUES ('delete_user', ?)", (user_id,))
+            self._db.execute("COMMIT")
+        self._wake.set()
+
+    # -- replication --------------------------------------------------------
+    def pending(self) -> int:
+        with self._lock:
+            return int(self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0])
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until the outbox is empty (or `timeout` passes); True when fully synced."""
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            if self._worker is None or time.monotonic() >= deadline:
+                return False
+            self._idle.clear()
+            self._wake.set()
+            self._idle.wait(min(0.05, max(0.0, deadline - time.monotonic())))
+        return True
+
+    def close(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=2.0)
+        with self._lock:
+            self._db.execute("DELETE FROM sync_lease WHERE owner = ?", (self._owner,))
+            self._db.close()
+
+    def _hold_lease(self) -> bool:
+        """Take or renew the replication lease; True while this process may drain the outbox."""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO sync_lease (id, owner, expires) VALUES (1, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                "WHERE sync_lease.owner = excluded.owner OR sync_lease.expires < ?",
+                (self._owner, now + self._lease_s, now),
+            )
+            return cursor.rowcount > 0
+
+    def _next_batch(self) -> list[tuple[int, str, str, str | None, bytes | None]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT seq, op, user_id, draft_id, row FROM outbox ORDER BY seq LIMIT ?", (self._batch_size,)
+            ).fetchall()
+
+    def _apply(self, supabase: Any, batch: list[tuple[int, str, str, str | None, bytes | None]]) -> None:
+        # Only the last upsert of a draft inside a batch matters; earlier ones are skipped.
+        last_upsert = {draft_id: seq for seq, op, _, draft_id, _ in batch if op == "upsert"}
+        for seq, op, user_id, draft_id, row in batch:
+            if op == "upsert":
+                if last_upsert.get(draft_id) == seq and row is not None:
+                    supabase.table(_TABLE).upsert(orjson.loads(row), on_conflict="id").execute()
+            elif op == "delete":
+                supabase.table(_TABLE).delete().eq("id", draft_id).execute()
+            elif op == "delete_user":
+                supabase.table(_TABLE).delete().eq("user_id", user_id).execute()
+            with self._lock:
+                self._db.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+            if not self._hold_lease():
+                return  # another worker took over; it resumes from the next row in order
+
+    def _sync_loop(self) -> None:
+        attempt = 0
+        while not self._stopped:
+            if not self._hold_lease():
+                self._idle.set()
+                self._wake.wait(self._sync_interval_s)
+                self._wake.clear()
+                continue
+            batch = self._next_batch()
+            if not batch:
+                attempt = 0
+                self._idle.set()
+                self._wake.wait(self._sync_interval_s)
+                self._wake.clear()
+                continue
+            try:
+                assert self._supabase_factory is not None
+                self._apply(self._supabase_factory(), batch)
+                attempt = 0
+            except Exception:
+                logger.warning("draft sync to Supabase failed; will retry", exc_info=True)
+                time.sleep(backoff_delay(attempt, 0.5, 30.0))
+                attempt += 1
+
+
+_local_store: LocalDraftStore | None = None
+_local_lock = threading.Lock()
+
+
+def get_draft_store(supabase: Any) -> DraftStore:
+    """Store selected by `DRAFT_STORE` ("supabase" default, "local" for the SQLite backend)."""
+    global _local_store
+    if DRAFT_STORE != "local":
+        return SupabaseDraftStore(supabase)
+    if _local_store is None:
+        with _local_lock:
+            if _local_store is None:
+                from app.clients.supabase import get_supabase
+
+                _local_store = LocalDraftStore(DRAFT_STORE_PATH, get_supabase, DRAFT_SYNC_INTERVAL_S)
+    return _local_store
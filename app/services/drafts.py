@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, cast
-
-from supabase import Client
+from typing import TYPE_CHECKING, Any, cast
 
 from app.core.helpers import now_iso, is_uuid
+from app.services.draft_store import get_draft_store
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 def _ensure_dict(value: Any) -> dict[str, Any]:
@@ -55,99 +57,116 @@ def format_preview(draft: dict[str, Any]) -> str:
     )
 
 
+def latest_draft(supabase: Client, user_id: str) -> dict[str, Any] | None:
+    """Kullanıcının en son güncellenen draft'ı (yoksa None)."""
+    return get_draft_store(supabase).latest_for_user(user_id)
+
+
+def delete_user_drafts(supabase: Client, user_id: str) -> None:
+    get_draft_store(supabase).delete_for_user(user_id)
+
+
+def delete_draft(supabase: Client, draft_id: str) -> None:
+    get_draft_store(supabase).delete(draft_id)
+
+
 def get_or_create_draft(supabase: Client, user_id: str) -> dict[str, Any]:
     if not is_uuid(user_id):
         raise ValueError("user_id uuid olmalı (webchat login gerekli)")
 
-    existing = (
-        supabase.table("active_drafts")
-        .select("*")
-        .eq("user_id", user_id)
-        .order("updated_at", desc=True)
-        .limit(1)
-        .execute()
-    )
+    store = get_draft_store(supabase)
+    existing = store.latest_for_user(user_id)
+    if existing:
+        return existing
 
-    rows = (existing.data or []) if hasattr(existing, "data") else []
-    if rows:
-        return cast(dict[str, Any], rows[0])
-
-    created = supabase.table("active_drafts").insert(
-        {"user_id": user_id, "state": "DISCOVERY_MODE", "listing_data": {}, "images": []}
-    ).execute()
-
-    created_rows = (created.data or []) if hasattr(created, "data") else []
-    if not created_rows:
-        reread = (
-            supabase.table("active_drafts")
-            .select("*")
-            .eq("user_id", user_id)
-            .order("updated_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        reread_rows = (reread.data or []) if hasattr(reread, "data") else []
-        if reread_rows:
-            return cast(dict[str, Any], reread_rows[0])
+    created = store.create(user_id)
+    if not created:
+        reread = store.latest_for_user(user_id)
+        if reread:
+            return reread
         raise RuntimeError("Draft oluşturulamadı")
 
-    return cast(dict[str, Any], created_rows[0])
+    return created
 
 
 def patch_draft_fields(supabase: Client, draft_id: str, patch: dict[str, Any]) -> dict[str, Any]:
+    store = get_draft_store(supabase)
     if not patch:
-        current = supabase.table("active_drafts").select("*").eq("id", draft_id).limit(1).execute()
-        rows = (current.data or []) if hasattr(current, "data") else []
-        if not rows:
+        current = store.get(draft_id)
+        if not current:
             raise RuntimeError("Draft bulunamadı")
-        return cast(dict[str, Any], rows[0])
+        return current
 
-    current = supabase.table("active_drafts").select("listing_data").eq("id", draft_id).limit(1).execute()
-    rows = (current.data or []) if hasattr(current, "data") else []
-    if not rows:
+    current = store.get(draft_id, "listing_data")
+    if not current:
         raise RuntimeError("Draft bulunamadı")
 
-    listing_data = _ensure_dict(cast(dict[str, Any], rows[0]).get("listing_data"))
+    listing_data = _ensure_dict(current.get("listing_data"))
 
     merged = {**listing_data, **patch}
     if isinstance(listing_data.get("attributes"), dict) and isinstance(patch.get("attributes"), dict):
         merged["attributes"] = {**cast(dict[str, Any], listing_data.get("attributes")), **cast(dict[str, Any], patch.get("attributes"))}
-    supabase.table("active_drafts").update({"listing_data": merged, "updated_at": now_iso()}).eq(
-        "id", draft_id
-    ).execute()
 
-    reread = supabase.table("active_drafts").select("*").eq("id", draft_id).limit(1).execute()
-    reread_rows = (reread.data or []) if hasattr(reread, "data") else []
-    if not reread_rows:
+    updated = store.update(draft_id, {"listing_data": merged, "updated_at": now_iso()})
+    if not updated:
         raise RuntimeError("Draft bulunamadı")
-    return cast(dict[str, Any], reread_rows[0])
+    return updated
+
+
+def _image_urls(images_raw: Any) -> list[str]:
+    if isinstance(images_raw, list):
+        return cast(list[str], images_raw)
+    urls_raw = _ensure_dict(images_raw).get("urls")
+    if isinstance(urls_raw, list):
+        return cast(list[str], urls_raw)
+    return []
 
 
 def store_media_urls(supabase: Client, draft_id: str, media_urls: list[str]) -> dict[str, Any]:
-    current = supabase.table("active_drafts").select("images").eq("id", draft_id).limit(1).execute()
-    rows = (current.data or []) if hasattr(current, "data") else []
-    if not rows:
+    store = get_draft_store(supabase)
+    current = store.get(draft_id, "images")
+    if not current:
         raise RuntimeError("Draft bulunamadı")
 
-    images_raw = cast(dict[str, Any], rows[0]).get("images")
-    existing_urls: list[str] = []
-    if isinstance(images_raw, list):
-        existing_urls = cast(list[str], images_raw)
-    else:
-        images_dict = _ensure_dict(images_raw)
-        urls_raw = images_dict.get("urls")
-        if isinstance(urls_raw, list):
-            existing_urls = cast(list[str], urls_raw)
-
+    existing_urls = _image_urls(current.get("images"))
     merged: list[str] = list(dict.fromkeys([*existing_urls, *[u for u in media_urls if u]]))
 
     # Always store as array to satisfy schemas expecting JSON array
-    supabase.table("active_drafts").update({"images": merged, "updated_at": now_iso()}).eq(
-        "id", draft_id
-    ).execute()
+    updated = store.update(draft_id, {"images": merged, "updated_at": now_iso()})
+    if not updated:
+        raise RuntimeError("Draft bulunamadı")
+    return updated
+
+
+def store_media(
+    supabase: Client, draft_id: str, media: list[dict[str, Any]], current: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Append ingested media (see app/services/media.py): URLs to `images`, metadata to `listing_data.media`.
+
+    `current` is the draft row with `images` and `listing_data` when the caller already read it.
+    """
+    store = get_draft_store(supabase)
+    if current is None:
+        current = store.get(draft_id, "images,listing_data")
+    if not current:
+        raise RuntimeError("Draft bulunamadı")
+
+    listing_data = _ensure_dict(current.get("listing_data"))
+    known = listing_data.get("media") if isinstance(listing_data.get("media"), list) else []
+    urls = list(dict.fromkeys([*_image_urls(current.get("images")), *[m["url"] for m in media]]))
+    values: dict[str, Any] = {"images": urls, "updated_at": now_iso()}
+    if media:
+        values["listing_data"] = {**listing_data, "media": [*known, *media]}
+
+    updated = store.update(draft_id, values)
+    if not updated:
+        raise RuntimeError("Draft bulunamadı")
+    return updated
+
 
-    reread = supabase.table("active_drafts").select("*").eq("id", draft_id).limit(1).execute()
-    reread_rows = (reread.data or []) if hasattr(reread, "data") else []
-    if not reread_rows:
+def store_vision(supabase: Client, draft_id: str, vision: dict[str, Any]) -> dict[str, Any]:
+    store = get_draft_store(supabase)
+    updated = store.update(draft_id, {"vision": vision, "updated_at": now_iso()})
+    if not updated:
         raise RuntimeError("Draft bulunamadı")
-    return cast(dict[str, Any], reread_rows[0])
+    return updated
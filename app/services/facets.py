@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+import threading
+import time
+from array import array
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from app.config import FACETS_ENABLED, FACETS_SNAPSHOT_TTL_S
+from app.services.gazetteer import GAZETTEER, Place, extract_place, fold, location_codes
+from app.services.search import _extract_price_range, search_terms
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger("pazarglobal.facets")
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# Price histogram edges (TL); the last bucket is open-ended.
+PRICE_BUCKETS = (0, 1_000, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 1_000_000)
+
+_PAGE_SIZE = 1000
+_TOP_N = 5
+_COLUMNS = "id,title,description,category,price,location,province_code,district_code,metadata,updated_at"
+# A refresh first asks whether any listing changed since the snapshot (one indexed row) and
+# skips the reload when none did; every Nth refresh reloads anyway, since deletes and writes
+# that do not bump `updated_at` (backfills, the keyword reindex) are only seen by a full read.
+_FULL_EVERY = 12
+
+
+def _tokens(*texts: str) -> set[str]:
+    out: set[str] = set()
+    for text in texts:
+        if text:
+            out.update(_TOKEN_RE.findall(fold(text)))
+    return out
+
+
+def _bits(ids: Iterable[int], nbytes: int) -> int:
+    buf = bytearray(nbytes)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _range_bits(lo: int, hi: int) -> int:
+    """Bitmask with rows [lo, hi) set."""
+    return ((1 << hi) - 1) ^ ((1 << lo) - 1) if hi > lo else 0
+
+
+class ListingSnapshot:
+    """Columnar, read-only view of the active listings, used only for facet counts.
+
+    Rows are numbered in price order, so any price range is a contiguous run of row ids
+    (one shift, no scan). Categories, provinces and districts are Python-int bitmaps over
+    those ids; a facet count is `(matched & column_bitmap).bit_count()`. Keyword matching
+    uses folded token postings (prefix match), which approximates the `ilike '%kw%'` the
+    search query runs in Postgres.
+    """
+
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        priced = sorted(rows, key=lambda r: (r.get("price") is None, r.get("price") or 0.0))
+        self.size = len(priced)
+        self.built_at = time.time()
+        # When a refresh last confirmed the snapshot current; staleness is measured from here.
+        self.checked_at = self.built_at
+        # Newest `updated_at` seen (database clock), the lower bound for the next change probe.
+        self.updated_through: Optional[str] = max(
+            (str(r["updated_at"]) for r in rows if r.get("updated_at")), default=None
+        )
+        self._nbytes = (self.size + 7) // 8
+        self.all = _range_bits(0, self.size)
+        self._prices = array("d", [float(r["price"]) for r in priced if r.get("price") is not None])
+
+        categories: dict[str, list[int]] = defaultdict(list)
+        provinces: dict[int, list[int]] = defaultdict(list)
+        districts: dict[int, list[int]] = defaultdict(list)
+        postings: dict[str, list[int]] = defaultdict(list)
+        for i, row in enumerate(priced):
+            if row.get("category"):
+                categories[str(row["category"])].append(i)
+            province_code, district_code = row.get("province_code"), row.get("district_code")
+            if province_code is None:
+                province_code, district_code = location_codes(str(row.get("location") or ""))
+            if province_code is not None:
+                provinces[int(province_code)].append(i)
+            if district_code is not None:
+                districts[int(district_code)].append(i)
+            metadata = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
+            for token in _tokens(str(row.get("title") or ""), str(row.get("description") or ""), str(metadata.get("keywords_text") or "")):
+                postings[token].append(i)
+
+        self.categories = {k: _bits(v, self._nbytes) for k, v in categories.items()}
+        self.provinces = {k: _bits(v, self._nbytes) for k, v in provinces.items()}
+        self.districts = {k: _bits(v, self._nbytes) for k, v in districts.items()}
+        # Frequent tokens keep a ready bitmap; rare ones are expanded from their postings per query.
+        frequent = max(256, self.size // 64)
+        self._token_bits = {t: _bits(ids, self._nbytes) for t, ids in postings.items() if len(ids) >= frequent}
+        self._postings = {t: array("I", ids) for t, ids in postings.items() if len(ids) < frequent}
+        self._tokens = sorted(postings)
+
+    # -- filters ------------------------------------------------------------
+    def keyword_bits(self, keyword: str) -> int:
+        """Rows with a token starting with `keyword` (folded)."""
+        out = 0
+        i = bisect.bisect_left(self._tokens, keyword)
+        while i < len(self._tokens) and self._tokens[i].startswith(keyword):
+            token = self._tokens[i]
+            out |= self._token_bits[token] if token in self._token_bits else _bits(self._postings[token], self._nbytes)
+            i += 1
+        return out
+
+    def price_bits(self, price_min: Optional[float], price_max: Optional[float]) -> int:
+        lo = bisect.bisect_left(self._prices, price_min) if price_min is not None else 0
+        hi = bisect.bisect_right(self._prices, price_max) if price_max is not None else len(self._prices)
+        return _range_bits(lo, hi)
+
+    def place_bits(self, place: Place) -> int:
+        if place.district is not None:
+            return self.districts.get(place.district.code, 0)
+        if place.province is not None:
+            return self.provinces.get(place.province.code, 0)
+        out = 0
+        for district in place.candidates:
+            out |= self.districts.get(district.code, 0)
+        return out
+
+    # -- counts -------------------------------------------------------------
+    def counts(self, matched: int) -> dict[str, Any]:
+        categories = sorted(
+            ((name, (matched & bits).bit_count()) for name, bits in self.categories.items()), key=lambda kv: -kv[1]
+        )
+        cities = sorted(
+            ((code, (matched & bits).bit_count()) for code, bits in self.provinces.items()), key=lambda kv: -kv[1]
+        )
+        price: list[dict[str, Any]] = []
+        for lo, hi in zip(PRICE_BUCKETS, (*PRICE_BUCKETS[1:], None)):
+            start = bisect.bisect_left(self._prices, lo)
+            end = bisect.bisect_left(self._prices, hi) if hi is not None else len(self._prices)
+            count = (matched & _range_bits(start, end)).bit_count()
+            if count:
+                price.append({"min": lo, "max": hi, "count": count})
+        return {
+            "total": matched.bit_count(),
+            "categories": [{"value": name, "count": n} for name, n in categories[:_TOP_N] if n],
+            "cities": [
+                {"value": GAZETTEER.provinces[code].name, "code": code, "count": n} for code, n in cities[:_TOP_N] if n
+            ],
+            "price": price,
+        }
+
+    def facets(
+        self,
+        keywords: list[str],
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        place: Optional[Place] = None,
+    ) -> dict[str, Any]:
+        """Facet counts for the rows search_listings would match (keywords OR-ed, filters AND-ed).
+
+        `keywords` are the query's `search_terms`, the same words search sends as `ilike`.
+        """
+        matched = 0
+        for keyword in keywords:
+            folded = fold(keyword)
+            for token in _TOKEN_RE.findall(folded):
+                if len(token) >= 2:
+                    matched |= self.keyword_bits(token)
+        if not keywords:
+            matched = self.all
+        if price_min is not None or price_max is not None:
+            matched &= self.price_bits(price_min, price_max)
+        if place is not None:
+            matched &= self.place_bits(place)
+        return self.counts(matched)
+
+
+def load_snapshot(supabase: Client, page_size: int = _PAGE_SIZE) -> ListingSnapshot:
+    """Read active listings in keyset pages (`id > last ORDER BY id`) and build the snapshot."""
+    rows: list[dict[str, Any]] = []
+    last_id: Optional[str] = None
+    while True:
+        query = (
+            supabase.table("listings")
+            .select(_COLUMNS)
+            .eq("status", "active")
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = query.order("id").limit(page_size).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        last_id = str(page[-1]["id"])
+    return ListingSnapshot(rows)
+
+
+def changed_since(supabase: Client, updated_through: str) -> bool:
+    """Whether any listing (any status) was written after `updated_through`."""
+    page = supabase.table("listings").select("id").gt("updated_at", updated_through).limit(1).execute().data
+    return bool(page)
+
+
+_snapshot: Optional[ListingSnapshot] = None
+_refreshing = threading.Lock()
+_skipped = 0  # refreshes answered by the change probe since the last full load
+
+
+def _refresh(supabase: Client) -> None:
+    global _snapshot, _skipped
+    try:
+        started = time.perf_counter()
+        snap = _snapshot
+        if (
+            snap is not None
+            and snap.updated_through is not None
+            and _skipped < _FULL_EVERY - 1
+            and not changed_since(supabase, snap.updated_through)
+        ):
+            _skipped += 1
+            snap.checked_at = time.time()
+            return
+        _snapshot = load_snapshot(supabase)
+        _skipped = 0
+        logger.info("facet snapshot: %d listings in %.0f ms", _snapshot.size, (time.perf_counter() - started) * 1000.0)
+    except Exception:
+        logger.exception("facet snapshot refresh failed")
+    finally:
+        _refreshing.release()
+
+
+def get_snapshot(supabase: Client) -> Optional[ListingSnapshot]:
+    """Current snapshot, refreshed in the background once older than FACETS_SNAPSHOT_TTL_S.
+
+    Never blocks a request: until the first load finishes there are simply no facets. A
+    refresh reloads only when listings changed (or every `_FULL_EVERY` refreshes); each
+    reload is a full read plus a rebuild in this worker, so the cost scales with workers.
+    """
+    snap = _snapshot
+    stale = snap is None or time.time() - snap.checked_at > FACETS_SNAPSHOT_TTL_S
+    if stale and _refreshing.acquire(blocking=False):
+        threading.Thread(target=_refresh, args=(supabase,), name="facet-snapshot", daemon=True).start()
+    return snap
+
+
+def warm_snapshot(supabase: Client) -> Optional[ListingSnapshot]:
+    """Load the snapshot now, in the calling thread (startup warm-up), unless a load is running."""
+    if _refreshing.acquire(blocking=False):
+        _refresh(supabase)
+    return _snapshot
+
+
+def set_snapshot(snapshot: Optional[ListingSnapshot]) -> None:
+    """Install a prebuilt snapshot (benchmarks, tests)."""
+    global _snapshot
+    _snapshot = snapshot
+
+
+def listing_facets(supabase: Client, query: str) -> Optional[dict[str, Any]]:
+    """Facet counts (top categories, top cities, price buckets) for a search query, or None."""
+    if not FACETS_ENABLED:
+        return None
+    snap = get_snapshot(supabase)
+    if snap is None:
+        return None
+    q = (query or "").strip()
+    place = extract_place(q) if q else None
+    price_min, price_max = _extract_price_range(q) if q else (None, None)
+    return snap.facets(search_terms(q, place), price_min, price_max, place)
+
+
+def facet_hint(facets: Optional[dict[str, Any]]) -> str:
+    """One-line filter suggestion for chat replies, e.g. "Kategori: Elektronik (12) · Şehir: İstanbul (8)"."""
+    if not facets or not facets.get("total"):
+        return ""
+    parts: list[str] = []
+    if len(facets["categories"]) > 1:
+        parts.append("Kategori: " + ", ".join(f"{c['value']} ({c['count']})" for c in facets["categories"][:3]))
+    if len(facets["cities"]) > 1:
+        parts.append("Şehir: " + ", ".join(f"{c['value']} ({c['count']})" for c in facets["cities"][:3]))
+    if len(facets["price"]) > 1:
+        top = sorted(facets["price"], key=lambda b: -b["count"])[:2]
+        parts.append(
+            "Fiyat: "
+            + ", ".join(
+                (f"{b['min']:,}–{b['max']:,} TL" if b["max"] else f"{b['min']:,}+ TL").replace(",", ".") + f" ({b['count']})"
+                for b in top
+            )
+        )
+    return " · ".join(parts)
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "tr_locations.txt"
+
+# Applied before lower(): "İ".lower() would otherwise leave a combining dot behind.
+_FOLD = str.maketrans({
+    "ç": "c", "Ç": "c",
+    "ğ": "g", "Ğ": "g",
+    "ı": "i", "I": "i", "İ": "i",
+    "ö": "o", "Ö": "o",
+    "ş": "s", "Ş": "s",
+    "ü": "u", "Ü": "u",
+    "â": "a", "Â": "a",
+    "î": "i", "Î": "i",
+    "û": "u", "Û": "u",
+})
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+_KONUM_RE = re.compile(r"konum\s*:", re.IGNORECASE)
+
+# Locative / ablative endings: "istanbulda", "kadıköyden", "izmirdeki".
+_SUFFIXES = ("daki", "deki", "taki", "teki", "dan", "den", "tan", "ten", "da", "de", "ta", "te")
+
+# Everyday words and brands that are also place names ("araç", "bahçe", "pazar", "kemer", "zara").
+# They only count as a location with the province next to them, after "konum:", or as the whole
+# message.
+_WEAK = frozenset({
+    "akdeniz", "alaca", "araban", "arac", "aralik", "armutlu", "bahce", "bala", "batman", "bayat",
+    "bodrum", "bor", "bucak", "bulanik", "cal", "can", "cat", "cay", "cinar", "ciftlik", "cobanlar",
+    "defne", "delice", "demirci", "derince", "dinar", "egil", "eldivan", "elmali", "evren", "eyup",
+    "genc", "guney", "hamur", "han", "hani", "hendek", "hocalar", "kale", "kaman", "kangal", "karasu",
+    "kargi", "kas", "kavak", "kemer", "keskin", "kiraz", "konak", "korfez", "korkut", "kosk", "kula",
+    "kulp", "kumlu", "kumru", "kure", "kursunlu", "maden", "marmara", "meram", "merkez", "mut", "of",
+    "olur", "ordu", "orta", "pazar", "persembe", "saray", "selim", "sur", "susuz", "termal", "tire",
+    "tut", "ula", "ulus", "uzumlu", "yaprakli", "yenice", "yildirim", "zara",
+})
+
+# Folded alias -> canonical folded name (province or "province/district").
+_ALIASES: Dict[str, str] = {
+    "afyon": "afyonkarahisar",
+    "afyon karahisar": "afyonkarahisar",
+    "antep": "gaziantep",
+    "gazi antep": "gaziantep",
+    "urfa": "sanliurfa",
+    "maras": "kahramanmaras",
+    "k maras": "kahramanmaras",
+    "kahraman maras": "kahramanmaras",
+    "icel": "mersin",
+    "eyup": "istanbul/eyupsultan",
+    "eyup sultan": "istanbul/eyupsultan",
+    "mustafa kemal pasa": "bursa/mustafakemalpasa",
+    "marmara ereglisi": "tekirdag/marmaraereglisi",
+    "merkez efendi": "denizli/merkezefendi",
+    "19 mayis": "samsun/ondokuzmayis",
+    "ondokuz mayis": "samsun/ondokuzmayis",
+    "kahraman kazan": "ankara/kahramankazan",
+}
+
+
+def fold(text: str) -> str:
+    """Lowercase ASCII-folded form used for every gazetteer lookup ("Kadıköy" -> "kadikoy")."""
+    folded = (text or "").translate(_FOLD).lower()
+    if len(folded) != len(text or ""):
+        # Exotic characters whose lower() changes length; keep offsets aligned with the input.
+        folded = "".join((c.translate(_FOLD).lower() or c)[:1] for c in text)
+    return folded
+
+
+@dataclass(frozen=True)
+class Province:
+    code: int
+    name: str
+
+
+@dataclass(frozen=True)
+class District:
+    code: int
+    name: str
+    province: Province
+
+
+@dataclass(frozen=True)
+class Place:
+    """A resolved location mention.
+
+    `province`/`district` are None when the name alone is ambiguous (e.g. "Kemer" exists in
+    Antalya and Burdur); `name` then still carries the canonical spelling and `candidates`
+    the districts it may refer to.
+    """
+
+    name: str
+    province: Optional[Province] = None
+    district: Optional[District] = None
+    spans: Tuple[Tuple[int, int], ...] = field(default=(), compare=False)
+    candidates: Tuple[District, ...] = field(default=(), compare=False)
+
+    @property
+    def province_code(self) -> Optional[int]:
+        return self.province.code if self.province else None
+
+    @property
+    def district_code(self) -> Optional[int]:
+        return self.district.code if self.district else None
+
+    @property
+    def label(self) -> str:
+        if self.district and self.province:
+            return f"{self.district.name}, {self.province.name}"
+        if self.province:
+            return self.province.name
+        return self.name
+
+
+# A trie node is (children by folded token, entries ending here). Entries are provinces or
+# districts; one folded name may map to several (e.g. 17 districts called "Merkez").
+_Entry = Tuple[Optional[Province], Optional[District]]
+_Node = Tuple[Dict[str, "_Node"], List[_Entry]]
+
+
+def _new_node() -> _Node:
+    return ({}, [])
+
+
+def _insert(root: _Node, folded_name: str, entry: _Entry) -> None:
+    node = root
+    for token in _TOKEN_RE.findall(folded_name):
+        node = node[0].setdefault(token, _new_node())
+    if entry not in node[1]:
+        node[1].append(entry)
+
+
+class Gazetteer:
+    def __init__(self, lines: List[str]) -> None:
+        self.provinces: Dict[int, Province] = {}
+        self.districts: Dict[int, District] = {}
+        self._root: _Node = _new_node()
+        by_folded: Dict[str, _Entry] = {}
+
+        for raw in lines:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            plate, province_name, district_names = line.split("|")
+            province = Province(code=int(plate), name=province_name)
+            self.provinces[province.code] = province
+            _insert(self._root, fold(province_name), (province, None))
+            by_folded[fold(province_name)] = (province, None)
+            for ordinal, district_name in enumerate(district_names.split(","), start=1):
+                district = District(code=province.code * 100 + ordinal, name=district_name, province=province)
+                self.districts[district.code] = district
+                _insert(self._root, fold(district_name), (None, district))
+                by_folded[f"{fold(province_name)}/{fold(district_name)}"] = (None, district)
+
+        for alias, target in _ALIASES.items():
+            if target in by_folded:
+                _insert(self._root, alias, by_folded[target])
+
+    # -- lookup -----------------------------------------------------------
+    def _match_at(self, tokens: List[Tuple[str, int, int]], i: int) -> Tuple[int, List[_Entry], str, bool]:
+        """Longest name starting at token i; returns (tokens consumed, entries, matched name, suffixed).
+
+        The name is the folded stem that matched ("canta" -> "can"), so weak-word checks see
+        what was actually looked up.
+        """
+        node = self._root
+        best: Tuple[int, List[_Entry], str, bool] = (0, [], "", False)
+        for j in range(i, len(tokens)):
+            token = tokens[j][0]
+            child = node[0].get(token)
+            if child is None:
+                # Only the last word of a name may carry a case suffix.
+                for suffix in _SUFFIXES:
+                    if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                        stem = token[: -len(suffix)]
+                        stripped = node[0].get(stem)
+                        if stripped is not None and stripped[1]:
+                            name = " ".join([*(t[0] for t in tokens[i:j]), stem])
+                            return (j - i + 1, stripped[1], name, True)
+                break
+            node = child
+            if node[1]:
+                best = (j - i + 1, node[1], " ".join(t[0] for t in tokens[i : j + 1]), False)
+        return best
+
+    def find(self, text: str) -> List[Place]:
+        """All place mentions in `text`, in order, resolved against each other in one pass.
+
+        "Kadıköy İstanbul" yields one Place (district Kadıköy with its province);
+        "Ankara veya İzmir" yields two.
+        """
+        if not text:
+            return []
+        folded = fold(text)
+        tokens = [(m.group(0), m.start(), m.end()) for m in _TOKEN_RE.finditer(folded)]
+        konum = _KONUM_RE.search(folded)
+        labelled_from = konum.end() if konum else len(folded) + 1
+
+        raw: List[Tuple[int, int, List[_Entry], bool]] = []  # start, end, entries, weak
+        covered = 0
+        # A suffix-stripped weak or very short stem ("çanta" -> Çan, "hande" -> Han) is read as
+        # a place only with its province or after "konum:"; a bare message is not enough.
+        bare_allowed = True
+        i = 0
+        while i < len(tokens):
+            consumed, entries, name, suffixed = self._match_at(tokens, i)
+            if not consumed:
+                i += 1
+                continue
+            start, end = tokens[i][1], tokens[i + consumed - 1][2]
+            weak = name in _WEAK or (suffixed and len(name) <= 3)
+            if weak and suffixed:
+                bare_allowed = False
+            raw.append((start, end, entries, weak))
+            covered += consumed
+            i += consumed
+        bare = bare_allowed and covered == len(tokens)
+
+        # Provinces named explicitly give context to district names (and to weak words).
+        mentioned = {
+            e[0].code
+            for start, _, entries, weak in raw
+            if not weak or bare or start >= labelled_from
+            for e in entries
+            if e[0]
+        }
+        places: List[Place] = []
+        absorbed: Dict[int, List[Tuple[int, int]]] = {}
+        for start, end, entries, weak in raw:
+            provinces = [e[0] for e in entries if e[0]]
+            districts = [e[1] for e in entries if e[1]]
+            in_context = [d for d in districts if d.province.code in mentioned]
+            if weak and not (in_context or bare or start >= labelled_from):
+                continue
+            if in_context and not provinces:
+                district = in_context[0]
+                absorbed.setdefault(district.province.code, []).append((start, end))
+                places.append(Place(district.name, district.province, district, ((start, end),)))
+            elif provinces:
+                province = provinces[0]
+                places.append(Place(province.name, province, None, ((start, end),)))
+            elif len(districts) == 1:
+                district = districts[0]
+                places.append(Place(district.name, district.province, district, ((start, end),)))
+            else:
+                places.append(Place(districts[0].name, None, None, ((start, end),), tuple(districts)))
+
+        if not absorbed:
+            return places
+        # Drop province mentions that a district of the same province already covers.
+        resolved: List[Place] = []
+        for place in places:
+            code = place.province_code
+            if place.district is None and code in absorbed:
+                absorbed[code].extend(place.spans)
+                continue
+            resolved.append(place)
+        return [
+            Place(p.name, p.province, p.district, tuple(sorted({*p.spans, *absorbed.get(p.province_code or 0, [])})))
+            if p.district is not None
+            else p
+            for p in resolved
+        ]
+
+    def extract(self, text: str) -> Optional[Place]:
+        """The most specific place in `text`: a resolved district, else a province, else an ambiguous name."""
+        places = self.find(text)
+        if not places:
+            return None
+        for place in places:
+            if place.district is not None:
+                return place
+        for place in places:
+            if place.province is not None:
+                return place
+        return places[0]
+
+
+def _load() -> Gazetteer:
+    return Gazetteer(_DATA_PATH.read_text(encoding="utf-8").splitlines())
+
+
+# Built once at import (shared copy-on-write by pre-forked workers).
+GAZETTEER = _load()
+
+
+def find_places(text: str) -> List[Place]:
+    return GAZETTEER.find(text)
+
+
+def extract_place(text: str) -> Optional[Place]:
+    return GAZETTEER.extract(text)
+
+
+def location_codes(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """(province_code, district_code) for a free-text location, as stored on listings."""
+    place = GAZETTEER.extract(text)
+    if place is None:
+        return None, None
+    return place.province_code, place.district_code
@@ -0,0 +1,269 @@
+"""Media ingestion: fetch uploaded images, probe them and drop near-duplicates.
+
+Each URL is fetched through one pooled httpx client per event loop; a semaphore caps how
+many downloads run at once across all requests (`MEDIA_FETCH_CONCURRENCY`), and a body
+over `MEDIA_MAX_BYTES` is abandoned mid-stream. The bytes are then analysed in a process
+pool (`MEDIA_HASH_WORKERS`): format and dimensions from the file header (stdlib only),
+sha256 of the content, and a 64-bit difference hash (dHash) when Pillow is installed.
+
+An upload is a duplicate when its content hash matches, or its dHash is within
+`MEDIA_DUP_DISTANCE` bits of an image already on the draft or earlier in the batch (the
+same photo re-encoded, resized or re-sent). Without Pillow only exact copies are caught.
+Images that cannot be fetched are kept by URL with an `error` field, never lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import struct
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Optional
+
+from app.config import (
+    MEDIA_BASE_URL,
+    MEDIA_DUP_DISTANCE,
+    MEDIA_FETCH_CONCURRENCY,
+    MEDIA_FETCH_TIMEOUT_S,
+    MEDIA_HASH_WORKERS,
+    MEDIA_INGEST_ENABLED,
+    MEDIA_MAX_BYTES,
+)
+from app.core.request_stats import phase
+from app.services.draft_store import get_draft_store
+from app.services.drafts import store_media, store_media_urls
+
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client
+
+logger = logging.getLogger("pazarglobal.media")
+
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class MediaTooLarge(RuntimeError):
+    pass
+
+
+# -- analysis (runs in the worker processes) ---------------------------------
+def probe(data: bytes) -> tuple[Optional[str], Optional[int], Optional[int]]:
+    """(format, width, height) from the file header; Nones when the format is not recognised."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return "webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return "webp", int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+        return "webp", None, None
+    if data.startswith(b"\xff\xd8"):
+        i = 2
+        while i + 9 <= len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in _SOF_MARKERS:
+                height, width = struct.unpack(">HH", data[i + 5 : i + 9])
+                return "jpeg", width, height
+            if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD9:
+                i += 1 if marker == 0xFF else 2
+                continue
+            i += 2 + struct.unpack(">H", data[i + 2 : i + 4])[0]
+        return "jpeg", None, None
+    if data.startswith(b"BM") and len(data) >= 26:
+        width, height = struct.unpack("<ii", data[18:26])
+        return "bmp", width, abs(height)
+    return None, None, None
+
+
+def check_pillow() -> bool:
+    """True when Pillow is importable; logs an error at startup if media ingest needs it and it is missing."""
+    import importlib.util
+
+    available = importlib.util.find_spec("PIL") is not None
+    if MEDIA_INGEST_ENABLED and not available:
+        logger.error(
+            "MEDIA_INGEST_ENABLED is set but Pillow is not installed: near-duplicate detection and the "
+            "vision cache fall back to exact content hashes (pip install -r requirements.txt)"
+        )
+    return available
+
+
+def dhash(data: bytes) -> Optional[int]:
+    """64-bit difference hash: each bit says whether a pixel is brighter than its right neighbour
+    on a 9×8 grayscale thumbnail. None without Pillow or for undecodable data."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft("L", (64, 64))  # JPEG: let the decoder downscale (much cheaper than a full decode)
+            pixels = image.convert("L").resize((9, 8), Image.BILINEAR).tobytes()
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def analyze(data: bytes) -> dict[str, Any]:
+    fmt, width, height = probe(data)
+    phash = dhash(data) if fmt is not None else None
+    return {
+        "bytes": len(data),
+        "format": fmt,
+        "width": width,
+        "height": height,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "dhash": f"{phash:016x}" if phash is not None else None,
+    }
+
+
+def is_duplicate(info: dict[str, Any], seen: list[dict[str, Any]], max_distance: int = MEDIA_DUP_DISTANCE) -> bool:
+    for other in seen:
+        if info.get("sha256") and info.get("sha256") == other.get("sha256"):
+            return True
+        a, b = info.get("dhash"), other.get("dhash")
+        if a and b and (int(a, 16) ^ int(b, 16)).bit_count() <= max_distance:
+            return True
+    return False
+
+
+# -- pools -------------------------------------------------------------------
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+_fetch_slots: asyncio.Semaphore | None = None
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_client() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    # Same per-loop pooling as the OpenAI client; httpx stays out of the startup import graph.
+    import httpx
+
+    global _client, _client_loop, _fetch_slots
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        concurrency = max(1, MEDIA_FETCH_CONCURRENCY)
+        _client = httpx.AsyncClient(
+            timeout=MEDIA_FETCH_TIMEOUT_S,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        _client_loop = loop
+        _fetch_slots = asyncio.Semaphore(concurrency)
+    assert _fetch_slots is not None
+    return _client, _fetch_slots
+
+
+def _get_executor() -> Optional[Executor]:
+    global _executor
+    if MEDIA_HASH_WORKERS <= 0:
+        return None
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and worker threads is unsafe.
+        _executor = ProcessPoolExecutor(MEDIA_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+async def aclose_media() -> None:
+    global _client, _client_loop, _executor
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# -- pipeline ----------------------------------------------------------------
+def resolve_url(path: str) -> str:
+    path = path.strip()
+    if path.startswith(("http://", "https://")) or not MEDIA_BASE_URL:
+        return path
+    return f"{MEDIA_BASE_URL}/{path.lstrip('/')}"
+
+
+async def fetch(url: str, max_bytes: int = MEDIA_MAX_BYTES) -> bytes:
+    client, slots = _get_client()
+    async with slots:
+        async with client.stream("GET", resolve_url(url)) as resp:
+            resp.raise_for_status()
+            declared = resp.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise MediaTooLarge(f"{declared} bytes")
+            chunks: list[bytes] = []
+            size = 0
+            async for chunk in resp.aiter_bytes():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise MediaTooLarge(f">{max_bytes} bytes")
+                chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _fetch_and_analyze(url: str) -> dict[str, Any]:
+    try:
+        data = await fetch(url)
+    except Exception as exc:
+        logger.warning("media fetch failed for %s: %s", url, exc)
+        return {"url": url, "error": type(exc).__name__}
+    executor = _get_executor()
+    if executor is None:
+        info = await asyncio.to_thread(analyze, data)
+    else:
+        info = await asyncio.get_running_loop().run_in_executor(executor, analyze, data)
+    return {"url": url, **info}
+
+
+async def ingest_media(
+    urls: list[str], existing: Optional[list[dict[str, Any]]] = None
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """Fetch and analyse `urls` concurrently; returns (kept media entries, dropped duplicate URLs).
+
+    Order follows `urls`, so of two near-identical uploads the first one is kept.
+    """
+    seen = [m for m in existing or [] if isinstance(m, dict)]
+    known_urls = {m.get("url") for m in seen}
+    fresh = [u for u in dict.fromkeys(u for u in urls if u) if u not in known_urls]
+    with phase("media"):
+        results = await asyncio.gather(*(_fetch_and_analyze(u) for u in fresh))
+    kept: list[dict[str, Any]] = []
+    dropped: list[str] = []
+    for info in results:
+        if "error" not in info and is_duplicate(info, seen):
+            dropped.append(info["url"])
+            continue
+        seen.append(info)
+        kept.append(info)
+    return kept, dropped
+
+
+async def attach_media(supabase: Client, draft_id: str, urls: list[str]) -> tuple[dict[str, Any], list[str]]:
+    """Ingest `urls` into the draft (images + listing_data.media); returns (draft, dropped URLs)."""
+    if not MEDIA_INGEST_ENABLED:
+        return store_media_urls(supabase, draft_id, urls), []
+    current = get_draft_store(supabase).get(draft_id, "images,listing_data")
+    if not current:
+        raise RuntimeError("Draft bulunamadı")
+    listing_data = current.get("listing_data") if isinstance(current.get("listing_data"), dict) else {}
+    existing = listing_data.get("media") if isinstance(listing_data.get("media"), list) else []
+    kept, dropped = await ingest_media(urls, existing)
+    return store_media(supabase, draft_id, kept, current), dropped
@@ -30,6 +30,14 @@ def _normalize_keyword(token: str) -> Optional[str]:
     return token
 
 
+_CURRENCY = frozenset({"tl", "try", "lira", "tr"})
+
+
+def _is_price_or_number(token: str) -> bool:
+    """Prices, phone numbers and other bare numbers: never keywords when they come from free text."""
+    return token.isdigit() or token in _CURRENCY
+
+
 def _dedupe_preserve_order(items: List[str]) -> List[str]:
     seen: set[str] = set()
     out: List[str] = []
@@ -42,6 +50,12 @@ def _dedupe_preserve_order(items: List[str]) -> List[str]:
     return out
 
 
+def merge_keywords(base: List[str], extra: List[str], max_keywords: int = 12) -> List[str]:
+    """`base` first, then the normalised `extra` keywords it lacks (bare numbers and currency dropped), capped."""
+    kept = [k for k in (_normalize_keyword(str(t)) for t in extra) if k and not _is_price_or_number(k)]
+    return _dedupe_preserve_order([*base, *kept])[: max(1, int(max_keywords))]
+
+
 def generate_listing_keywords_deterministic(
     *,
     title: str,
@@ -60,9 +74,14 @@ def generate_listing_keywords_deterministic(
 
     blob = " ".join([title, category, description, condition]).lower()
 
-    tokens = re.findall(r"[0-9a-zçğıöşü+]{2,}", blob)
+    # Numbers in the title are model names ("iphone 13"); in the description they are prices
+    # and phone numbers, which the keyword rules exclude (no PII, no prices).
+    tokens = re.findall(r"[0-9a-zçğıöşü+]{2,}", f"{title} {category}".lower())
+    tokens += [
+        t for t in re.findall(r"[0-9a-zçğıöşü+]{2,}", f"{description} {condition}".lower()) if not _is_price_or_number(t)
+    ]
     tokens = [_normalize_keyword(t) for t in tokens]
-    tokens = [t for t in tokens if t]
+    tokens = [t for t in tokens if t and t not in _CURRENCY]
 
     boosters: List[str] = []
     cat_lc = category.lower()
@@ -128,15 +147,7 @@ async def generate_listing_keywords(
         if not isinstance(raw, list):
             return base
 
-        extra: List[str] = []
-        for t in cast(list[Any], raw):
-            kw = _normalize_keyword(str(t))
-            if kw:
-                extra.append(kw)
-        extra = _dedupe_preserve_order(extra)
-
-        merged = _dedupe_preserve_order([*(base.get("keywords") or []), *extra])
-        merged = merged[: max(1, int(max_keywords))]
+        merged = merge_keywords(base.get("keywords") or [], cast(list[Any], raw), max_keywords)
         return {"keywords": merged, "keywords_text": " ".join(merged)}
     except Exception:
         return base
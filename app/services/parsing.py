@@ -3,11 +3,20 @@ from __future__ import annotations
 import re
 from typing import Any
 
-from app.core.helpers import extract_price_try
+from app.core.helpers import extract_price_try, is_command_only
+from app.core.request_stats import phase
 from app.services.category_library import normalize_category_id
+from app.services.gazetteer import extract_place
+
+_KONUM_TAIL_RE = re.compile(r"konum\s*:\s*([A-Za-zÇĞİÖŞÜçğıöşü\s]{3,40})$", re.IGNORECASE)
 
 
 def extract_simple_fields(message: str) -> dict[str, Any]:
+    with phase("extract"):
+        return _extract_simple_fields(message)
+
+
+def _extract_simple_fields(message: str) -> dict[str, Any]:
     msg = (message or "").strip()
     patch: dict[str, Any] = {}
 
@@ -17,27 +26,39 @@ def extract_simple_fields(message: str) -> dict[str, Any]:
             patch["price"] = p
 
     loc = None
-    mloc = re.search(r"(?:konum\s*:\s*)?([A-Za-zÇĞİÖŞÜçğıöşü\s]{3,20})$", msg)
-    if mloc:
+    loc_spans: list[tuple[int, int]] = []
+    with phase("location"):
+        place = extract_place(msg)
+    mloc = _KONUM_TAIL_RE.search(msg)
+    if place:
+        loc = place.label
+        loc_spans = list(place.spans)
+        if mloc:
+            loc_spans.append((mloc.start(), mloc.start(1)))
+    elif mloc:
+        # "konum: Bağdat Caddesi" - free text is still accepted when it is explicitly labelled.
         candidate = mloc.group(1).strip()
         candidate_lc = candidate.lower()
         blocked_location = ["tl", "try", "lira", "türk lirası", "turk lirasi", "arıyorum", "aramak", "var mı", "varmi"]
         if len(candidate.split()) <= 3 and not any(b in candidate_lc for b in blocked_location):
             loc = candidate
+            loc_spans = [(mloc.start(), mloc.end())]
     if loc:
         patch["location"] = loc
 
-    cat = normalize_category_id(msg)
+    with phase("classify"):
+        cat = normalize_category_id(msg)
     if cat:
         patch["category"] = cat
 
-    if len(msg) >= 4 and not any(k in msg.lower() for k in ["ara", "bul", "listele", "onaylıyorum", "yayınla", "iptal", "naber", "nasılsın", "nasıl gidiyor"]):
+    # Greetings, acknowledgements and bare commands must not overwrite the draft title.
+    if len(msg) >= 4 and not is_command_only(msg) and not any(k in msg.lower() for k in ["ara", "bul", "listele", "onaylıyorum", "yayınla", "iptal", "naber", "nasılsın", "nasıl gidiyor"]):
         if not re.fullmatch(r"\d{2,7}", msg.strip()):
             clean_title = msg
+            for start, end in sorted(loc_spans, reverse=True):
+                clean_title = clean_title[:start] + " " + clean_title[end:]
             if p is not None:
                 clean_title = re.sub(r"(?<!\d)\d{2,7}\s*(?:tl|₺)?(?!\d)", "", clean_title, flags=re.IGNORECASE)
-            if loc:
-                clean_title = re.sub(rf"\b{re.escape(loc)}\b", "", clean_title, flags=re.IGNORECASE)
             clean_title = re.sub(r"\s+", " ", clean_title).strip()
             if "?" in clean_title:
                 clean_title = ""
@@ -1,17 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from fastapi import HTTPException
-from supabase import Client
 
-from app.config import OPENAI_API_KEY
+from app.core.deadline import allows as deadline_allows
+from app.core.deadline import reserve as deadline_reserve
+from app.core.deadline import suspended as deadline_suspended
 from app.core.helpers import now_iso
+from app.config import LOCATION_CODES_ENABLED
 from app.services.category_library import normalize_category_id
-from app.services.drafts import draft_missing_fields
+from app.services.drafts import delete_draft, draft_missing_fields
 from app.services.metadata_keywords import generate_listing_keywords
-from app.services.description_composer import compose_description, enrich_title
-from app.clients.openai import openai_chat
+from app.services.description_composer import compose_description, description_inputs, enrich_title
+from app.services.gazetteer import location_codes
+from app.services.spelling import add_listing
+from app.clients.openai import openai_available, openai_chat
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 def _ensure_dict(value: Any) -> dict[str, Any]:
@@ -61,15 +68,18 @@ async def publish_listing_from_draft(supabase: Client, user_id: str, draft: dict
         async def _llm(system: str, user: str) -> str:
             return await openai_chat(system, user)
 
-        keywords = await generate_listing_keywords(
-            title=_ensure_str(listing_data.get("title") or ""),
-            category=_ensure_str(category_value or ""),
-            description=_ensure_str(listing_data.get("description") or ""),
-            condition=_ensure_str(listing_data.get("condition") or ""),
-            vision_product=None,
-            max_keywords=12,
-            llm_generate=_llm if OPENAI_API_KEY else None,
-        )
+        # Without enough request budget left the deterministic keywords are published.
+        use_llm = openai_available() and deadline_allows("llm_keywords")
+        with deadline_reserve():
+            keywords = await generate_listing_keywords(
+                title=_ensure_str(listing_data.get("title") or ""),
+                category=_ensure_str(category_value or ""),
+                description=_ensure_str(listing_data.get("description") or ""),
+                condition=_ensure_str(listing_data.get("condition") or ""),
+                vision_product=None,
+                max_keywords=12,
+                llm_generate=_llm if use_llm else None,
+            )
     except Exception:
         pass
 
@@ -92,54 +102,63 @@ async def publish_listing_from_draft(supabase: Client, user_id: str, draft: dict
         },
         "view_count": 0,
     }
-
-    created = supabase.table("listings").insert(payload).execute()
-    created_rows = (created.data or []) if hasattr(created, "data") else []
-    if not created_rows:
-        raise HTTPException(status_code=500, detail="Listing oluşturulamadı")
-    created_row = cast(dict[str, Any], created_rows[0])
-
-    # Deduct 55 credits from user (critical operation)
-    try:
-        profile_result = supabase.table("profiles").select("credits").eq("id", user_id).limit(1).execute()
-        profile_rows = (profile_result.data or []) if hasattr(profile_result, "data") else []
+    if not description_raw:
+        # Lets `python -m app.maintenance.reindex --descriptions` recompose it later.
+        payload["metadata"]["description_inputs"] = description_inputs(listing_data, vision_data)
+    if LOCATION_CODES_ENABLED:
+        payload["province_code"], payload["district_code"] = location_codes(payload["location"])
+
+    # Once the listing is inserted, the credit deduction and draft deletion must follow
+    # even if the request deadline passes meanwhile.
+    with deadline_suspended():
+        created = supabase.table("listings").insert(payload).execute()
+        created_rows = (created.data or []) if hasattr(created, "data") else []
+        if not created_rows:
+            raise HTTPException(status_code=500, detail="Listing oluşturulamadı")
+        created_row = cast(dict[str, Any], created_rows[0])
+        add_listing(payload["title"], payload["metadata"]["keywords_text"])
+
+        # Deduct 55 credits from user (critical operation)
+        try:
+            profile_result = supabase.table("profiles").select("credits").eq("id", user_id).limit(1).execute()
+            profile_rows = (profile_result.data or []) if hasattr(profile_result, "data") else []
         
-        if profile_rows:
-            current_credits = cast(dict[str, Any], profile_rows[0]).get("credits", 0) or 0
-            new_credits = max(0, int(current_credits) - 55)  # Min 0
+            if profile_rows:
+                current_credits = cast(dict[str, Any], profile_rows[0]).get("credits", 0) or 0
+                new_credits = max(0, int(current_credits) - 55)  # Min 0
             
-            supabase.table("profiles").update({
-                "credits": new_credits,
-                "updated_at": now_iso()
-            }).eq("id", user_id).execute()
+                supabase.table("profiles").update({
+                    "credits": new_credits,
+                    "updated_at": now_iso()
+                }).eq("id", user_id).execute()
             
-            # Log credit deduction
+                # Log credit deduction
+                supabase.table("audit_logs").insert({
+                    "event_type": "CREDIT_DEDUCTED",
+                    "data": {
+                        "user_id": user_id,
+                        "listing_id": created_row.get("id"),
+                        "credits_deducted": 55,
+                        "credits_remaining": new_credits,
+                        "timestamp": now_iso()
+                    }
+                }).execute()
+        except Exception as e:
+            # Log error but don't fail listing creation (already published)
             supabase.table("audit_logs").insert({
-                "event_type": "CREDIT_DEDUCTED",
+                "event_type": "CREDIT_DEDUCTION_FAILED",
                 "data": {
                     "user_id": user_id,
                     "listing_id": created_row.get("id"),
-                    "credits_deducted": 55,
-                    "credits_remaining": new_credits,
+                    "error": str(e),
                     "timestamp": now_iso()
                 }
             }).execute()
-    except Exception as e:
-        # Log error but don't fail listing creation (already published)
-        supabase.table("audit_logs").insert({
-            "event_type": "CREDIT_DEDUCTION_FAILED",
-            "data": {
-                "user_id": user_id,
-                "listing_id": created_row.get("id"),
-                "error": str(e),
-                "timestamp": now_iso()
-            }
-        }).execute()
 
-    try:
-        # Delete draft after publishing instead of just marking as published
-        supabase.table("active_drafts").delete().eq("id", draft.get("id")).execute()
-    except Exception:
-        pass
+        try:
+            # Delete draft after publishing instead of just marking as published
+            delete_draft(supabase, str(draft.get("id")))
+        except Exception:
+            pass
 
     return created_row
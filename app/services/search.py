@@ -1,9 +1,27 @@
 from __future__ import annotations
 
 import re
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from supabase import Client
+from app.config import LOCATION_CODES_ENABLED
+from app.services.gazetteer import Place, extract_place, fold
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Words that say *that* the user is searching (or carry the price phrase), not *what* for.
+_NON_TERMS = frozenset(
+    fold(w)
+    for w in (
+        "arıyorum", "arıyoruz", "aramak", "ara", "bul", "bulabilir", "listele", "göster", "lazım", "bakmak",
+        "almak", "istiyorum", "lütfen", "var", "mı", "mi", "ilan", "ilanı", "ilanlar", "ilanları", "ilanlara",
+        "satılık", "bir", "bi", "tl", "try", "lira", "₺", "arası", "altı", "altında", "üstü", "üstünde",
+        "under", "below", "over", "above", "fiyat", "fiyatı",
+    )
+)
+# Bare numbers, budgets and ranges: "13", "50k", "20bin-30bin", "5000tl".
+_NUMBER_TERM_RE = re.compile(r"[\d.,]+(?:k|bin|b|tl|₺)?(?:[-–][\d.,]+(?:k|bin|b|tl|₺)?)?")
+_TERM_STRIP = ".,;:!?\"'()[]{}-–/"
 
 
 def search_listings(supabase: Client, query: str, limit: int = 6) -> list[dict[str, Any]]:
@@ -29,8 +47,8 @@ def search_listings(supabase: Client, query: str, limit: int = 6) -> list[dict[s
     # Extract location hints
     location_hint = _extract_location_hint(q)
 
-    keywords = [k for k in re.split(r"\s+", q) if k][:4]
-    if not keywords:
+    keywords = search_terms(q, location_hint)
+    if not keywords and price_min is None and price_max is None and location_hint is None:
         # No keywords? Return recent listings
         try:
             res = (
@@ -58,8 +76,10 @@ def search_listings(supabase: Client, query: str, limit: int = 6) -> list[dict[s
             supabase.table("listings")
             .select("id,title,price,location,category,condition,images,created_at")
             .eq("status", "active")
-            .or_(or_str)
         )
+        if or_str:
+            # Only the place / price filters when the query named nothing else ("istanbulda 50k altı").
+            base_query = base_query.or_(or_str)
         
         # Apply price filters if found
         if price_min is not None:
@@ -68,15 +88,15 @@ def search_listings(supabase: Client, query: str, limit: int = 6) -> list[dict[s
             base_query = base_query.lte("price", price_max)
         
         # Apply location filter if found
-        if location_hint:
-            base_query = base_query.ilike("location", f"%{location_hint}%")
+        if location_hint is not None:
+            base_query = _filter_location(base_query, location_hint)
         
         return base_query.order("created_at", desc=True).limit(limit).execute()
 
     try:
         res = _run(",".join([*ors, *meta_ors]))
         # If no results, try without metadata search
-        if not res.data:
+        if not res.data and ors:
             res = _run(",".join(ors))
         # If still no results, return recent listings as fallback
         if not res.data:
@@ -105,6 +125,25 @@ def search_listings(supabase: Client, query: str, limit: int = 6) -> list[dict[s
     return res.data or []
 
 
+def search_terms(query: str, place: Place | None = None) -> list[str]:
+    """Up to four words to match against listings: the query without intent words, numbers and the place.
+
+    `place` is the query's extracted location (its spans are cut out), which search applies as a
+    separate filter. Facet counts use the same terms, so they describe the set search returns.
+    """
+    text = query or ""
+    if place is not None:
+        for start, end in sorted(place.spans, reverse=True):
+            text = f"{text[:start]} {text[end:]}"
+    terms: list[str] = []
+    for raw in text.split():
+        word = raw.strip(_TERM_STRIP)
+        if len(word) < 2 or fold(word) in _NON_TERMS or _NUMBER_TERM_RE.fullmatch(word.lower()):
+            continue
+        terms.append(word)
+    return terms[:4]
+
+
 def _extract_price_range(query: str) -> tuple[float | None, float | None]:
     """Extract price range from queries like '10000-20000 tl' or 'under 50000'"""
     q = query.lower()
@@ -144,20 +183,23 @@ def _parse_number(s: str) -> float | None:
         return None
 
 
-def _extract_location_hint(query: str) -> str | None:
-    """Extract location from query - sadece bilinen şehirler için"""
-    q = query.lower()
-    # Common Turkish cities - word boundary ile tam eşleşme
-    cities = [
-        "istanbul", "ankara", "izmir", "bursa", "antalya", "adana", "konya",
-        "gaziantep", "şanlıurfa", "kocaeli", "mersin", "diyarbakır", "kayseri",
-        "eskişehir", "izmit", "trabzon", "balıkesir", "malatya", "erzurum",
-        "samsun", "denizli", "sakarya", "manisa", "van", "batman", "elazığ",
-        "erzincan", "sivas", "tekirdağ", "çorum", "ordu", "afyon", "aydın"
-    ]
-    # Sadece tam kelime eşleşmesi (samsung gibi yanlış eşleşmeleri engelle)
-    words = q.split()
-    for city in cities:
-        if city in words:
-            return city
-    return None
+def _extract_location_hint(query: str) -> Place | None:
+    """Place mentioned in the query (district, else province, else an ambiguous name), via the gazetteer."""
+    return extract_place(query)
+
+
+def _filter_location(query: Any, place: Place) -> Any:
+    """Equality / IN on the indexed location code columns; ilike on the free text only as a fallback."""
+    if LOCATION_CODES_ENABLED:
+        if place.district is not None:
+            return query.eq("district_code", place.district.code)
+        if place.province is not None:
+            return query.eq("province_code", place.province.code)
+        if place.candidates:
+            return query.in_("district_code", [d.code for d in place.candidates])
+    return query.ilike("location", _location_pattern(place.name))
+
+
+def _location_pattern(name: str) -> str:
+    """ilike pattern tolerant to Turkish letters: "Kadıköy" -> "%Kad_k_y%" matches "kadikoy" too."""
+    return "%" + "".join("_" if (c in "iIıİ" or not c.isascii()) else c for c in name) + "%"
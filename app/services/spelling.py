@@ -0,0 +1,393 @@
+"""Typo-tolerant search terms: a folded vocabulary of listing titles and keywords, with a trigram index.
+
+As typed, "ıphone", "samsun galaxy" or "bısiklet" match no listing, so `search_listings` runs
+all of its fallbacks and ends on the most recent listings. Before the query goes to the
+database, `correct_query` rewrites the tokens it does not know to terms the listings use:
+
+- tokens are folded with the category library's `_TR_MAP` ("bısiklet" -> "bisiklet"). A known
+  term is written the way titles spell it most often ("canta" -> "çanta"), so `ilike` matches;
+- a prefix of a known term stays as typed ("iphon"): `ilike '%kw%'` already matches it;
+- any other token is looked up in a trigram index bucketed by term length. Candidates that
+  share enough trigrams are checked by edit distance (1 edit up to 7 letters, 2 above). The
+  closest wins, then the most frequent;
+- a place name ("samsun") is only rewritten when the correction and a neighbouring word occur
+  next to each other in some title ("samsung galaxy"). Otherwise it stays a location filter.
+
+The vocabulary loads like the facet snapshot: in the background on first use, or during the
+startup warm-up. It is rebuilt in full every SPELLING_REBUILD_S, so terms of removed listings
+age out. In between, `add_listing` extends it in place whenever this worker publishes or
+imports a listing.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+from app.config import SPELLING_ENABLED, SPELLING_REBUILD_S
+from app.core.metrics import SEARCH_CORRECTIONS, gauge, register_cache
+from app.services.category_library import _TR_MAP
+from app.services.gazetteer import extract_place
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger("pazarglobal.spelling")
+
+_WORD_RE = re.compile(r"[0-9a-zçğıöşü]+")
+_PAGE_SIZE = 1000
+_CANDIDATES = 12
+_CACHE_MAX = 50_000
+
+# Words of the request itself, not of listings; never rewritten into a listing term.
+_FILLER = frozenset(
+    {
+        "ariyorum", "ariyom", "ariyoruz", "aranan", "aramak", "istiyorum", "lazim", "satilik", "satiyorum",
+        "almak", "alacagim", "bakmak", "bakiyorum", "goster", "gosterir", "gosterin", "listele", "bul",
+        "ilan", "ilani", "ilanlar", "ilanlari", "acil", "ucuz", "uygun", "fiyat", "fiyatli", "fiyata",
+        "var", "varmi", "icin", "ile", "olan", "gibi", "alti", "altinda", "ustu", "ustunde", "arasi",
+        "bin", "lira", "kac", "nerede", "bana", "bir", "veya", "yada", "hangi", "under", "over", "below", "above",
+    }
+)
+
+
+def _lower(text: str) -> str:
+    # "İ".lower() is "i" plus a combining dot (also in text lowercased upstream); keep the plain letter.
+    return (text or "").replace("İ", "i").lower().replace("\u0307", "")
+
+
+def _fold(word: str) -> str:
+    return word.translate(_TR_MAP)
+
+
+def _grams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_edits(length: int) -> int:
+    if length < 4:
+        return 0
+    return 1 if length <= 7 else 2
+
+
+def _distance(a: str, b: str, limit: int) -> int:
+    """Edit distance where an adjacent swap counts once; `limit + 1` as soon as it is exceeded.
+
+    Only the band |i - j| <= limit of the table is filled: a path outside it costs more.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    before: list[int] = []
+    prev = [min(j, over) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        cur = [over] * (len(b) + 1)
+        cur[0] = best = min(i, over)
+        char = a[i - 1]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = prev[j - 1] + (char != b[j - 1])
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if cur[j - 1] + 1 < value:
+                value = cur[j - 1] + 1
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1] and before[j - 2] + 1 < value:
+                value = before[j - 2] + 1
+            cur[j] = value if value < over else over
+            if value < best:
+                best = value
+        if best > limit:
+            return over
+        before, prev = prev, cur
+    return prev[-1]
+
+
+def _keywords_text(row: dict[str, Any]) -> str:
+    metadata = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
+    return str(metadata.get("keywords_text") or "")
+
+
+_lookups = [0, 0]  # near-match cache (hits, misses), across rebuilds
+
+
+class Vocabulary:
+    """Folded terms of the listing titles and keywords, and a trigram index for near matches.
+
+    Writers hold `_lock`; readers do not. Every structure is only appended to, so a search
+    running next to `add` sees the term either fully indexed or not yet.
+    """
+
+    def __init__(self) -> None:
+        self.built_at = time.time()
+        self._lock = threading.Lock()
+        self._ids: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._freq: list[int] = []
+        # Folded term -> how titles write it, only where that differs ("canta" -> {"çanta": 3}).
+        self._spellings: dict[str, Counter[str]] = {}
+        self._sorted: list[str] = []
+        # Term length -> trigram -> ids of the terms of that length containing it.
+        self._grams: dict[int, dict[str, list[int]]] = {}
+        # Hashes of adjacent folded title words ("samsung galaxy"), to confirm place-name rewrites.
+        self._pairs: set[int] = set()
+        self._near: dict[str, Optional[str]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self._terms)
+
+    @classmethod
+    def build(cls, rows: Iterable[dict[str, Any]]) -> Vocabulary:
+        vocab = cls()
+        for row in rows:
+            vocab._add(str(row.get("title") or ""), _keywords_text(row), keep_sorted=False)
+        vocab._sorted = sorted(vocab._ids)
+        return vocab
+
+    # -- writing ------------------------------------------------------------
+    def add(self, title: str, keywords_text: str = "") -> None:
+        """Index one listing's title and keywords."""
+        with self._lock:
+            self._add(title, keywords_text, keep_sorted=True)
+
+    def _add(self, title: str, keywords_text: str, keep_sorted: bool) -> None:
+        title_words = _WORD_RE.findall(_lower(title))
+        added = False
+        for word in (*title_words, *_WORD_RE.findall(_lower(keywords_text))):
+            term = _fold(word)
+            if len(term) >= 2 and not term.isdigit():
+                added |= self._add_term(term, word, keep_sorted)
+        folded = [_fold(word) for word in title_words]
+        for left, right in zip(folded, folded[1:]):
+            self._pairs.add(hash(f"{left} {right}"))
+        if added:
+            # A new term can be the better match for a token already looked up.
+            self._near.clear()
+
+    def _add_term(self, term: str, word: str, keep_sorted: bool) -> bool:
+        if word != term:
+            self._spellings.setdefault(term, Counter())[word] += 1
+        tid = self._ids.get(term)
+        if tid is not None:
+            self._freq[tid] += 1
+            return False
+        tid = len(self._terms)
+        self._terms.append(term)
+        self._freq.append(1)
+        bucket = self._grams.setdefault(len(term), {})
+        for gram in _grams(term):
+            bucket.setdefault(gram, []).append(tid)
+        if keep_sorted:
+            bisect.insort(self._sorted, term)
+        self._ids[term] = tid
+        return True
+
+    # -- reading ------------------------------------------------------------
+    def spelling(self, term: str) -> str:
+        """How titles most often write the folded `term`."""
+        forms = self._spellings.get(term)
+        if not forms:
+            return term
+        word, n = forms.most_common(1)[0]
+        return word if n > self._freq[self._ids[term]] - sum(forms.values()) else term
+
+    def _extends(self, term: str) -> bool:
+        i = bisect.bisect_left(self._sorted, term)
+        return i < len(self._sorted) and self._sorted[i].startswith(term)
+
+    def _paired(self, term: str, left: Optional[str], right: Optional[str]) -> bool:
+        return (left is not None and hash(f"{left} {term}") in self._pairs) or (
+            right is not None and hash(f"{term} {right}") in self._pairs
+        )
+
+    def closest(self, term: str) -> Optional[str]:
+        """Nearest other known term to the folded `term` within its edit limit, or None."""
+        if term in self._near:
+            _lookups[0] += 1
+            return self._near[term]
+        _lookups[1] += 1
+        best = self._closest(term)
+        if len(self._near) >= _CACHE_MAX:
+            self._near.clear()
+        self._near[term] = best
+        return best
+
+    def _closest(self, term: str) -> Optional[str]:
+        # Most typos are one edit, and a one-edit match wins anyway: widen only if none is found.
+        grams = _grams(term)
+        for limit in range(1, _max_edits(len(term)) + 1):
+            best = self._within(term, grams, limit)
+            if best is not None:
+                return best
+        return None
+
+    def _within(self, term: str, grams: set[str], limit: int) -> Optional[str]:
+        lengths = range(len(term) - limit, len(term) + limit + 1)
+        postings = [
+            [ids for ids in (self._grams.get(length, {}).get(gram) for length in lengths) if ids] for gram in grams
+        ]
+        # One edit changes at most three trigrams, an adjacent swap four. So a term within
+        # `limit` edits shares at least one of any 4 * limit + 1 of them: count only the rarest
+        # that occur at all (the ones the typo made up match nothing).
+        postings = sorted((lists for lists in postings if lists), key=lambda lists: sum(map(len, lists)))
+        shared: Counter[int] = Counter()
+        for lists in postings[: 4 * limit + 1]:
+            for ids in lists:
+                shared.update(ids)
+        needed = len(grams) - 4 * limit
+        best: Optional[str] = None
+        best_key = (limit + 1, 0)
+        for tid, _ in shared.most_common(_CANDIDATES):
+            candidate = self._terms[tid]
+            if candidate == term or len(grams & _grams(candidate)) < needed:
+                continue
+            distance = _distance(term, candidate, limit)
+            if distance > limit:
+                continue
+            key = (distance, -self._freq[tid])
+            if key < best_key:
+                best, best_key = candidate, key
+        return best
+
+    def correct(self, query: str) -> str:
+        """`query` with unknown tokens rewritten to known terms; returned as is when nothing changes."""
+        text = _lower(query)
+        matches = list(_WORD_RE.finditer(text))
+        resolved = [_fold(m.group()) for m in matches]
+        rewrites: dict[int, str] = {}
+        for i, match in enumerate(matches):
+            word, term = match.group(), resolved[i]
+            if len(term) < 3 or not term.isalpha() or term in _FILLER:
+                continue
+            left = resolved[i - 1] if i > 0 else None
+            right = resolved[i + 1] if i + 1 < len(matches) else None
+            if extract_place(word) is not None:
+                # A place name stays a location filter unless it is a misspelt word of a title
+                # phrase ("samsun galaxy": Samsung, not the city).
+                if (left or right) and not self._paired(term, left, right):
+                    better = self.closest(term)
+                    if better is not None and self._paired(better, left, right):
+                        rewrites[i], resolved[i] = self.spelling(better), better
+                        SEARCH_CORRECTIONS.inc("typo")
+                continue
+            if term in self._ids:
+                spelled = self.spelling(term)
+                if spelled != word:
+                    rewrites[i] = spelled
+                    SEARCH_CORRECTIONS.inc("diacritics")
+                continue
+            if self._extends(term):
+                continue
+            better = self.closest(term)
+            if better is not None:
+                rewrites[i], resolved[i] = self.spelling(better), better
+                SEARCH_CORRECTIONS.inc("typo")
+        if not rewrites:
+            return query
+        out: list[str] = []
+        pos = 0
+        for i, spelled in rewrites.items():
+            start, end = matches[i].span()
+            out.append(text[pos:start])
+            out.append(spelled)
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+
+def _active_rows(supabase: Client, page_size: int) -> Iterator[dict[str, Any]]:
+    """Active listings' titles and metadata in keyset pages (`id > last ORDER BY id`)."""
+    last_id: Optional[str] = None
+    while True:
+        query = supabase.table("listings").select("id,title,metadata").eq("status", "active")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = query.order("id").limit(page_size).execute().data or []
+        yield from page
+        if len(page) < page_size:
+            return
+        last_id = str(page[-1]["id"])
+
+
+def load_vocabulary(supabase: Client, page_size: int = _PAGE_SIZE) -> Vocabulary:
+    return Vocabulary.build(_active_rows(supabase, page_size))
+
+
+_vocabulary: Optional[Vocabulary] = None
+_building = threading.Lock()
+# Listings published while a rebuild reads the table, replayed onto the new vocabulary.
+_pending: list[tuple[str, str]] = []
+_pending_lock = threading.Lock()
+
+
+def _rebuild(supabase: Client) -> None:
+    global _vocabulary
+    try:
+        started = time.perf_counter()
+        with _pending_lock:
+            _pending.clear()
+        vocab = load_vocabulary(supabase)
+        with _pending_lock:
+            for title, keywords_text in _pending:
+                vocab.add(title, keywords_text)
+            _pending.clear()
+            _vocabulary = vocab
+        logger.info("search vocabulary: %d terms in %.0f ms", vocab.size, (time.perf_counter() - started) * 1000.0)
+    except Exception:
+        logger.exception("search vocabulary rebuild failed")
+    finally:
+        _building.release()
+
+
+def get_vocabulary(supabase: Client) -> Optional[Vocabulary]:
+    """Current vocabulary, rebuilt in the background once older than SPELLING_REBUILD_S.
+
+    Never blocks a request: until the first load finishes, queries go out as typed.
+    """
+    vocab = _vocabulary
+    stale = vocab is None or time.time() - vocab.built_at > SPELLING_REBUILD_S
+    if stale and _building.acquire(blocking=False):
+        threading.Thread(target=_rebuild, args=(supabase,), name="search-vocabulary", daemon=True).start()
+    return vocab
+
+
+def warm_vocabulary(supabase: Client) -> Optional[Vocabulary]:
+    """Load the vocabulary now, in the calling thread (startup warm-up), unless a load is running."""
+    if _building.acquire(blocking=False):
+        _rebuild(supabase)
+    return _vocabulary
+
+
+def set_vocabulary(vocab: Optional[Vocabulary]) -> None:
+    """Install a prebuilt vocabulary (benchmarks, tests)."""
+    global _vocabulary
+    _vocabulary = vocab
+
+
+def add_listing(title: str, keywords_text: str = "") -> None:
+    """Make a just-published listing's terms known to this worker's searches."""
+    if not SPELLING_ENABLED:
+        return
+    with _pending_lock:
+        if _building.locked():
+            _pending.append((title, keywords_text))
+        vocab = _vocabulary
+    if vocab is not None:
+        vocab.add(title, keywords_text)
+
+
+def correct_query(supabase: Client, query: str) -> str:
+    """`query` with misspelt tokens rewritten to known listing terms (see the module docstring)."""
+    if not SPELLING_ENABLED or not query:
+        return query
+    vocab = get_vocabulary(supabase)
+    return vocab.correct(query) if vocab is not None else query
+
+
+register_cache("search_spelling", lambda: (_lookups[0], _lookups[1]))
+gauge("pazarglobal_search_vocabulary_terms", "Known terms in the search typo-correction vocabulary.", lambda: _vocabulary.size if _vocabulary else 0)
@@ -0,0 +1,217 @@
+"""Vision analysis of draft images, merged into the draft's `vision` dict.
+
+`compose_description` and `enrich_title` read brand / model / color / condition from
+`draft["vision"]`. This stage fills it: every ingested image (`listing_data.media`, see
+app/services/media.py) goes to the vision model concurrently, at most
+`VISION_CONCURRENCY` at a time per request, and the per-image answers are merged by
+majority vote per field (ties go to the earlier image).
+
+Answers are cached per process by perceptual hash, so a re-uploaded or shared product
+photo is never analysed twice: a dHash within `MEDIA_DUP_DISTANCE` bits of a cached one
+is a hit. Images without a dHash fall back to their sha256 and only exact copies hit;
+that happens when Pillow is missing, which `media.check_pillow` logs at startup. Concurrent
+requests for the same image share one in-flight call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Any, Optional
+
+import orjson
+
+from app.clients.openai import openai_available, openai_vision
+from app.config import MEDIA_DUP_DISTANCE, VISION_CACHE_SIZE, VISION_CONCURRENCY, VISION_ENABLED, VISION_MAX_IMAGES
+from app.core.deadline import allows as deadline_allows
+from app.core.deadline import reserve as deadline_reserve
+from app.core.metrics import register_cache
+from app.services.drafts import store_vision
+from app.services.media import resolve_url
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger("pazarglobal.vision")
+
+FIELDS = ("brand", "model", "color", "condition")
+
+_SYSTEM = (
+    "Bir ikinci el ilan fotoğrafını inceliyorsun. Yalnızca şu JSON'u döndür: "
+    '{"brand": "", "model": "", "color": "", "condition": ""}. '
+    "Emin olmadığın alanı boş bırak. Renk ve durum Türkçe olsun "
+    "(durum: Sıfır, Çok iyi, İyi, Yıpranmış)."
+)
+
+_BANDS = 8  # dHash bytes; two hashes within 7 bits share at least one byte
+
+
+class VisionCache:
+    """LRU of per-image vision answers keyed by dHash (near matches included) or sha256.
+
+    Near lookups avoid a scan: each dHash is indexed under its 8 (position, byte) bands,
+    and by pigeonhole any hash within 7 bits shares at least one band with it.
+    """
+
+    def __init__(self, max_entries: int = 20_000, max_distance: int = MEDIA_DUP_DISTANCE) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.max_distance = max(0, min(int(max_distance), _BANDS - 1))
+        self._entries: OrderedDict[str, dict[str, str]] = OrderedDict()
+        self._bands: dict[tuple[int, int], set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(media: dict[str, Any]) -> Optional[str]:
+        if media.get("dhash"):
+            return f"d:{media['dhash']}"
+        if media.get("sha256"):
+            return f"s:{media['sha256']}"
+        return None
+
+    @staticmethod
+    def _band_keys(dhash: int) -> list[tuple[int, int]]:
+        return [(i, (dhash >> (8 * i)) & 0xFF) for i in range(_BANDS)]
+
+    def get(self, media: dict[str, Any]) -> Optional[dict[str, str]]:
+        key = self.key(media)
+        if key is None:
+            return None
+        found = key if key in self._entries else None
+        if found is None and key.startswith("d:") and self.max_distance:
+            value = int(key[2:], 16)
+            for band in self._band_keys(value):
+                for other in self._bands.get(band, ()):
+                    if (int(other[2:], 16) ^ value).bit_count() <= self.max_distance:
+                        found = other
+                        break
+                if found is not None:
+                    break
+        if found is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(found)
+        return self._entries[found]
+
+    def put(self, media: dict[str, Any], result: dict[str, str]) -> None:
+        key = self.key(media)
+        if key is None:
+            return
+        if key not in self._entries and key.startswith("d:"):
+            for band in self._band_keys(int(key[2:], 16)):
+                self._bands.setdefault(band, set()).add(key)
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old, _ = self._entries.popitem(last=False)
+            if old.startswith("d:"):
+                for band in self._band_keys(int(old[2:], 16)):
+                    keys = self._bands.get(band)
+                    if keys is not None:
+                        keys.discard(old)
+                        if not keys:
+                            del self._bands[band]
+
+
+cache = VisionCache(VISION_CACHE_SIZE)
+register_cache("vision", lambda: (cache.hits, cache.misses))
+
+_inflight: dict[str, asyncio.Future[Optional[dict[str, str]]]] = {}
+
+
+def parse_vision(text: str) -> dict[str, str]:
+    """The model's JSON answer reduced to non-empty string FIELDS; {} when unusable."""
+    match = re.search(r"\{.*\}", text or "", re.S)
+    if not match:
+        return {}
+    try:
+        data = orjson.loads(match.group(0))
+    except orjson.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {f: str(data[f]).strip() for f in FIELDS if isinstance(data.get(f), (str, int, float)) and str(data[f]).strip()}
+
+
+def merge_vision(results: list[dict[str, str]]) -> dict[str, str]:
+    """Majority vote per field over the per-image answers (case-insensitive, first spelling wins)."""
+    merged: dict[str, str] = {}
+    for field in FIELDS:
+        votes: Counter[str] = Counter()
+        spelling: dict[str, str] = {}
+        for result in results:
+            value = result.get(field)
+            if value:
+                folded = value.casefold()
+                votes[folded] += 1
+                spelling.setdefault(folded, value)
+        if votes:
+            merged[field] = spelling[votes.most_common(1)[0][0]]
+    return merged
+
+
+async def analyze_image(
+    media: dict[str, Any], slots: asyncio.Semaphore, cached_only: bool = False
+) -> Optional[dict[str, str]]:
+    """Vision answer for one ingested image: cache, then a shared in-flight call, then the model."""
+    cached = cache.get(media)
+    if cached is not None or cached_only:
+        return cached
+    key = VisionCache.key(media) or f"u:{media.get('url')}"
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future: asyncio.Future[Optional[dict[str, str]]] = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    result: Optional[dict[str, str]] = None
+    try:
+        async with slots:
+            text = await openai_vision(_SYSTEM, resolve_url(str(media["url"])))
+        result = parse_vision(text)
+        cache.put(media, result)
+    except Exception as exc:
+        logger.warning("vision analysis failed for %s: %s", media.get("url"), exc)
+    finally:
+        # Failures are not cached; waiters get None and the next turn may retry.
+        _inflight.pop(key, None)
+        if not future.done():
+            future.set_result(result)
+    return result
+
+
+async def analyze_images(
+    media: list[dict[str, Any]], concurrency: int = VISION_CONCURRENCY, cached_only: bool = False
+) -> dict[str, Any]:
+    """Merged vision dict for a draft's images (first VISION_MAX_IMAGES fetched ones)."""
+    usable = [m for m in media if isinstance(m, dict) and m.get("url") and not m.get("error")][:VISION_MAX_IMAGES]
+    if not usable:
+        return {}
+    slots = asyncio.Semaphore(max(1, concurrency))
+    answers = await asyncio.gather(*(analyze_image(m, slots, cached_only) for m in usable))
+    results = [a for a in answers if a]
+    merged: dict[str, Any] = merge_vision(results)
+    if merged:
+        merged["images_analyzed"] = len(results)
+    return merged
+
+
+async def attach_vision(supabase: Client, draft_id: str, draft: dict[str, Any]) -> dict[str, Any]:
+    """Analyse the draft's ingested images and store the merged result in `vision`."""
+    if not VISION_ENABLED or not openai_available():
+        return draft
+    listing_data = draft.get("listing_data") if isinstance(draft.get("listing_data"), dict) else {}
+    media = listing_data.get("media") if isinstance(listing_data.get("media"), list) else []
+    # Short on request budget: only answers already in the cache, no new model calls.
+    cached_only = not deadline_allows("vision")
+    with deadline_reserve():
+        vision = await analyze_images(media, cached_only=cached_only)
+    if not vision or vision == draft.get("vision"):
+        return draft
+    return store_vision(supabase, draft_id, vision)
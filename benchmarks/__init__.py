@@ -0,0 +1,5 @@
+"""Local stand-ins, stress checks and benchmarks for the agent backend.
+
+Nothing in this package is imported by the service itself; scripts are run with
+`python -m benchmarks.<name>` from the repository root.
+"""
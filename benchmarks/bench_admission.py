@@ -0,0 +1,183 @@
+"""Admission control under a traffic spike: every turn accepted vs in-flight limit + queue + shedding.
+
+    python -m benchmarks.bench_admission
+    python -m benchmarks.bench_admission --rate 400 --requests 1200 --max-in-flight 16 --queue 16
+
+First asserts the controller's rules on their own (priority order, eviction of the most
+expensive waiter, wait timeout, slot hand-over). Then drives the in-process app with an
+open-loop spike: requests arrive at `--rate` per second whatever the latency, as WhatsApp
+traffic does, in a mix of small talk, cancels, searches and publishes against the
+in-memory Supabase and the OpenAI stub. The spike runs once with admission off and once
+with it on, and the report gives, per intent, the turns served, the turns shed with 503,
+and the latency percentiles of the served ones.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Any
+
+from benchmarks import openai_stub
+from benchmarks._serve import serve_in_thread
+
+MIX = (("SMALL_TALK", "selam", 0.35), ("CANCEL", "iptal", 0.15), ("SEARCH", "iphone arıyorum", 0.3), ("PUBLISH", "onaylıyorum", 0.2))
+
+
+async def check_rules() -> None:
+    from app.core.admission import AdmissionController, Overloaded
+
+    gate = AdmissionController(max_in_flight=1, queue_size=2, max_wait=1.0)
+    order: list[str] = []
+
+    async def turn(name: str, priority: float, hold_s: float = 0.01) -> str:
+        try:
+            async with gate.hold(priority, name):
+                order.append(name)
+                await asyncio.sleep(hold_s)
+            return "ok"
+        except Overloaded as exc:
+            return exc.reason
+
+    first = asyncio.ensure_future(turn("first", 1.0, hold_s=0.05))
+    await asyncio.sleep(0)
+    publish = asyncio.ensure_future(turn("publish", 8.0))
+    search = asyncio.ensure_future(turn("search", 2.0))
+    await asyncio.sleep(0)
+    small_talk = asyncio.ensure_future(turn("small_talk", 1.0))  # queue full: evicts publish
+    another = asyncio.ensure_future(turn("unknown", 4.0))  # queue full of cheaper turns: refused
+    results = await asyncio.gather(first, publish, search, small_talk, another)
+    assert results == ["ok", "evicted", "ok", "ok", "queue_full"], results
+    assert order == ["first", "small_talk", "search"], order
+    assert gate.in_flight == 0 and gate.queued == 0
+
+    slow = AdmissionController(max_in_flight=1, queue_size=4, max_wait=0.05)
+    holder = asyncio.ensure_future(_hold(slow, 0.2))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    try:
+        async with slow.hold(1.0, "late"):
+            raise AssertionError("admitted past the wait limit")
+    except Overloaded as exc:
+        assert exc.reason == "wait_timeout", exc.reason
+    waited = time.perf_counter() - started
+    assert 0.04 < waited < 0.15, waited
+    await holder
+    assert slow.in_flight == 0 and slow.queued == 0
+    print(f"rules                ok  (priority order, eviction, queue_full, wait_timeout after {waited * 1000:.0f} ms)")
+
+
+async def _hold(gate: Any, seconds: float) -> None:
+    async with gate.hold(1.0, "holder"):
+        await asyncio.sleep(seconds)
+
+
+def _pct(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+async def spike(app: Any, fake: Any, rate: float, requests: int, seed: int) -> tuple[dict[str, list[float]], dict[str, int], float]:
+    import httpx
+
+    from benchmarks.deadlines import _ready_draft
+
+    rng = random.Random(seed)
+    served: dict[str, list[float]] = defaultdict(list)
+    shed: dict[str, int] = defaultdict(int)
+    weights = [w for _, _, w in MIX]
+
+    async def one(kind: str, message: str, client: httpx.AsyncClient) -> None:
+        user_id = str(uuid.uuid4())
+        if kind == "PUBLISH":
+            _ready_draft(fake, user_id)
+        started = time.perf_counter()
+        resp = await client.post("/agent/run", json={"user_id": user_id, "message": message})
+        elapsed = (time.perf_counter() - started) * 1000.0
+        if resp.status_code == 503:
+            assert resp.headers.get("retry-after"), resp.headers
+            shed[kind] += 1
+        else:
+            assert resp.status_code == 200, (resp.status_code, resp.text)
+            served[kind].append(elapsed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent.local", timeout=120.0) as client:
+        tasks = []
+        started = time.perf_counter()
+        for i in range(requests):
+            kind, message, _ = rng.choices(MIX, weights)[0]
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(one(kind, message, client)))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+    return served, shed, wall
+
+
+def report(label: str, served: dict[str, list[float]], shed: dict[str, int], wall: float) -> None:
+    total = sum(len(v) for v in served.values())
+    print(f"\n{label}: {total} served, {sum(shed.values())} shed in {wall:.2f} s")
+    print(f"{'intent':12s} {'served':>7s} {'shed':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  (ms)")
+    for kind, _, _ in MIX:
+        values = served.get(kind, [])
+        print(
+            f"{kind:12s} {len(values):7d} {shed.get(kind, 0):6d} {_pct(values, 50):8.1f} "
+            f"{_pct(values, 95):8.1f} {_pct(values, 99):8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=300.0, help="arrivals per second")
+    parser.add_argument("--requests", type=int, default=900)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--queue", type=int, default=16)
+    parser.add_argument("--max-wait-s", type=float, default=0.5)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--openai-latency-ms", type=float, default=400.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    stub_url, stop_stub = serve_in_thread(openai_stub.app)
+    openai_stub.configure(latency_ms=args.openai_latency_ms, jitter_ms=args.openai_latency_ms / 2)
+    os.environ.update({"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": f"{stub_url}/v1", "RATE_LIMIT_ENABLED": "false"})
+
+    from app.clients.supabase import set_supabase_client
+    from app.core.admission import AdmissionController
+    from app.routers import agent_run as agent_run_module
+    from benchmarks.fake_supabase import FakeSupabase
+    from benchmarks.load import seed_listings
+    from main import create_app
+
+    async def run() -> None:
+        await check_rules()
+        app = create_app()
+        modes = {
+            "admission off": AdmissionController(0, 0, 0.0),
+            f"admission on (in flight {args.max_in_flight}, queue {args.queue}, wait {args.max_wait_s} s)": AdmissionController(
+                args.max_in_flight, args.queue, args.max_wait_s
+            ),
+        }
+        print(f"\nspike: {args.requests} requests at {args.rate:.0f}/s")
+        for label, controller in modes.items():
+            fake = FakeSupabase(latency_ms=args.db_latency_ms)
+            seed_listings(fake, 500, args.seed)
+            set_supabase_client(fake)
+            agent_run_module.admission = controller
+            report(label, *await spike(app, fake, args.rate, args.requests, args.seed))
+
+    try:
+        asyncio.run(run())
+    finally:
+        stop_stub()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Partner bulk classification: one item per request vs one streamed NDJSON batch.
+
+    python -m benchmarks.bench_classify
+    python -m benchmarks.bench_classify --items 5000 --workers 2 --chunk-size 250
+
+Runs the app under uvicorn with a partner token and posts corpus titles to
+`/classify/batch`, first one item per request (what a per-item API costs), then as one
+batch. For the batch it reports time to the first NDJSON line (results stream while the
+rest is classified), total time, items/s, and the wire size with and without gzip.
+The lines are checked to come back complete and in input order. Before that, `LOCATION_CASES`
+assert that words which only look like a suffixed place name ("çanta" = Çan + "ta") are
+not read as a location, by the classifier nor by search.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import zlib
+
+# Text -> (location classify_text may report, location hint search may filter on).
+LOCATION_CASES = {
+    "deri çanta 500 tl": (None, None),
+    "çanta arıyorum": (None, None),
+    "hande": (None, None),
+    "kulada": (None, None),
+    "olurda": (None, None),
+    "surda": (None, None),
+    "kadıköyde bisiklet": ("Kadıköy, İstanbul", "Kadıköy"),
+    "muğla bodrumda villa": ("Bodrum, Muğla", "Bodrum"),
+}
+
+
+def check_locations() -> None:
+    from app.services.classify import classify_text
+    from app.services.search import _extract_location_hint
+
+    for text, (location, hint) in LOCATION_CASES.items():
+        fields = classify_text(text)["fields"]
+        place = _extract_location_hint(text)
+        got = (fields.get("location"), place.name if place else None)
+        assert got == (location, hint), (text, got, fields)
+    title = classify_text("deri çanta 500 tl")["fields"].get("title")
+    assert title == "deri çanta", title
+    print(f"location regressions   {len(LOCATION_CASES)} ok")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--single", type=int, default=200, help="items sent one per request")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    args = parser.parse_args()
+    os.environ.update(
+        {
+            "CLASSIFY_API_TOKENS": "bench",
+            "CLASSIFY_WORKERS": str(args.workers),
+            "CLASSIFY_CHUNK_SIZE": str(args.chunk_size),
+            "CLASSIFY_MAX_ITEMS": str(max(args.items, 5000)),
+        }
+    )
+
+    import httpx
+    import orjson
+
+    check_locations()
+
+    from benchmarks._serve import serve_in_thread
+    from benchmarks.corpus import build_corpus
+    from main import create_app
+
+    corpus = build_corpus(args.items * 3, 5).listings
+    texts = [f"{data['title']} {int(data['price'])} tl {data.get('location') or ''}".strip() for data in corpus]
+    items = [{"id": f"sku-{i}", "text": texts[i % len(texts)]} for i in range(args.items)]
+    headers = {"authorization": "Bearer bench"}
+
+    base_url, stop = serve_in_thread(create_app())
+    try:
+        with httpx.Client(base_url=base_url, timeout=120.0) as client:
+            client.post("/classify/batch", json={"items": items[:400]}, headers=headers)  # spawn the pool
+
+            started = time.perf_counter()
+            for item in items[: args.single]:
+                client.post("/classify/batch", json={"items": [item]}, headers=headers).raise_for_status()
+            single_rate = args.single / (time.perf_counter() - started)
+
+            started = time.perf_counter()
+            first_line = None
+            received = bytearray()
+            with client.stream(
+                "POST", "/classify/batch", json={"items": items}, headers={**headers, "accept-encoding": "identity"}
+            ) as response:
+                for chunk in response.iter_raw():
+                    if first_line is None:
+                        first_line = time.perf_counter() - started
+                    received += chunk
+            total = time.perf_counter() - started
+            lines = [orjson.loads(line) for line in bytes(received).splitlines()]
+            assert lines[-1] == {"done": True, "items": args.items, "errors": 0}, lines[-1]
+            assert [line["index"] for line in lines[:-1]] == list(range(args.items))
+
+            with client.stream(
+                "POST", "/classify/batch", json={"items": items}, headers={**headers, "accept-encoding": "gzip"}
+            ) as response:
+                assert response.headers.get("content-encoding") == "gzip"
+                compressed = b"".join(response.iter_raw())
+            assert zlib.decompress(compressed, 31) == bytes(received)
+    finally:
+        stop()
+
+    print(f"one item per request   {single_rate:9.0f} items/s  ({args.single} requests)")
+    print(
+        f"batch of {args.items:<6d}        {args.items / total:9.0f} items/s  total {total * 1000:7.0f} ms, "
+        f"first line after {first_line * 1000:6.0f} ms ({args.workers} workers, chunks of {args.chunk_size})"
+    )
+    print(f"wire size              {len(received) / 1e3:9.0f} KB ndjson, {len(compressed) / 1e3:.0f} KB gzip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Facet counts over an in-memory listing snapshot.
+
+    python -m benchmarks.bench_facets                      # 100k listings, corpus queries
+    python -m benchmarks.bench_facets --listings 20000 --budget-ms 2
+
+Builds a `ListingSnapshot` from synthetic listings (the hot-path corpus, with cities and
+districts resolved the way the backfill stores them), then times `snapshot.facets()` for
+every search query in the corpus plus the empty query (all listings). p95 is compared
+with `--budget-ms`; exceeding it exits non-zero.
+
+A parity check then loads a slice of the same listings into the in-memory Supabase and
+compares each `PARITY_QUERIES` facet `total` with the number of rows `search_listings`
+returns for it (location codes on, as the snapshot always uses them); a mismatch also
+exits non-zero. Last, it refreshes the snapshot from that store with nothing changed (one
+change probe, no reload) and after a new listing (full reload), and prints the queries and
+time of each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Search filters on the location code columns, like the snapshot (read at app import).
+os.environ["LOCATION_CODES_ENABLED"] = "true"
+
+from app.services import facets  # noqa: E402
+from app.services.facets import ListingSnapshot, listing_facets, set_snapshot, warm_snapshot  # noqa: E402
+from app.services.gazetteer import extract_place, location_codes  # noqa: E402
+from app.services.search import _extract_price_range, search_listings, search_terms  # noqa: E402
+from benchmarks.corpus import CITIES, DISTRICTS, build_corpus  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase  # noqa: E402
+
+# Queries with intent words, places, budgets and bare numbers that search drops from its terms.
+PARITY_QUERIES = (
+    "bisiklet arıyorum",
+    "istanbulda 10000-20000 tl arası bisiklet arıyorum",
+    "iphone 13 var mı",
+    "50k altı macbook var mı ankara",
+    "kadıköyde deri mont göster",
+    "ankara 100k üstü ilanları",
+)
+
+
+def build_rows(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    corpus = build_corpus(max(1000, count // 8), seed)
+    locations = [*CITIES, *(f"{d}" for d in DISTRICTS)]
+    codes = {loc: location_codes(loc) for loc in locations}
+    rows = []
+    for i in range(count):
+        data = corpus.listings[i % len(corpus.listings)]
+        location = rng.choice(locations)
+        province_code, district_code = codes[location]
+        rows.append(
+            {
+                "id": f"{i:08d}",
+                "title": data["title"],
+                "description": data.get("description_notes") or "",
+                "category": data["category"],
+                "price": float(data["price"]) * rng.uniform(0.8, 1.2),
+                "location": location,
+                "province_code": province_code,
+                "district_code": district_code,
+                "metadata": {"keywords_text": data["title"].lower()},
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=20260115)
+    parser.add_argument("--budget-ms", type=float, default=3.0)
+    parser.add_argument("--parity-listings", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = build_rows(args.listings, args.seed)
+    started = time.perf_counter()
+    snap = ListingSnapshot(rows)
+    build_s = time.perf_counter() - started
+
+    queries = ["", *build_corpus(args.queries * 4, args.seed + 7).queries[: args.queries]]
+    parsed = []
+    for q in queries:
+        price_min, price_max = _extract_price_range(q)
+        place = extract_place(q) if q else None
+        parsed.append((search_terms(q, place), price_min, price_max, place))
+
+    samples = []
+    totals = []
+    for keywords, price_min, price_max, place in parsed:
+        t0 = time.perf_counter_ns()
+        result = snap.facets(keywords, price_min, price_max, place)
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+        totals.append(result["total"])
+    samples.sort()
+    p50 = statistics.median(samples)
+    p95 = samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))]
+    print(f"snapshot: {snap.size} listings built in {build_s * 1000:.0f} ms")
+    print(
+        f"facets: {len(samples)} queries, p50 {p50:.2f} ms, p95 {p95:.2f} ms, max {samples[-1]:.2f} ms "
+        f"(median matched set {statistics.median(totals):.0f}, budget {args.budget_ms:.1f} ms)"
+    )
+    print(f"all listings: {snap.facets([])}")
+    failed = p95 > args.budget_ms
+    if failed:
+        print("over budget")
+    failed |= not check_parity(rows[: args.parity_listings])
+    failed |= not check_refresh(rows[: args.parity_listings])
+    if failed:
+        sys.exit(1)
+
+
+def check_parity(rows: list[dict]) -> bool:
+    """Facet `total` equals the number of listings `search_listings` returns, per `PARITY_QUERIES`."""
+    fake = FakeSupabase()
+    fake.tables["listings"].extend(fake.with_defaults("listings", {**row, "status": "active"}) for row in rows)
+    set_snapshot(ListingSnapshot(rows))
+    ok = True
+    print(f"\nparity on {len(rows)} listings (facet total vs search_listings rows)")
+    for query in PARITY_QUERIES:
+        total = (listing_facets(fake, query) or {}).get("total")
+        found = len(search_listings(fake, query, limit=len(rows) + 1))
+        # No match makes search fall back to the latest listings; facets then report 0.
+        same = total == found or (total == 0 and found == len(rows))
+        ok &= same
+        print(f"  {query!r:52} facets {total!s:>6} search {found:>6} {'ok' if same else 'MISMATCH'}")
+    set_snapshot(None)
+    return ok
+
+
+def check_refresh(rows: list[dict]) -> bool:
+    """A refresh with no listing written since the load costs one probe query and no rebuild."""
+    fake = FakeSupabase()
+    fake.tables["listings"].extend(
+        fake.with_defaults("listings", {**row, "status": "active", "updated_at": f"2026-01-01T00:00:{i % 60:02d}+00:00"})
+        for i, row in enumerate(rows)
+    )
+    print("\nrefresh")
+    steps = {}
+    for step in ("initial load", "unchanged", "after a new listing"):
+        if step == "after a new listing":
+            fake.tables["listings"].append(fake.with_defaults("listings", {**rows[0], "id": "new", "status": "active"}))
+        fake.calls.clear()
+        started = time.perf_counter()
+        snap = warm_snapshot(fake)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        steps[step] = (len(fake.calls), snap.size if snap else 0)
+        print(f"  {step:20} {len(fake.calls):3d} queries {elapsed:8.1f} ms  {steps[step][1]} listings")
+    set_snapshot(None)
+    facets._skipped = 0
+    pages = steps["initial load"][0]
+    ok = steps["unchanged"] == (1, len(rows)) and steps["after a new listing"] == (pages + 1, len(rows) + 1)
+    if not ok:
+        print("  refresh did not skip the unchanged reload or missed the new listing")
+    return ok
+
+
+if __name__ == "__main__":
+    main()
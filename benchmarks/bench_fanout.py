@@ -0,0 +1,96 @@
+"""Turn latency with per-query database latency: concurrent lookups vs one after another.
+
+    python -m benchmarks.bench_fanout
+    python -m benchmarks.bench_fanout --latency-ms 40 --rounds 5
+
+Replays the query_budget conversation against the in-memory Supabase with a fixed delay
+per query, once as the handler runs it (profile row in the background, search and facets
+together; app/core/fanout.py) and once with the fan-out helpers swapped for sequential
+calls. Per turn it prints wall time next to the summed query time: with the fan-out the
+wall time drops below the sum, towards the longest chain of dependent queries.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Any, Callable
+
+from app.clients.supabase import set_supabase_client
+from app.core.ratelimit import TokenBucketLimiter
+from app.core.request_stats import track_request
+from app.routers import agent_run as agent_run_module
+from app.routers.agent_run import agent_run
+from app.schemas import AgentRunRequest
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.query_budget import SCENARIO, _seed
+
+
+def _sequential_start(call: Callable[[], Any]) -> asyncio.Future[Any]:
+    future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+    future.set_result(call())
+    return future
+
+
+async def _sequential_gather(**calls: Callable[[], Any] | None) -> dict[str, Any]:
+    return {name: call() for name, call in calls.items() if call is not None}
+
+
+async def _conversation(latency_ms: float) -> dict[str, tuple[float, float, int]]:
+    fake = FakeSupabase(latency_ms=latency_ms)
+    set_supabase_client(fake)
+    user_id = str(uuid.uuid4())
+    _seed(fake, user_id)
+    out: dict[str, tuple[float, float, int]] = {}
+    for label, message, _ in SCENARIO:
+        payload = AgentRunRequest(user_id=user_id, message=message)
+        with track_request() as stats:
+            started = time.perf_counter()
+            await agent_run(payload, None)  # type: ignore[arg-type]
+            wall = (time.perf_counter() - started) * 1000
+        out[label] = (wall, sum(q[2] for q in stats.queries) * 1000, stats.query_count)
+    return out
+
+
+async def run(latency_ms: float, rounds: int) -> None:
+    agent_run_module.rate_limiter = TokenBucketLimiter(capacity=1e9, refill_per_s=1e9)
+    modes = {
+        "fan-out": (agent_run_module.start_blocking, agent_run_module.gather_blocking),
+        "sequential": (_sequential_start, _sequential_gather),
+    }
+    samples: dict[str, dict[str, list[tuple[float, float, int]]]] = {mode: {} for mode in modes}
+    for _ in range(rounds):
+        for mode, (start, gather) in modes.items():
+            agent_run_module.start_blocking, agent_run_module.gather_blocking = start, gather  # type: ignore[assignment]
+            for label, sample in (await _conversation(latency_ms)).items():
+                samples[mode].setdefault(label, []).append(sample)
+    agent_run_module.start_blocking, agent_run_module.gather_blocking = modes["fan-out"]  # type: ignore[assignment]
+
+    print(f"{latency_ms:.0f} ms per query, median of {rounds}")
+    print(f"{'turn':20s} {'queries':>7s} {'db sum':>8s} {'sequential':>11s} {'fan-out':>9s}")
+    totals = {mode: 0.0 for mode in modes}
+    for label, _, _ in SCENARIO:
+        row = {mode: samples[mode][label] for mode in modes}
+        wall = {mode: statistics.median(s[0] for s in row[mode]) for mode in modes}
+        db = statistics.median(s[1] for s in row["fan-out"])
+        for mode in modes:
+            totals[mode] += wall[mode]
+        print(
+            f"{label:20s} {row['fan-out'][0][2]:7d} {db:8.1f} {wall['sequential']:11.1f} {wall['fan-out']:9.1f}"
+        )
+    print(f"{'conversation':20s} {'':7s} {'':8s} {totals['sequential']:11.1f} {totals['fan-out']:9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.latency_ms, max(1, args.rounds)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Microbenchmarks for the pure-Python hot path.
+
+    python -m benchmarks.bench_hotpath                  # compare with the stored baseline
+    python -m benchmarks.bench_hotpath --update-baseline
+    python -m benchmarks.bench_hotpath --update-digests   # after an intentional output/corpus change
+    python -m benchmarks.bench_hotpath --only detect_intent --size 2000
+
+Every function runs over the same deterministic Turkish corpus (see `benchmarks.corpus`).
+Per function it reports throughput and p50/p99 latency, the change against
+`baseline_hotpath.json`, and a parity digest of all outputs: a digest mismatch means the
+function's behaviour changed, which must be intentional (then refresh the baseline).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import orjson
+
+from benchmarks.corpus import Corpus, build_corpus
+
+BASELINE_PATH = Path(__file__).with_name("baseline_hotpath.json")
+
+
+@dataclass(frozen=True)
+class _PlaceView:
+    """The fields of `gazetteer.Place` that describe the extraction (not `candidates`)."""
+
+    name: Any
+    province: Any
+    district: Any
+    spans: Any
+
+
+def _places_view(places: Any) -> Any:
+    return [_PlaceView(p.name, p.province, p.district, p.spans) for p in places]
+
+
+def _hint_view(place: Any) -> Any:
+    # Search used to receive the hint as a name; digest that so the baseline stays comparable.
+    if place is None:
+        return None
+    return place.district.name if place.district else place.name
+
+
+# Outputs are mapped through these before hashing; the timed calls are unaffected.
+PARITY_VIEWS: dict[str, Callable[[Any], Any]] = {"_extract_location_hint": _hint_view, "find_places": _places_view}
+
+
+def _cases(corpus: Corpus) -> dict[str, tuple[Callable[[Any], Any], list[Any]]]:
+    from app.core.helpers import detect_intent
+    from app.services.category_library import classify_category, normalize_category_id
+    from app.services.description_composer import compose_description
+    from app.services.gazetteer import find_places
+    from app.services.metadata_keywords import generate_listing_keywords_deterministic
+    from app.services.parsing import extract_simple_fields
+    from app.services.search import _extract_location_hint, _extract_price_range
+
+    # Measure the computation, not the lru_cache in front of it.
+    normalize_uncached = getattr(normalize_category_id, "__wrapped__", normalize_category_id)
+    texts = corpus.texts()
+
+    def keywords(data: dict[str, Any]) -> Any:
+        return generate_listing_keywords_deterministic(
+            title=data["title"],
+            category=data["category"],
+            description=data.get("description_notes") or "",
+            condition=data.get("condition") or "",
+        )
+
+    def describe(item: tuple[dict[str, Any], dict[str, Any]]) -> Any:
+        return compose_description(item[0], item[1])
+
+    return {
+        "detect_intent": (detect_intent, texts),
+        "extract_simple_fields": (extract_simple_fields, texts),
+        "classify_category": (classify_category, texts),
+        "normalize_category_id": (normalize_uncached, texts),
+        "generate_listing_keywords_deterministic": (keywords, corpus.listings),
+        "compose_description": (describe, list(zip(corpus.listings, corpus.visions))),
+        "_extract_price_range": (_extract_price_range, corpus.queries),
+        "_extract_location_hint": (_extract_location_hint, corpus.queries),
+        "find_places": (find_places, texts),
+    }
+
+
+def _percentile(sorted_ns: list[int], pct: float) -> float:
+    idx = min(len(sorted_ns) - 1, max(0, round(pct / 100.0 * (len(sorted_ns) - 1))))
+    return sorted_ns[idx] / 1000.0
+
+
+def _digest(outputs: list[Any]) -> str:
+    h = hashlib.sha256()
+    for out in outputs:
+        h.update(orjson.dumps(out, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+        h.update(b"\n")
+    return h.hexdigest()[:16]
+
+
+def run_case(
+    fn: Callable[[Any], Any], inputs: list[Any], rounds: int, view: Callable[[Any], Any] | None = None
+) -> dict[str, Any]:
+    outputs = [fn(x) for x in inputs]  # warm-up + parity
+    if view is not None:
+        outputs = [view(out) for out in outputs]
+    best_total = float("inf")
+    samples: list[int] = []
+    clock = time.perf_counter_ns
+    for _ in range(rounds):
+        round_samples: list[int] = []
+        append = round_samples.append
+        started = clock()
+        for x in inputs:
+            t0 = clock()
+            fn(x)
+            append(clock() - t0)
+        total = clock() - started
+        if total < best_total:
+            best_total = total
+            samples = round_samples
+    samples.sort()
+    return {
+        "calls": len(inputs),
+        "ops_per_s": round(len(inputs) / (best_total / 1e9), 1),
+        "p50_us": round(_percentile(samples, 50), 2),
+        "p99_us": round(_percentile(samples, 99), 2),
+        "digest": _digest(outputs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5000, help="corpus size (messages)")
+    parser.add_argument("--seed", type=int, default=20260115)
+    parser.add_argument("--rounds", type=int, default=3, help="timed passes per function; the fastest is kept")
+    parser.add_argument("--only", action="append", default=[], help="limit to these functions")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--update-digests", action="store_true", help="refresh only the parity digests; recorded timings stay"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop before flagging")
+    parser.add_argument("--strict", action="store_true", help="exit non-zero on throughput regressions too")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size, args.seed)
+    cases = _cases(corpus)
+    if args.only:
+        cases = {k: v for k, v in cases.items() if k in args.only}
+
+    baseline: dict[str, Any] = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    base_results: dict[str, Any] = baseline.get("results", {})
+    same_corpus = baseline.get("corpus") == {"size": args.size, "seed": args.seed}
+
+    results: dict[str, Any] = {}
+    parity_failures: list[str] = []
+    regressions: list[str] = []
+    print(f"{'function':42s} {'ops/s':>11s} {'p50 µs':>8s} {'p99 µs':>8s} {'vs base':>8s}  parity")
+    for name, (fn, inputs) in cases.items():
+        res = run_case(fn, inputs, args.rounds, PARITY_VIEWS.get(name))
+        results[name] = res
+        base = base_results.get(name)
+        delta = ""
+        parity = "-"
+        if base and same_corpus:
+            ratio = res["ops_per_s"] / base["ops_per_s"] if base.get("ops_per_s") else 0.0
+            delta = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio < 1 - args.tolerance:
+                regressions.append(name)
+            parity = "ok" if base.get("digest") == res["digest"] else "CHANGED"
+            if parity == "CHANGED":
+                parity_failures.append(name)
+        print(f"{name:42s} {res['ops_per_s']:11.0f} {res['p50_us']:8.1f} {res['p99_us']:8.1f} {delta:>8s}  {parity}")
+
+    if args.update_digests and same_corpus:
+        for name, res in results.items():
+            if name in base_results:
+                base_results[name].update(calls=res["calls"], digest=res["digest"])
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"digests written to {BASELINE_PATH.name}")
+        return
+
+    if args.update_baseline:
+        merged = {**base_results, **results} if same_corpus else results
+        BASELINE_PATH.write_text(
+            json.dumps(
+                {
+                    "corpus": {"size": args.size, "seed": args.seed},
+                    "python": platform.python_version(),
+                    "results": merged,
+                },
+                indent=2,
+                ensure_ascii=False,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"baseline written to {BASELINE_PATH.name}")
+        return
+
+    if not same_corpus and baseline:
+        print("note: baseline was recorded with a different corpus; only absolute numbers shown")
+    if regressions:
+        print(f"throughput below baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+    if parity_failures:
+        print(f"output parity changed: {', '.join(parity_failures)}")
+    if parity_failures or (args.strict and regressions):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
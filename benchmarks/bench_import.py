@@ -0,0 +1,142 @@
+"""Bulk import throughput and memory on generated shop files.
+
+    python -m benchmarks.bench_import                       # 20k CSV rows, 2 workers
+    python -m benchmarks.bench_import --rows 100000 --format jsonl --workers 4
+
+Writes a CSV or JSONL file with corpus listings (every 50th row broken on purpose:
+missing price, or an unparsable JSON line), then imports it into the in-memory Supabase
+twice: inline (`--workers 0`) and through the process pool, and reports rows/s and
+reported errors. A traced pass then shows the importing process's peak memory for a
+quarter of the file and for all of it: it depends on `--batch-size`, not on `--rows`.
+Inserted rows are discarded as they arrive so the fake database does not dominate the
+measurement. The pool only pays off with spare cores; on a single CPU inline is faster.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from app.services.bulk_import import iter_lines, read_rows, run_import
+from benchmarks.corpus import CITIES, DISTRICTS, build_corpus
+from benchmarks.fake_supabase import FakeSupabase
+
+_COLUMNS = ["title", "description", "category", "price", "location", "condition", "images"]
+
+
+def _write(path: Path, rows: int, fmt: str, seed: int) -> None:
+    rng = random.Random(seed)
+    corpus = build_corpus(2000, seed).listings
+    locations = [*CITIES, *DISTRICTS]
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=_COLUMNS) if fmt == "csv" else None
+        if writer is not None:
+            writer.writeheader()
+        for i in range(rows):
+            data = corpus[i % len(corpus)]
+            row: dict[str, Any] = {
+                "title": data["title"],
+                "description": f"{data['title']}, temiz kullanıldı." if i % 3 else "",
+                "category": data["category"],
+                "price": f"{int(data['price']):,}".replace(",", ".") + " TL",
+                "location": rng.choice(locations),
+                "condition": rng.choice(["used", "new"]),
+                "images": "|".join(f"https://cdn.example.com/{i}/{n}.jpg" for n in range(2)),
+            }
+            if i % 50 == 7:
+                row["price"] = ""
+            if writer is not None:
+                writer.writerow(row)
+            elif i % 50 == 21:
+                fh.write("{not json\n")
+            else:
+                fh.write(orjson.dumps(row).decode("utf-8") + "\n")
+
+
+class _DiscardingSupabase(FakeSupabase):
+    """Counts inserts into `listings` and drops the rows."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.inserted = 0
+        self.inserts = 0
+
+    def before_execute(self, table: str, op: str) -> None:
+        super().before_execute(table, op)
+        if table == "listings" and op == "insert":
+            self.inserts += 1
+            rows = self.tables["listings"]
+            self.inserted += len(rows)
+            rows.clear()
+
+
+def _run(
+    path: Path, fmt: str, workers: int, batch_size: int, limit: int | None = None
+) -> tuple[dict[str, Any], _DiscardingSupabase]:
+    supabase = _DiscardingSupabase()
+    with path.open("rb") as fh:
+        chunks = iter(lambda: fh.read(1 << 16), b"")
+        stats = run_import(
+            supabase,
+            itertools.islice(read_rows(iter_lines(chunks), fmt), limit),
+            str(uuid.uuid4()),
+            batch_size=batch_size,
+            workers=workers,
+        )
+    supabase.inserted += len(supabase.tables["listings"])
+    return stats, supabase
+
+
+def _peak_mb(path: Path, fmt: str, workers: int, batch_size: int, limit: int) -> float:
+    tracemalloc.start()
+    try:
+        _run(path, fmt, workers, batch_size, limit)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"shop.{args.format}"
+        _write(path, args.rows, args.format, args.seed)
+        print(f"{args.rows} rows, {path.stat().st_size / 1e6:.1f} MB {args.format}, batch {args.batch_size}")
+        print(f"{'mode':18s} {'seconds':>8s} {'rows/s':>9s} {'imported':>9s} {'failed':>7s} {'inserts':>8s}")
+        for label, workers in (("inline", 0), (f"{args.workers} workers", args.workers)):
+            started = time.perf_counter()
+            stats, supabase = _run(path, args.format, workers, args.batch_size)
+            seconds = time.perf_counter() - started
+            assert stats["imported"] == supabase.inserted, (stats, supabase.inserted)
+            print(
+                f"{label:18s} {seconds:8.2f} {stats['rows'] / seconds:9.0f} {stats['imported']:9d} "
+                f"{stats['failed']:7d} {supabase.inserts:8d}"
+            )
+        # Traced separately: tracemalloc slows allocation-heavy code several times over.
+        small = max(args.batch_size, args.rows // 4)
+        print(
+            f"peak traced memory ({args.workers} workers): {small} rows "
+            f"{_peak_mb(path, args.format, args.workers, args.batch_size, small):.1f} MB, {args.rows} rows "
+            f"{_peak_mb(path, args.format, args.workers, args.batch_size, args.rows):.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Media ingestion throughput against a local stand-in for the storage bucket.
+
+    python -m benchmarks.bench_media
+    python -m benchmarks.bench_media --dir ./photos --latency-ms 40 --concurrency 16 --workers 4
+
+Serves a folder of images over HTTP (by default a generated one: PNG "photos" plus exact
+copies and re-encoded copies of some of them) with optional per-request latency, then
+ingests every URL twice: sequentially (fetch, then analyse inline, one by one) and
+through `ingest_media` (bounded concurrent fetch + process-pool analysis). Reports
+images/s, MB/s and how many duplicates were dropped. Re-encoded copies differ in bytes,
+so they are only caught by dHash, i.e. when Pillow is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import struct
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+
+def _png(width: int, height: int, seed: int, level: int) -> bytes:
+    rng = random.Random(seed)
+    r0, g0, b0 = rng.randrange(256), rng.randrange(256), rng.randrange(256)
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)
+        for x in range(width):
+            rows += bytes(((r0 + x) & 255, (g0 + y) & 255, (b0 + x * y // 64 + rng.randrange(8)) & 255))
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(bytes(rows), level)) + chunk(b"IEND", b"")
+
+
+def _generate(folder: Path, count: int, size: int) -> None:
+    for i in range(count):
+        (folder / f"photo_{i:04d}.png").write_bytes(_png(size, size, i, 6))
+        if i % 5 == 0:  # the same upload sent twice
+            (folder / f"photo_{i:04d}_copy.png").write_bytes(_png(size, size, i, 6))
+        if i % 7 == 0:  # same pixels, different encoding
+            (folder / f"photo_{i:04d}_reencoded.png").write_bytes(_png(size, size, i, 1))
+
+
+def _storage_app(folder: Path, latency_ms: float) -> Any:
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from starlette.staticfiles import StaticFiles
+
+    files = Starlette(routes=[Mount("/", app=StaticFiles(directory=str(folder)))])
+
+    async def app(scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if latency_ms and scope.get("type") == "http":
+            await asyncio.sleep(latency_ms / 1000.0)
+        await files(scope, receive, send)
+
+    return app
+
+
+async def _sequential(urls: list[str]) -> int:
+    from app.services.media import analyze, fetch, is_duplicate
+
+    seen: list[dict[str, Any]] = []
+    dropped = 0
+    for url in urls:
+        info = analyze(await fetch(url))
+        if is_duplicate(info, seen):
+            dropped += 1
+        else:
+            seen.append(info)
+    return dropped
+
+
+async def _run(urls: list[str], total_bytes: int, rounds: int) -> None:
+    from app.services import media
+
+    # Warm up the process pool (spawned workers import the app once) and the connection pool.
+    await media.ingest_media(urls[:1])
+
+    for label, run in (("sequential", lambda: _sequential(urls)), ("ingest_media", lambda: media.ingest_media(urls))):
+        best = float("inf")
+        dropped: Any = 0
+        for _ in range(rounds):
+            started = time.perf_counter()
+            dropped = await run()
+            best = min(best, time.perf_counter() - started)
+        n_dropped = dropped if isinstance(dropped, int) else len(dropped[1])
+        print(
+            f"{label:14s} {best * 1000:9.1f} ms {len(urls) / best:9.1f} img/s "
+            f"{total_bytes / best / 1e6:8.1f} MB/s  duplicates dropped={n_dropped}"
+        )
+    await media.aclose_media()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="folder of images to serve (default: generate PNGs in a temp dir)")
+    parser.add_argument("--count", type=int, default=60, help="generated photos (plus copies)")
+    parser.add_argument("--size", type=int, default=256, help="generated photo edge in px")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stand-in storage latency per request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    # Config is read at import time, so the knobs go through the environment.
+    os.environ["MEDIA_FETCH_CONCURRENCY"] = str(args.concurrency)
+    os.environ["MEDIA_HASH_WORKERS"] = str(args.workers)
+
+    from benchmarks._serve import serve_in_thread
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(args.dir) if args.dir else Path(tmp)
+        if not args.dir:
+            _generate(folder, args.count, args.size)
+        paths = sorted(p for p in folder.iterdir() if p.is_file())
+        total_bytes = sum(p.stat().st_size for p in paths)
+        base_url, stop = serve_in_thread(_storage_app(folder, args.latency_ms))
+        try:
+            try:
+                import PIL  # noqa: F401
+
+                pillow = "yes"
+            except ImportError:
+                pillow = "no (exact duplicates only)"
+            print(
+                f"{len(paths)} files, {total_bytes / 1e6:.1f} MB, latency {args.latency_ms:g} ms, "
+                f"concurrency {args.concurrency}, hash workers {args.workers}, Pillow: {pillow}"
+            )
+            urls = [f"{base_url}/{p.name}" for p in paths]
+            asyncio.run(_run(urls, total_bytes, args.rounds))
+        finally:
+            stop()
+
+
+if __name__ == "__main__":
+    main()
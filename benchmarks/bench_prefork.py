@@ -0,0 +1,140 @@
+"""Resident memory per worker: `uvicorn --workers` vs the pre-fork launcher.
+
+    python -m benchmarks.bench_prefork                  # 4 workers, all three modes
+    python -m benchmarks.bench_prefork --workers 8 --requests 400
+
+Modes:
+  uvicorn   `uvicorn main:app --workers N` (spawned interpreters, everything rebuilt per worker)
+  fork      `python -m app.prefork --no-preload` (forked, but each worker imports the app)
+  preload   `python -m app.prefork` (tables built in the master, `gc.freeze()`, then fork)
+
+After startup each server gets `--requests` warm-up requests. Then RSS, PSS
+(proportional set size, shared pages split between sharers) and USS (private pages)
+are read from /proc/<pid>/smaps_rollup for every worker. PSS/USS are the numbers that
+show copy-on-write sharing; RSS counts shared pages in full for every worker. Linux only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _get(port: int, path: str) -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2.0)
+    try:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        return resp.status
+    except OSError:
+        return 0
+    finally:
+        conn.close()
+
+
+def _children(pid: int) -> list[int]:
+    found: list[int] = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            stat = Path(f"/proc/{entry}/stat").read_text()
+            cmdline = Path(f"/proc/{entry}/cmdline").read_bytes()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid and b"resource_tracker" not in cmdline:
+            found.append(int(entry))
+    return found
+
+
+def _memory_kb(pid: int) -> dict[str, int]:
+    values: dict[str, int] = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        key, _, rest = line.partition(":")
+        parts = rest.split()
+        if parts and parts[0].isdigit():
+            values[key] = int(parts[0])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def measure(mode: str, workers: int, requests: int) -> dict[str, float]:
+    port = _free_port()
+    if mode == "uvicorn":
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--workers", str(workers)]
+    else:
+        cmd = [sys.executable, "-m", "app.prefork", "--workers", str(workers)]
+        if mode == "fork":
+            cmd.append("--no-preload")
+    cmd += ["--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=ROOT)
+    try:
+        deadline = time.monotonic() + 60.0
+        while _get(port, "/healthz") != 200:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"{mode}: server did not come up")
+            time.sleep(0.05)
+        while len(_children(proc.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        for i in range(requests):
+            _get(port, ("/healthz", "/webchat/categories", "/metrics")[i % 3])
+        time.sleep(0.5)
+        pids = _children(proc.pid)
+        per_worker = [_memory_kb(pid) for pid in pids]
+        master = _memory_kb(proc.pid)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {
+        "workers": len(per_worker),
+        "rss": statistics.fmean(m["rss"] for m in per_worker) / 1024,
+        "pss": statistics.fmean(m["pss"] for m in per_worker) / 1024,
+        "uss": statistics.fmean(m["uss"] for m in per_worker) / 1024,
+        "total_pss": (sum(m["pss"] for m in per_worker) + master["pss"]) / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--modes", default="uvicorn,fork,preload")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        raise SystemExit("needs Linux /proc/<pid>/smaps_rollup")
+
+    print(f"{'mode':10s} {'workers':>7s} {'RSS/worker':>11s} {'PSS/worker':>11s} {'USS/worker':>11s} {'total PSS':>10s}  (MiB)")
+    for mode in args.modes.split(","):
+        res = measure(mode.strip(), args.workers, args.requests)
+        print(
+            f"{mode:10s} {res['workers']:7.0f} {res['rss']:11.1f} {res['pss']:11.1f} {res['uss']:11.1f} {res['total_pss']:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Per-call overhead of the token-bucket rate limiter.
+
+    python -m benchmarks.bench_ratelimit [--keys 100000] [--calls 1000000]
+
+Reports ns per `acquire` for a hot key, for a rotating population of keys (with the map at
+its size bound, so eviction runs), and for the full `/agent/run` pre-check (intent + limiter).
+Fails if the limiter alone exceeds the budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.core.ratelimit import TokenBucketLimiter
+
+BUDGET_NS = 5_000  # "microseconds of overhead"
+
+
+def _bench(fn, calls: int) -> float:
+    started = time.perf_counter_ns()
+    fn(calls)
+    return (time.perf_counter_ns() - started) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    limiter = TokenBucketLimiter(capacity=1e12, refill_per_s=1e12, max_keys=args.keys)
+
+    def hot(n: int) -> None:
+        keys = ("u:hot", "p:905550000000")
+        for _ in range(n):
+            limiter.acquire(keys, 1.0)
+
+    user_keys = [(f"u:{i}", f"p:90555{i:07d}") for i in range(args.keys * 2)]
+
+    def rotating(n: int) -> None:
+        m = len(user_keys)
+        for i in range(n):
+            limiter.acquire(user_keys[i % m], 2.0)
+
+    from app.core.helpers import detect_intent
+    from app.routers.agent_run import _rate_limit_keys
+    from app.schemas import AgentRunRequest
+
+    payload = AgentRunRequest(user_id="6b1f6c1e-5f1b-4d3a-9d7e-2f6c2b8f1a11", phone="+90 555 123 45 67", message="iphone 13 arıyorum")
+
+    def precheck(n: int) -> None:
+        for _ in range(n):
+            intent, _ = detect_intent(payload.message)
+            limiter.acquire(_rate_limit_keys(payload), 2.0)
+
+    results = {
+        "hot key": _bench(hot, args.calls),
+        f"rotating {len(user_keys)} keys": _bench(rotating, args.calls),
+        "intent + limiter": _bench(precheck, max(1, args.calls // 10)),
+    }
+    for name, ns in results.items():
+        print(f"{name:28s} {ns:9.0f} ns/call")
+    print(f"map size {len(limiter)} (bound {args.keys})")
+
+    worst = max(results["hot key"], results[f"rotating {len(user_keys)} keys"])
+    if worst > BUDGET_NS:
+        raise SystemExit(f"limiter overhead {worst:.0f} ns exceeds {BUDGET_NS} ns")
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Request parsing cost as the client-sent conversation history grows.
+
+    python -m benchmarks.bench_request_size
+    python -m benchmarks.bench_request_size --sizes 0 10 50 500 5000
+
+For each history length it builds an /agent/run body and reports its size, the time
+to validate it (`AgentRunRequest.model_validate_json`) plus the audit-log dump, and
+the status the app answers with. Over MAX_HISTORY_ITEMS the body is rejected with 422,
+and over MAX_REQUEST_BYTES it is rejected with 413 before any parsing, so per-request
+parse work is bounded by the caps rather than by how long the client kept the chat.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import orjson
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.clients.supabase import set_supabase_client
+from app.config import MAX_HISTORY_ITEMS, MAX_REQUEST_BYTES
+from app.schemas import AgentRunRequest
+from benchmarks.fake_supabase import FakeSupabase
+
+
+def _body(history: int) -> bytes:
+    turns = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"mesaj {i}: iphone 13 128gb fiyatı ne kadar olur acaba"}
+        for i in range(history)
+    ]
+    return orjson.dumps({"user_id": str(uuid.uuid4()), "message": "selam", "conversation_history": turns})
+
+
+def _parse_us(body: bytes, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        try:
+            AgentRunRequest.model_validate_json(body).audit_dump()
+        except ValidationError:
+            pass
+        samples.append((time.perf_counter_ns() - t0) / 1000.0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 10, MAX_HISTORY_ITEMS, 200, 1000])
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    set_supabase_client(FakeSupabase())
+    import main as app_main
+
+    client = TestClient(app_main.app)
+    print(f"MAX_HISTORY_ITEMS={MAX_HISTORY_ITEMS} MAX_REQUEST_BYTES={MAX_REQUEST_BYTES}")
+    print(f"{'history':>8s} {'bytes':>9s} {'parse µs':>10s} {'status':>7s} {'http ms':>8s}")
+    for size in args.sizes:
+        body = _body(size)
+        # A greeting: accepted bodies only do the small-talk turn against the in-memory Supabase.
+        t0 = time.perf_counter()
+        status = client.post("/agent/run", content=body, headers={"content-type": "application/json"}).status_code
+        http_ms = (time.perf_counter() - t0) * 1000.0
+        parse = f"{_parse_us(body, args.rounds):.1f}" if len(body) <= MAX_REQUEST_BYTES else "-"
+        print(f"{size:8d} {len(body):9d} {parse:>10s} {status:7d} {http_ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
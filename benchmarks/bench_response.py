@@ -0,0 +1,98 @@
+"""Search reply size and render time: v1 ([SEARCH_CACHE] text + data) vs v2 (lean, orjson).
+
+    python -m benchmarks.bench_response
+    python -m benchmarks.bench_response --results 20 --images 8
+
+Builds the search_completed reply for the same result rows and measures the rendering
+after the handler returns. The old route returned a dict, so FastAPI ran
+`jsonable_encoder` and then the stdlib `JSONResponse`. The routes now return
+`ORJSONResponse` directly. Sizes are reported raw and gzip-compressed (what
+GZipMiddleware sends to clients that accept it).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import statistics
+import time
+import uuid
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.routers.agent_run import _search_reply
+from app.schemas import AgentRunRequest
+from benchmarks.corpus import CITIES, build_corpus
+
+
+def _rows(count: int, images: int) -> list[dict[str, Any]]:
+    corpus = build_corpus(count * 4, 7)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": data["title"],
+            "price": float(data["price"]),
+            "location": CITIES[i % len(CITIES)],
+            "category": data["category"],
+            "condition": "used",
+            "images": [f"https://cdn.example.com/listing-images/{uuid.uuid4()}/{n}.jpg" for n in range(images)],
+            "created_at": "2026-01-15T10:00:00+00:00",
+        }
+        for i, data in enumerate(corpus.listings[:count])
+    ]
+
+
+def _time_us(fn: Callable[[], bytes], rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1000.0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=6, help="listings per reply (search_listings default limit)")
+    parser.add_argument("--images", type=int, default=5, help="image URLs per listing")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = _rows(args.results, args.images)
+    facets = {
+        "total": 42,
+        "categories": [{"value": "Elektronik", "count": 30}, {"value": "Spor & Outdoor", "count": 12}],
+        "cities": [{"value": "İstanbul", "code": 34, "count": 20}, {"value": "Ankara", "code": 6, "count": 9}],
+        "price": [{"min": 10000, "max": 25000, "count": 25}, {"min": 25000, "max": 50000, "count": 17}],
+    }
+    lead = "🔎 Bulabildiğim ilanlar aşağıda. İsterseniz filtre de söyleyin (şehir, bütçe, kategori)."
+    base = {"user_id": str(uuid.uuid4()), "message": "iphone 13 istanbul 20000-30000 tl"}
+
+    v1_payload = AgentRunRequest(**base, response_version=1)
+    v2_payload = AgentRunRequest(**base, response_version=2)
+
+    def v1_before() -> bytes:
+        reply = _search_reply(v1_payload, None, 0.9, rows, facets, lead)
+        return JSONResponse(jsonable_encoder(reply)).body
+
+    def v1() -> bytes:
+        return ORJSONResponse(_search_reply(v1_payload, None, 0.9, rows, facets, lead)).body
+
+    def v2() -> bytes:
+        return ORJSONResponse(_search_reply(v2_payload, None, 0.9, rows, facets, lead)).body
+
+    print(f"{args.results} listings × {args.images} images per reply")
+    print(f"{'format':34s} {'bytes':>8s} {'gzip':>7s} {'build+render µs':>16s}")
+    for label, fn in (
+        ("v1, jsonable_encoder + stdlib", v1_before),
+        ("v1, ORJSONResponse", v1),
+        ("v2, ORJSONResponse", v2),
+    ):
+        body = fn()
+        print(f"{label:34s} {len(body):8d} {len(gzip.compress(body)):7d} {_time_us(fn, args.rounds):16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Search typo correction: vocabulary build, lookup latency, accuracy, and what it saves downstream.
+
+    python -m benchmarks.bench_spelling
+    python -m benchmarks.bench_spelling --listings 100000 --extra-terms 50000 --budget-ms 1
+
+Builds the `Vocabulary` from the synthetic listings of `bench_facets`. To reach the size of a
+real catalogue, it adds `--extra-terms` made-up words in filler titles. Then it:
+
+- asserts the rewrites of hand-written queries ("ıphone", "samsun galaxy", "bısiklet") and
+  that place names and clean queries stay as typed;
+- applies one random edit (drop, insert, replace, swap, dotless ı) to known terms and times
+  the correction of each typo with a cold cache. It reports how many came back to the
+  original term, and compares p99 with `--budget-ms` (exceeding it exits non-zero);
+- times the corpus search queries and counts how many got a typo rewrite they did not need;
+- runs misspelt queries through `search_listings` (limit 50) on the in-memory Supabase, as
+  typed and corrected: listings queries issued, and results that contain the intended term.
+  The stand-in's `ilike` folds "ı" the way Python does, so diacritics alone would not show
+  a difference there; Postgres `ilike` does not match "ıphone" to "iPhone";
+- adds a listing with a new brand and checks that the next search corrects to it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.bench_facets import build_rows
+
+EXPECTED = {
+    "ıphone arıyorum": "iphone arıyorum",
+    "samsun galaxy": "samsung galaxy",
+    "bısiklet": "bisiklet",
+    "bisklet arıyorum": "bisiklet arıyorum",
+    "iphoen 13 pro": "iphone 13 pro",
+    "playstaton 5": "playstation 5",
+    "kosu bandi": "koşu bandı",
+    # Places and clean queries stay as typed.
+    "samsun'da bisiklet": "samsun'da bisiklet",
+    "iphone istanbul": "iphone istanbul",
+    "kadıköy": "kadıköy",
+    "iphon": "iphon",
+}
+# Hand-written query -> folded term a relevant result's title contains.
+SEARCHES = {
+    "bisklet arıyorum": "bisiklet",
+    "iphoen": "iphone",
+    "samsun galaxy": "samsung",
+    "playstaton": "playstation",
+}
+_ONSETS = ["", "b", "c", "ç", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "ş", "t", "v", "y", "z"]
+_VOWELS = ["a", "e", "ı", "i", "o", "ö", "u", "ü"]
+_CODAS = ["", "", "", "k", "l", "m", "n", "r", "s", "t", "z"]
+
+
+def _pct(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def extra_rows(count: int, seed: int) -> list[dict]:
+    """Filler listings whose titles carry about `count` distinct made-up words."""
+    rng = random.Random(seed)
+    words: set[str] = set()
+    while len(words) < count:
+        syllables = rng.randint(2, 4)
+        words.add("".join(rng.choice(_ONSETS) + rng.choice(_VOWELS) + rng.choice(_CODAS) for _ in range(syllables)))
+    ordered = sorted(words)
+    rng.shuffle(ordered)
+    return [
+        {"id": f"x{i:08d}", "title": " ".join(ordered[i : i + 3]).title(), "metadata": {}}
+        for i in range(0, len(ordered), 3)
+    ]
+
+
+def typo(rng: random.Random, term: str) -> str:
+    i = rng.randrange(len(term))
+    kind = rng.randrange(5)
+    if kind == 0:
+        return term[:i] + term[i + 1 :]
+    if kind == 1:
+        return term[:i] + rng.choice("abcdeiklmnorstuyz") + term[i:]
+    if kind == 2:
+        return term[:i] + rng.choice([c for c in "aeiklmnorstu" if c != term[i]]) + term[i + 1 :]
+    if kind == 3 and i + 1 < len(term) and term[i] != term[i + 1]:
+        return term[:i] + term[i + 1] + term[i] + term[i + 2 :]
+    if "i" in term:
+        j = term.index("i")
+        return term[:j] + "ı" + term[j + 1 :]
+    return term[:i] + term[i + 1 :]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=20_000)
+    parser.add_argument("--extra-terms", type=int, default=30_000)
+    parser.add_argument("--typos", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=20260115)
+    parser.add_argument("--budget-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    from app.core.metrics import SEARCH_CORRECTIONS
+    from app.services.search import search_listings
+    from app.services.spelling import Vocabulary, _fold, set_vocabulary
+    from benchmarks.corpus import build_corpus
+    from benchmarks.fake_supabase import FakeSupabase
+
+    rows = build_rows(args.listings, args.seed)
+    filler = extra_rows(args.extra_terms, args.seed)
+    started = time.perf_counter()
+    vocab = Vocabulary.build([*rows, *filler])
+    build_ms = (time.perf_counter() - started) * 1000.0
+    print(f"vocabulary           {vocab.size} terms from {len(rows) + len(filler)} listings in {build_ms:.0f} ms")
+
+    failed = False
+    for query, expected in EXPECTED.items():
+        got = vocab.correct(query)
+        ok = got == expected
+        failed |= not ok
+        print(f"  {query!r:24} -> {got!r:24} {'ok' if ok else f'expected {expected!r}'}")
+
+    rng = random.Random(args.seed)
+    terms = [t for t in vocab._terms if len(t) >= 5 and t.isalpha()]
+    fixed = other = kept = 0
+    latencies: list[float] = []
+    for term in rng.sample(terms, min(args.typos, len(terms))):
+        wrong = typo(rng, term)
+        folded = _fold(wrong)
+        if folded == term or folded in vocab._ids or vocab._extends(folded):
+            continue  # the typo is a known term or prefix itself; nothing to correct
+        vocab._near.clear()
+        started = time.perf_counter()
+        got = vocab.correct(wrong)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        if _fold(got) == term:
+            fixed += 1
+        elif got != wrong:
+            other += 1
+        else:
+            kept += 1
+    total = max(1, len(latencies))
+    p99 = _pct(latencies, 99)
+    print(
+        f"typos                {len(latencies)}: {fixed / total:.1%} back to the term, {other / total:.1%} to another, "
+        f"{kept / total:.1%} kept  (cold cache p50 {_pct(latencies, 50):.3f} ms, p99 {p99:.3f} ms, max {max(latencies):.3f} ms)"
+    )
+
+    corpus = build_corpus(4000, args.seed)
+    before = SEARCH_CORRECTIONS.value("typo")
+    timings: list[float] = []
+    for query in corpus.queries:
+        started = time.perf_counter()
+        vocab.correct(query)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    needless = SEARCH_CORRECTIONS.value("typo") - before
+    print(
+        f"corpus queries       {len(corpus.queries)}: p50 {_pct(timings, 50):.3f} ms, p99 {_pct(timings, 99):.3f} ms, "
+        f"typo rewrites of clean queries: {needless:.0f}"
+    )
+
+    fake = FakeSupabase()
+    fake.tables["listings"].extend(
+        fake.with_defaults("listings", {**row, "status": "active", "description": row["description"] or row["title"]})
+        for row in rows[:5000]
+    )
+    print(f"\n{'query':20s} {'as typed':>24s}   {'corrected':>24s}")
+    for query, term in SEARCHES.items():
+        cells = []
+        for text in (query, vocab.correct(query)):
+            fake.calls.clear()
+            results = search_listings(fake, text, limit=50)
+            relevant = sum(term in _fold(str(r.get("title") or "").lower()) for r in results)
+            queries = sum(1 for table, _ in fake.calls if table == "listings")
+            cells.append(f"{queries} queries, {relevant}/{len(results)} hits")
+        print(f"{query:20s} {cells[0]:>24s}   {cells[1]:>24s}")
+
+    set_vocabulary(vocab)
+    started = time.perf_counter()
+    vocab.add("Xiaomi Redmi Note 12 Pro 256GB", "xiaomi redmi note 12 pro telefon")
+    add_us = (time.perf_counter() - started) * 1e6
+    got = vocab.correct("xiomi redmi")
+    ok = got == "xiaomi redmi"
+    failed |= not ok
+    print(f"\nincremental add      {add_us:.0f} us; 'xiomi redmi' -> {got!r} {'ok' if ok else 'expected xiaomi redmi'}")
+
+    if p99 > args.budget_ms:
+        print(f"over budget ({args.budget_ms:.1f} ms)")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
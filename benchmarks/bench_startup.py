@@ -0,0 +1,88 @@
+"""Cold-start benchmark: `uvicorn main:app` spawn → first successful `GET /healthz`.
+
+    python -m benchmarks.bench_startup                  # 5 runs, compare with the budget
+    python -m benchmarks.bench_startup --runs 10 --budget-ms 1500
+
+Each run starts a fresh uvicorn process on a free port (what a Railway restart or a new
+scale-out instance does) and polls `/healthz` every few milliseconds. The median is
+compared with `--budget-ms`; exceeding it exits non-zero.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _healthy(port: int) -> bool:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=0.5)
+    try:
+        conn.request("GET", "/healthz")
+        return conn.getresponse().status == 200
+    except OSError:
+        return False
+    finally:
+        conn.close()
+
+
+def time_to_healthz(timeout_s: float, poll_s: float) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ},
+    )
+    try:
+        while time.perf_counter() - started < timeout_s:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+            if _healthy(port):
+                return time.perf_counter() - started
+            time.sleep(poll_s)
+        raise TimeoutError(f"/healthz not ready after {timeout_s:.0f} s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--timeout-s", type=float, default=30.0)
+    parser.add_argument("--poll-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    time_to_healthz(args.timeout_s, args.poll_ms / 1000.0)  # warm the .pyc cache
+    samples = [time_to_healthz(args.timeout_s, args.poll_ms / 1000.0) * 1000.0 for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(
+        f"uvicorn → /healthz: median {median:.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms "
+        f"({args.runs} runs, budget {args.budget_ms:.0f} ms)"
+    )
+    if median > args.budget_ms:
+        print("over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
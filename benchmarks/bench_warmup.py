@@ -0,0 +1,144 @@
+"""First-request latency on a fresh instance: cold vs after the lifespan warm-up.
+
+    python -m benchmarks.bench_warmup
+    python -m benchmarks.bench_warmup --db-latency-ms 20 --listings 5000
+
+Each mode starts the app in a fresh uvicorn process. Supabase is the in-memory stand-in,
+seeded and with per-query latency, and OpenAI is the local stub. The script waits for
+`/healthz`. In warm mode it then also waits for `/readyz` to turn 200; it must answer 503
+until the warm-up is done. It then times the first small-talk, search and listing turns
+against a second round of the same turns, and notes whether the first search already had
+facet counts. Cold mode (`WARMUP_ENABLED=false`) sends the
+turns as soon as `/healthz` answers, which is what an instance gets from the router
+today.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from benchmarks import openai_stub
+from benchmarks._serve import serve_in_thread
+
+ROOT = Path(__file__).resolve().parent.parent
+TURNS = (("small_talk", "selam"), ("search", "iphone arıyorum"), ("draft", "iPhone 13 128GB satıyorum 25000 TL"))
+
+
+def _serve(port: int, db_latency_ms: float, listings: int) -> None:
+    import uvicorn
+
+    from app.clients.supabase import set_supabase_client
+    from benchmarks.fake_supabase import FakeSupabase
+    from benchmarks.load import seed_listings
+    from main import create_app
+
+    fake = FakeSupabase(latency_ms=db_latency_ms)
+    seed_listings(fake, listings, 7)
+    set_supabase_client(fake)
+    uvicorn.run(create_app(), host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+
+
+def _free_port() -> int:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _round(client: Any, info: dict[str, Any]) -> dict[str, float]:
+    user_id = str(uuid.uuid4())
+    out: dict[str, float] = {}
+    for label, message in TURNS:
+        started = time.perf_counter()
+        resp = client.post("/agent/run", json={"user_id": user_id, "message": message})
+        resp.raise_for_status()
+        out[label] = (time.perf_counter() - started) * 1000.0
+        if label == "search":
+            info.setdefault("first_search_facets", bool((resp.json().get("data") or {}).get("facets")))
+    return out
+
+
+def measure(warm: bool, args: argparse.Namespace, openai_url: str) -> tuple[dict[str, float], dict[str, float], dict[str, Any]]:
+    import httpx
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "WARMUP_ENABLED": "true" if warm else "false",
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "RATE_LIMIT_ENABLED": "false",
+    }
+    cmd = [sys.executable, "-m", "benchmarks.bench_warmup", "--serve", str(port)]
+    cmd += ["--db-latency-ms", str(args.db_latency_ms), "--listings", str(args.listings)]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    info: dict[str, Any] = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30.0) as client:
+            started = time.perf_counter()
+            while True:
+                try:
+                    if client.get("/healthz").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+            info["healthz_ms"] = (time.perf_counter() - started) * 1000.0
+            if warm:
+                statuses = set()
+                while True:
+                    resp = client.get("/readyz")
+                    statuses.add(resp.status_code)
+                    if resp.status_code == 200:
+                        break
+                    time.sleep(0.005)
+                assert 503 in statuses, "readyz was 200 before the warm-up finished"
+                report = resp.json()
+                assert report["dependencies"]["supabase"]["ok"] and report["dependencies"]["openai"]["ok"], report
+                info["readyz_ms"] = (time.perf_counter() - started) * 1000.0
+                info["warmup_ms"] = report["warmup_ms"]
+                info["facet_rows"] = report["warmed"]["facet_snapshot_rows"]
+                info["vocabulary_terms"] = report["warmed"]["search_vocabulary_terms"]
+            first = _round(client, info)
+            second = _round(client, info)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return first, second, info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db-latency-ms", type=float, default=10.0)
+    parser.add_argument("--listings", type=int, default=2000)
+    args = parser.parse_args()
+    if args.serve:
+        _serve(args.serve, args.db_latency_ms, args.listings)
+        return
+
+    openai_url, stop = serve_in_thread(openai_stub.app)
+    try:
+        results = {mode: measure(mode == "warm", args, openai_url) for mode in ("cold", "warm")}
+    finally:
+        stop()
+
+    for mode, (_, _, info) in results.items():
+        extra = ", ".join(f"{k}={v:.0f}" if isinstance(v, float) else f"{k}={v}" for k, v in info.items())
+        print(f"{mode:5s} {extra}")
+    print(f"\n{'turn':12s} {'cold 1st':>9s} {'cold 2nd':>9s} {'warm 1st':>9s} {'warm 2nd':>9s}  (ms)")
+    for label, _ in TURNS:
+        row = [results[mode][i][label] for mode in ("cold", "warm") for i in (0, 1)]
+        print(f"{label:12s} " + " ".join(f"{v:9.1f}" for v in row))
+
+
+if __name__ == "__main__":
+    main()
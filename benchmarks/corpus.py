@@ -0,0 +1,253 @@
+"""Deterministic Turkish message corpus for hot-path benchmarks.
+
+`build_corpus(n, seed)` mixes the traffic the agent actually sees: listing packets
+(electronics, vehicles, real estate, fashion, home), search queries with budgets and
+cities, small talk, commands, short follow-up answers and acknowledgements. The same seed
+always yields the same corpus, so output digests can be compared across runs.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+CITIES = [
+    "İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Adana", "Konya", "Gaziantep", "Şanlıurfa",
+    "Kocaeli", "Mersin", "Diyarbakır", "Kayseri", "Eskişehir", "Trabzon", "Samsun", "Denizli",
+    "Sakarya", "Manisa", "Tekirdağ", "Muğla", "Aydın", "Balıkesir", "Malatya", "Erzurum",
+]
+DISTRICTS = [
+    "Kadıköy", "Beşiktaş", "Üsküdar", "Çankaya", "Keçiören", "Bornova", "Karşıyaka", "Nilüfer",
+    "Muratpaşa", "Konyaaltı", "Seyhan", "Selçuklu", "Şahinbey", "Tepebaşı", "Ortahisar", "Atakum",
+    "Pamukkale", "Bodrum", "Fethiye", "Ataşehir", "Bakırköy", "Maltepe", "Pendik", "Yenimahalle",
+]
+
+PHONES = [
+    ("iPhone", ["11", "12", "13", "13 Pro", "14", "14 Pro Max", "15", "15 Pro"]),
+    ("Samsung Galaxy", ["S21", "S22 Ultra", "S23", "A54", "A34", "Note 20"]),
+    ("Xiaomi", ["Redmi Note 12", "13T", "Poco X5", "12 Lite"]),
+    ("Huawei", ["P40", "Mate 20", "Nova 9"]),
+]
+COMPUTERS = ["MacBook Air M1", "MacBook Pro M2", "Lenovo ThinkPad T14", "Asus ROG Strix", "HP Pavilion", "Dell XPS 13", "Monster Abra A5"]
+ELECTRONICS_MISC = ["PlayStation 5", "Xbox Series X", "iPad Air", "Apple Watch SE", "AirPods Pro", "Samsung 55 inç TV", "Canon EOS 250D", "Dyson V11"]
+CARS = [
+    ("Renault", ["Clio", "Megane", "Symbol", "Fluence"]),
+    ("Fiat", ["Egea", "Linea", "Doblo", "Punto"]),
+    ("Volkswagen", ["Golf", "Passat", "Polo", "Caddy"]),
+    ("Toyota", ["Corolla", "C-HR", "Yaris", "Auris"]),
+    ("Ford", ["Focus", "Fiesta", "Transit Connect", "Kuga"]),
+    ("BMW", ["3.20i", "5.20d", "X1", "1.16d"]),
+    ("Hyundai", ["i20", "Accent Blue", "Tucson", "i30"]),
+]
+MOTORS = ["Honda PCX 125", "Yamaha NMAX", "Bajaj Pulsar", "Kuba Blueberry", "Vespa Primavera"]
+HOMES = ["daire", "ev", "rezidans", "villa", "müstakil ev", "stüdyo daire", "yazlık"]
+ROOMS = ["1+0", "1+1", "2+1", "3+1", "4+1", "5+2"]
+FASHION = [("mont", ["deri", "kot"]), ("ceket", ["kumaş", "deri"]), ("elbise", ["pamuk"]), ("ayakkabı", ["deri"]), ("çanta", ["deri"])]
+FASHION_BRANDS = ["Zara", "Mango", "Nike", "Adidas", "Koton", "LC Waikiki", "Michael Kors"]
+HOME_ITEMS = ["koltuk takımı", "yemek masası", "buzdolabı", "çamaşır makinesi", "gardırop", "yatak odası takımı", "halı", "bulaşık makinesi"]
+SPORT = ["bisiklet", "koşu bandı", "dambıl seti", "kamp çadırı", "kayak takımı", "elektrikli scooter"]
+COLORS = ["siyah", "beyaz", "gri", "mavi", "kırmızı", "lacivert", "gold"]
+CONDITIONS = ["sıfır", "az kullanılmış", "temiz", "kutulu", "faturalı", "garantili", "çiziksiz"]
+
+SMALL_TALK = [
+    "selam", "merhaba", "sa", "selamlar", "günaydın", "iyi akşamlar", "naber", "nasılsın",
+    "merhaba nasılsın", "selam naber", "ne haber", "iyi günler", "hey", "nasıl gidiyor",
+]
+COMMANDS = ["onaylıyorum", "yayınla", "iptal", "vazgeç", "ilan ver", "ilan vermek istiyorum", "paylaş", "stop"]
+SEARCH_SUFFIX = ["arıyorum", "var mı", "bul", "lazım", "göster", "ilanları", "almak istiyorum", "bakmak istiyorum"]
+BUDGETS = ["", "", "10000-20000 tl", "50000 altı", "100k üstü", "20bin-30bin", "5000 tl altında", "15k-25k"]
+
+
+@dataclass
+class Corpus:
+    messages: list[tuple[str, str]] = field(default_factory=list)  # (kind, text)
+    queries: list[str] = field(default_factory=list)
+    listings: list[dict[str, Any]] = field(default_factory=list)  # listing_data dicts
+    visions: list[dict[str, Any]] = field(default_factory=list)
+
+    def texts(self, *kinds: str) -> list[str]:
+        return [t for k, t in self.messages if not kinds or k in kinds]
+
+
+def _price(rng: random.Random, lo: int, hi: int, step: int = 500) -> int:
+    return rng.randrange(lo, hi, step)
+
+
+def _electronics(rng: random.Random) -> tuple[str, dict[str, Any]]:
+    roll = rng.random()
+    if roll < 0.55:
+        brand, models = rng.choice(PHONES)
+        model = rng.choice(models)
+        storage = rng.choice(["64", "128", "256", "512"])
+        title = f"{brand} {model} {storage}GB"
+        attrs = {"storage": f"{storage}GB", "brand": brand.split()[0], "model": model}
+        price = _price(rng, 4000, 75000)
+    elif roll < 0.8:
+        title = rng.choice(COMPUTERS)
+        ram = rng.choice(["8", "16", "32"])
+        title += f" {ram}GB RAM"
+        attrs = {"ram": f"{ram}GB"}
+        price = _price(rng, 9000, 90000)
+    else:
+        title = rng.choice(ELECTRONICS_MISC)
+        attrs = {}
+        price = _price(rng, 1500, 40000)
+    extra = rng.choice(CONDITIONS)
+    if rng.random() < 0.3:
+        attrs["warranty"] = "Var"
+        extra += " garantili"
+    return f"{title} {extra}", {"title": title, "category": "Elektronik", "price": price, "attributes": attrs}
+
+
+def _vehicle(rng: random.Random) -> tuple[str, dict[str, Any]]:
+    if rng.random() < 0.8:
+        brand, models = rng.choice(CARS)
+        title = f"{brand} {rng.choice(models)}"
+        year = rng.randint(2005, 2024)
+        km = rng.randrange(5_000, 320_000, 1_000)
+        fuel = rng.choice(["dizel", "benzin", "lpg", "hibrit"])
+        gear = rng.choice(["manuel", "otomatik", "yarı otomatik"])
+        km_text = f"{km:,}".replace(",", ".") if rng.random() < 0.5 else str(km)
+        tramer = rng.choice(["tramer yok", "hasar kaydı yok", f"tramer {rng.randint(1, 60)}000", ""])
+        text = f"{year} {title} {fuel} {gear} {km_text} km {tramer}".strip()
+        attrs = {"year": str(year), "km": str(km), "fuel": fuel.capitalize(), "transmission": gear.capitalize()}
+        price = _price(rng, 250_000, 3_500_000, 5_000)
+    else:
+        title = rng.choice(MOTORS)
+        year = rng.randint(2012, 2024)
+        text = f"{year} model {title} motosiklet {rng.randrange(1000, 60000, 500)} km"
+        attrs = {"year": str(year)}
+        price = _price(rng, 30_000, 400_000, 1_000)
+    return text, {"title": title, "category": "Otomotiv", "price": price, "attributes": attrs}
+
+
+def _real_estate(rng: random.Random) -> tuple[str, dict[str, Any]]:
+    room = rng.choice(ROOMS)
+    home = rng.choice(HOMES)
+    m2 = rng.randrange(45, 320, 5)
+    kind = rng.choice(["satılık", "kiralık"])
+    floor = rng.choice(["bahçe katı", "ara kat", "en üst kat", "3. kat", ""])
+    title = f"{kind} {room} {home}"
+    text = f"{title} {m2} m2 {floor}".strip()
+    price = _price(rng, 8_000, 60_000, 500) if kind == "kiralık" else _price(rng, 900_000, 15_000_000, 10_000)
+    return text, {"title": title, "category": "Emlak", "price": price, "attributes": {"m2": str(m2)}}
+
+
+def _fashion(rng: random.Random) -> tuple[str, dict[str, Any]]:
+    item, materials = rng.choice(FASHION)
+    brand = rng.choice(FASHION_BRANDS)
+    size = rng.choice(["xs", "s", "m", "l", "xl", "38", "40", "42", "44"])
+    material = rng.choice(materials)
+    color = rng.choice(COLORS)
+    title = f"{brand} {color} {material} {item}"
+    return f"{title} {size} beden", {"title": title, "category": "Moda & Aksesuar", "price": _price(rng, 200, 9000, 50), "attributes": {"size": size.upper(), "material": material}}
+
+
+def _home(rng: random.Random) -> tuple[str, dict[str, Any]]:
+    if rng.random() < 0.7:
+        title = f"{rng.choice(COLORS)} {rng.choice(HOME_ITEMS)}"
+        category = "Ev & Yaşam"
+    else:
+        title = rng.choice(SPORT)
+        category = "Spor & Outdoor"
+    return f"{title} {rng.choice(CONDITIONS)}", {"title": title, "category": category, "price": _price(rng, 300, 60000, 100), "attributes": {}}
+
+
+_LISTING_MAKERS = [(_electronics, 0.35), (_vehicle, 0.2), (_real_estate, 0.15), (_fashion, 0.15), (_home, 0.15)]
+
+
+def _listing(rng: random.Random) -> tuple[str, dict[str, Any]]:
+    roll = rng.random()
+    acc = 0.0
+    for maker, weight in _LISTING_MAKERS:
+        acc += weight
+        if roll < acc:
+            return maker(rng)
+    return _home(rng)
+
+
+def _packet(rng: random.Random, text: str, data: dict[str, Any]) -> str:
+    """Wrap a listing into the shapes users actually send."""
+    price = data["price"]
+    city = rng.choice(CITIES)
+    district = rng.choice(DISTRICTS)
+    shape = rng.randrange(7)
+    if shape == 0:
+        return f"{text} {price} TL {city}"
+    if shape == 1:
+        return f"{text} satıyorum {price} tl"
+    if shape == 2:
+        return f"{text} {price}₺ {district}"
+    if shape == 3:
+        return f"satılık {text} fiyat {price} TL konum: {district}"
+    if shape == 4:
+        return f"{text} {price} TL {city} {district}"
+    if shape == 5:
+        return f"ilan vermek istiyorum {text}"
+    return f"{text} {price} tl acil satılık"
+
+
+def _search(rng: random.Random) -> str:
+    _, data = _listing(rng)
+    words = data["title"].split()
+    core = " ".join(words[: rng.randint(1, min(3, len(words)))])
+    parts = [core]
+    if rng.random() < 0.4:
+        parts.append(rng.choice(CITIES).lower() if rng.random() < 0.5 else rng.choice(CITIES))
+    budget = rng.choice(BUDGETS)
+    if budget:
+        parts.append(budget)
+    parts.append(rng.choice(SEARCH_SUFFIX))
+    return " ".join(parts)
+
+
+def _vision(rng: random.Random, data: dict[str, Any]) -> dict[str, Any]:
+    if rng.random() < 0.5:
+        return {}
+    return {
+        "brand": (data.get("attributes") or {}).get("brand") or "",
+        "color": rng.choice(COLORS),
+        "condition": rng.choice(["çok iyi", "iyi", "kullanım izleri var", ""]),
+    }
+
+
+def build_corpus(n: int = 5000, seed: int = 20260115) -> Corpus:
+    rng = random.Random(seed)
+    corpus = Corpus()
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.40:
+            text, data = _listing(rng)
+            corpus.messages.append(("listing", _packet(rng, text, data)))
+            data = dict(data)
+            data["location"] = rng.choice(CITIES)
+            data["condition"] = rng.choice(["2.el", "sıfır", ""])
+            if rng.random() < 0.3:
+                data["description_notes"] = f"{rng.choice(CONDITIONS)}, {rng.choice(CONDITIONS)}; 05321234567 arayın {data['price']} tl"
+            corpus.listings.append(data)
+            corpus.visions.append(_vision(rng, data))
+        elif roll < 0.70:
+            query = _search(rng)
+            corpus.messages.append(("search", query))
+            corpus.queries.append(query)
+        elif roll < 0.82:
+            corpus.messages.append(("small_talk", rng.choice(SMALL_TALK)))
+        elif roll < 0.90:
+            corpus.messages.append(("command", rng.choice(COMMANDS)))
+        else:
+            reply = rng.choice(
+                [
+                    str(_price(rng, 500, 90000, 250)),
+                    f"{_price(rng, 500, 90000, 250)} TL",
+                    rng.choice(CITIES),
+                    f"konum: {rng.choice(DISTRICTS)}",
+                    rng.choice(["Elektronik", "Otomotiv", "Emlak", "Ev & Yaşam", "Moda & Aksesuar"]),
+                    "tramer yok, bakımları yeni yapıldı",
+                    "128 gb, 6 gb ram, garanti var",
+                    "tamam",
+                    "teşekkürler",
+                ]
+            )
+            corpus.messages.append(("follow_up", reply))
+    return corpus
@@ -0,0 +1,178 @@
+"""Request deadlines: slow dependencies must not hold a turn past the caller's budget.
+
+    python -m benchmarks.deadlines
+
+Turns go through `agent_run` with an `X-Request-Timeout-Ms` header, against the
+in-memory Supabase and the local OpenAI stub made slow on purpose. Each scenario asserts
+that the reply arrives within the budget, and says which answer it was: the
+deterministic one with the optional LLM step skipped, or the short "please resend" reply
+once the deadline is hit. Exit code is non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Any
+
+from benchmarks import openai_stub
+from benchmarks._serve import serve_in_thread
+
+OPTIONAL_S = 1.0
+RESERVE_S = 0.5
+MARGIN_S = 0.1
+
+
+def _request(budget_ms: float | None) -> Any:
+    from starlette.requests import Request
+
+    headers = [(b"x-request-timeout-ms", str(int(budget_ms)).encode())] if budget_ms is not None else []
+    return Request({"type": "http", "method": "POST", "path": "/agent/run", "headers": headers})
+
+
+async def _turn(user_id: str, message: str, budget_ms: float | None) -> tuple[float, dict[str, Any]]:
+    from app.core.request_stats import track_request
+    from app.routers.agent_run import agent_run
+    from app.schemas import AgentRunRequest
+
+    with track_request():
+        started = time.perf_counter()
+        result = await agent_run(AgentRunRequest(user_id=user_id, message=message), _request(budget_ms))
+    return (time.perf_counter() - started) * 1000.0, result
+
+
+def _ready_draft(fake: Any, user_id: str) -> None:
+    fake.tables["profiles"].append({"id": user_id, "phone": None, "display_name": "Ayşe", "credits": 100})
+    fake.tables["active_drafts"].append(
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "state": "DRAFT",
+            "listing_data": {
+                "title": "iPhone 13 128GB",
+                "category": "Elektronik",
+                "price": 25000,
+                "location": "İstanbul",
+                "condition": "used",
+                "description": "Temiz, kutulu.",
+            },
+            "images": {"urls": []},
+            "vision": {},
+        }
+    )
+
+
+async def run() -> None:
+    from app.clients import openai as oa
+    from app.clients.supabase import set_supabase_client
+    from app.core import deadline
+    from app.core.metrics import DEADLINE_SKIPPED, OPENAI_ERRORS
+    from app.core.ratelimit import TokenBucketLimiter
+    from app.routers import agent_run as agent_run_module
+    from benchmarks.fake_supabase import FakeSupabase
+    from benchmarks.query_budget import _seed
+
+    agent_run_module.rate_limiter = TokenBucketLimiter(capacity=1e9, refill_per_s=1e9)
+
+    # 1) Budget parsing: the header wins, bad values fall back to REQUEST_DEADLINE_S.
+    assert deadline.request_budget("1500") == 1.5 - MARGIN_S
+    assert deadline.request_budget("abc") == deadline.request_budget(None) == 20.0 - MARGIN_S
+    assert deadline.request_budget("-5") == 20.0 - MARGIN_S
+    print("budget parsing       ok")
+
+    # 2) OpenAI attempts are capped at the time left; the breaker does not count the cut.
+    openai_stub.configure(latency_ms=5)
+    await oa.openai_chat("sys", "merhaba")  # warm the connection pool
+    openai_stub.configure(latency_ms=3000)
+    before = OPENAI_ERRORS.value("deadline")
+    with deadline.deadline_scope(0.6):
+        started = time.perf_counter()
+        try:
+            await oa.openai_chat("sys", "merhaba")
+            raise AssertionError("slow call was not cut")
+        except deadline.DeadlineExceeded:
+            pass
+        ms = (time.perf_counter() - started) * 1000.0
+    assert ms < 700, ms
+    assert OPENAI_ERRORS.value("deadline") == before + 1
+    assert oa.breaker.state == "closed" and oa.breaker._failures == 0
+    print(f"openai capped        {ms:7.1f} ms  (stub answers after 3000 ms, budget 600 ms)")
+
+    # 3) Publish with little budget left: deterministic keywords, no OpenAI call.
+    fake = FakeSupabase()
+    set_supabase_client(fake)
+    user_id = str(uuid.uuid4())
+    _ready_draft(fake, user_id)
+    openai_stub.configure(latency_ms=3000)
+    skipped = DEADLINE_SKIPPED.value("llm_keywords")
+    ms, result = await _turn(user_id, "onaylıyorum", budget_ms=OPTIONAL_S * 1000 - 200)
+    assert result["intent"] == "completion_published", result
+    listing = fake.tables["listings"][-1]
+    assert listing["metadata"]["keywords"] and "stub" not in listing["metadata"]["keywords"], listing["metadata"]
+    assert openai_stub.stats["requests"] == 0, openai_stub.stats
+    assert DEADLINE_SKIPPED.value("llm_keywords") == skipped + 1
+    assert fake.tables["profiles"][-1]["credits"] == 45
+    print(f"publish, low budget  {ms:7.1f} ms  deterministic keywords: {listing['metadata']['keywords_text']}")
+
+    # 4) Publish with budget for the LLM step but a slow model: the keyword call is cut
+    #    RESERVE_S before the deadline, and the listing goes out with deterministic keywords.
+    fake = FakeSupabase()
+    set_supabase_client(fake)
+    user_id = str(uuid.uuid4())
+    _ready_draft(fake, user_id)
+    budget_ms = OPTIONAL_S * 1000 + 500
+    ms, result = await _turn(user_id, "onaylıyorum", budget_ms=budget_ms)
+    assert result["intent"] == "completion_published", result
+    assert ms < budget_ms, ms
+    assert openai_stub.stats["requests"] >= 1, openai_stub.stats
+    assert "stub" not in fake.tables["listings"][-1]["metadata"]["keywords"]
+    assert fake.tables["profiles"][-1]["credits"] == 45
+    assert not fake.tables["active_drafts"], fake.tables["active_drafts"]
+    print(f"publish, slow model  {ms:7.1f} ms  budget {budget_ms:.0f} ms, listing + credits written")
+
+    # 5) Slow database: reads stop at the deadline and the caller gets the degraded reply in time.
+    latency_ms = 150.0
+    fake = FakeSupabase(latency_ms=latency_ms)
+    set_supabase_client(fake)
+    user_id = str(uuid.uuid4())
+    _seed(fake, user_id)
+    budget_ms = 500.0
+    cut = DEADLINE_SKIPPED.value("turn")
+    ms, result = await _turn(user_id, "iPhone 13 128GB satıyorum 25000 TL", budget_ms=budget_ms)
+    assert result["intent"] == "deadline_exceeded", result
+    assert ms < budget_ms + latency_ms, ms
+    assert DEADLINE_SKIPPED.value("turn") == cut + 1
+    print(f"slow database        {ms:7.1f} ms  budget {budget_ms:.0f} ms, {latency_ms:.0f} ms per query -> deadline_exceeded")
+
+    # Same turn with the default budget completes normally.
+    ms, result = await _turn(str(uuid.uuid4()), "iPhone 13 128GB satıyorum 25000 TL", budget_ms=None)
+    assert result["intent"] == "draft_collect", result
+    print(f"default budget       {ms:7.1f} ms  -> {result['intent']}")
+
+    await oa.aclose_openai()
+
+
+def main() -> None:
+    base_url, stop = serve_in_thread(openai_stub.app)
+    os.environ.update(
+        {
+            "OPENAI_BASE_URL": f"{base_url}/v1",
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_MAX_RETRIES": "0",
+            "REQUEST_DEADLINE_S": "20",
+            "REQUEST_DEADLINE_MARGIN_S": str(MARGIN_S),
+            "REQUEST_DEADLINE_OPTIONAL_S": str(OPTIONAL_S),
+            "REQUEST_DEADLINE_RESERVE_S": str(RESERVE_S),
+        }
+    )
+    try:
+        asyncio.run(run())
+    finally:
+        stop()
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""In-memory, PostgREST-compatible stand-in for the subset of supabase-py the agent uses.
+
+Covers `active_drafts`, `listings`, `profiles` and `audit_logs` (any table name works) with
+select/insert/update/delete and the filters the code issues: `eq`, `neq`, `in_`, `or_`
+(ilike/eq terms), `ilike`, `gte`/`lte`, `order`, `limit`, including `col->>key` JSON paths.
+Rows are deep-copied on the way in and out, so callers observe the same aliasing rules as
+with a real PostgREST round trip. `latency_ms`/`jitter_ms` inject a blocking delay per call,
+like the synchronous HTTP client does. Install it with
+`app.clients.supabase.set_supabase_client`.
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.helpers import now_iso
+
+# Columns that get a database default on insert.
+_DEFAULTS: dict[str, tuple[str, ...]] = {
+    "active_drafts": ("id", "created_at", "updated_at"),
+    "listings": ("id", "created_at", "updated_at"),
+    "profiles": ("created_at", "updated_at"),
+    "audit_logs": ("id", "created_at"),
+}
+
+
+def _get(row: dict[str, Any], column: str) -> Any:
+    # Supports PostgREST JSON paths such as `metadata->>keywords_text`.
+    if "->>" in column:
+        base, _, key = column.partition("->>")
+        value = row.get(base)
+        if not isinstance(value, dict):
+            return None
+        inner = value.get(key)
+        return None if inner is None else str(inner)
+    return row.get(column)
+
+
+def _ilike(pattern: str) -> re.Pattern[str]:
+    parts = [re.escape(p) for p in pattern.split("%")]
+    return re.compile("^" + ".*".join(parts).replace("_", ".") + "$", re.IGNORECASE | re.DOTALL)
+
+
+def _ilike_filter(column: str, pattern: str) -> Callable[[dict[str, Any]], bool]:
+    rx = _ilike(pattern)
+    return lambda row: isinstance(_get(row, column), str) and bool(rx.match(_get(row, column)))
+
+
+def _or_filter(expr: str) -> Callable[[dict[str, Any]], bool]:
+    preds: list[Callable[[dict[str, Any]], bool]] = []
+    for part in expr.split(","):
+        column, op, value = part.split(".", 2)
+        if op == "ilike":
+            preds.append(_ilike_filter(column, value))
+        elif op == "eq":
+            preds.append(lambda row, c=column, v=value: str(_get(row, c)) == v)
+        else:
+            raise ValueError(f"unsupported or_ operator: {op}")
+    return lambda row: any(p(row) for p in preds)
+
+
+@dataclass
+class FakeResult:
+    data: list[dict[str, Any]]
+    count: int | None = None
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeSupabase", table: str) -> None:
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._values: Any = None
+        self._filters: list[Callable[[dict[str, Any]], bool]] = []
+        self._order: list[tuple[str, bool]] = []
+        self._limit: int | None = None
+        self._conflict = "id"
+
+    # -- operations -------------------------------------------------------
+    def select(self, columns: str = "*", **_: Any) -> "FakeQuery":
+        self._op = "select"
+        self._columns = columns
+        return self
+
+    def insert(self, values: dict[str, Any] | list[dict[str, Any]], **_: Any) -> "FakeQuery":
+        self._op = "insert"
+        self._values = values
+        return self
+
+    def upsert(self, values: dict[str, Any] | list[dict[str, Any]], on_conflict: str = "id", **_: Any) -> "FakeQuery":
+        self._op = "upsert"
+        self._values = values
+        self._conflict = on_conflict
+        return self
+
+    def update(self, values: dict[str, Any], **_: Any) -> "FakeQuery":
+        self._op = "update"
+        self._values = values
+        return self
+
+    def delete(self, **_: Any) -> "FakeQuery":
+        self._op = "delete"
+        return self
+
+    # -- filters ----------------------------------------------------------
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append(lambda row: _get(row, column) == value)
+        return self
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append(lambda row: _get(row, column) != value)
+        return self
+
+    def in_(self, column: str, values: list[Any]) -> "FakeQuery":
+        allowed = set(values)
+        self._filters.append(lambda row: _get(row, column) in allowed)
+        return self
+
+    def or_(self, filters: str, **_: Any) -> "FakeQuery":
+        self._filters.append(_or_filter(filters))
+        return self
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        self._filters.append(_ilike_filter(column, pattern))
+        return self
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        expected = None if value in (None, "null") else value
+        self._filters.append(lambda row: _get(row, column) is expected)
+        return self
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) <= value)
+        return self
+
+    def order(self, column: str, desc: bool = False, **_: Any) -> "FakeQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **_: Any) -> "FakeQuery":
+        self._limit = size
+        return self
+
+    # -- execution --------------------------------------------------------
+    def _project(self, row: dict[str, Any]) -> dict[str, Any]:
+        if self._columns.strip() == "*":
+            return copy.deepcopy(row)
+        cols = [c.strip() for c in self._columns.split(",") if c.strip()]
+        return {c: copy.deepcopy(row.get(c)) for c in cols}
+
+    def _matching(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [r for r in rows if all(f(r) for f in self._filters)]
+
+    def execute(self) -> FakeResult:
+        self._db.before_execute(self._table, self._op)
+        with self._db.lock:
+            rows = self._db.tables[self._table]
+            if self._op == "insert":
+                values = self._values if isinstance(self._values, list) else [self._values]
+                created = [self._db.with_defaults(self._table, v) for v in values]
+                rows.extend(created)
+                return FakeResult([copy.deepcopy(r) for r in created])
+            if self._op == "upsert":
+                values = self._values if isinstance(self._values, list) else [self._values]
+                out: list[dict[str, Any]] = []
+                for v in values:
+                    hit = next((r for r in rows if r.get(self._conflict) == v.get(self._conflict)), None)
+                    if hit is None:
+                        hit = self._db.with_defaults(self._table, v)
+                        rows.append(hit)
+                    else:
+                        hit.update(copy.deepcopy(v))
+                    out.append(copy.deepcopy(hit))
+                return FakeResult(out)
+            matched = self._matching(rows)
+            if self._op == "update":
+                for r in matched:
+                    r.update(copy.deepcopy(self._values))
+                return FakeResult([copy.deepcopy(r) for r in matched])
+            if self._op == "delete":
+                ids = {id(r) for r in matched}
+                rows[:] = [r for r in rows if id(r) not in ids]
+                return FakeResult([copy.deepcopy(r) for r in matched])
+            for column, desc in reversed(self._order):
+                matched.sort(key=lambda r: (r.get(column) is None, r.get(column) or ""), reverse=desc)
+            if self._limit is not None:
+                matched = matched[: self._limit]
+            return FakeResult([self._project(r) for r in matched])
+
+
+class FakeSupabase:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0) -> None:
+        self.tables: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.lock = threading.RLock()
+        self.calls: list[tuple[str, str]] = []
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def before_execute(self, table: str, op: str) -> None:
+        self.calls.append((table, op))
+        delay_ms = self.latency_ms + (random.uniform(0.0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+    def with_defaults(self, table: str, values: dict[str, Any]) -> dict[str, Any]:
+        row = copy.deepcopy(values)
+        for col in _DEFAULTS.get(table, ()):
+            if col == "id":
+                row.setdefault("id", str(uuid.uuid4()))
+            else:
+                row.setdefault(col, now_iso())
+        return row
@@ -0,0 +1,126 @@
+"""Stress check for per-user execution lanes.
+
+    python -m benchmarks.lanes_stress [--users 50] [--rounds 4]
+
+Part 1 drives an async read-modify-write workload with a yield point between read and write:
+without lanes updates get lost, with lanes none do, and different users still overlap.
+Part 2 fires interleaved multi-turn conversations for many users through `/agent/run`
+against the in-memory Supabase stand-in and checks every user ends with exactly one draft
+holding the fields of their last turn.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from contextlib import nullcontext
+from typing import Any
+
+from app.clients.supabase import set_supabase_client
+from app.core.lanes import KeyedLanes
+from app.routers.agent_run import agent_run
+from app.schemas import AgentRunRequest
+from benchmarks.fake_supabase import FakeSupabase
+
+
+async def _rmw_workload(lanes: KeyedLanes | None, users: int, rounds: int) -> tuple[int, int, int]:
+    store: dict[str, list[int]] = {f"u{u}": [] for u in range(users)}
+    active: dict[str, int] = {}
+    peak_same_user = 0
+    peak_total = 0
+
+    async def turn(key: str, i: int) -> None:
+        nonlocal peak_same_user, peak_total
+        async with (lanes.hold(key) if lanes is not None else nullcontext()):
+            active[key] = active.get(key, 0) + 1
+            peak_same_user = max(peak_same_user, active[key])
+            peak_total = max(peak_total, sum(active.values()))
+            current = list(store[key])
+            await asyncio.sleep(random.uniform(0, 0.002))
+            store[key] = current + [i]
+            active[key] -= 1
+
+    tasks = [turn(f"u{u}", i) for i in range(rounds) for u in range(users)]
+    await asyncio.gather(*tasks)
+    lost = sum(rounds - len(v) for v in store.values())
+    return lost, peak_same_user, peak_total
+
+
+def _conversation(n: int) -> list[str]:
+    price = 20000 + n
+    return [
+        f"iPhone 13 128GB satıyorum {price} TL",
+        "Elektronik",
+        f"{price + 500} TL",
+        "konum: Kadıköy",
+    ]
+
+
+async def _agent_workload(users: int) -> tuple[FakeSupabase, float, list[str]]:
+    fake = FakeSupabase()
+    set_supabase_client(fake)  # type: ignore[arg-type]
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    for uid in user_ids:
+        fake.tables["profiles"].append({"id": uid, "phone": "+90 555 000 00 00", "display_name": "Test"})
+
+    async def converse(idx: int, uid: str) -> None:
+        for msg in _conversation(idx):
+            payload = AgentRunRequest(user_id=uid, message=msg)
+            # Fire-and-forget style arrival: each turn is its own task, like separate webhook calls.
+            await asyncio.sleep(random.uniform(0, 0.001))
+            pending.append(asyncio.ensure_future(agent_run(payload, None)))  # type: ignore[arg-type]
+
+    pending: list[asyncio.Future[Any]] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(converse(i, uid) for i, uid in enumerate(user_ids)))
+    await asyncio.gather(*pending)
+    return fake, time.perf_counter() - started, user_ids
+
+
+def _check_drafts(fake: FakeSupabase, user_ids: list[str]) -> list[str]:
+    problems: list[str] = []
+    for idx, uid in enumerate(user_ids):
+        drafts = [d for d in fake.tables["active_drafts"] if d.get("user_id") == uid]
+        if len(drafts) != 1:
+            problems.append(f"{uid}: {len(drafts)} drafts")
+            continue
+        data = drafts[0].get("listing_data") or {}
+        expected_price = float(20000 + idx + 500)
+        if data.get("price") != expected_price:
+            problems.append(f"{uid}: price {data.get('price')} != {expected_price}")
+        if not data.get("title") or data.get("category") != "Elektronik" or data.get("location") != "Kadıköy, İstanbul":
+            problems.append(f"{uid}: incomplete {data}")
+    return problems
+
+
+async def run(users: int, rounds: int) -> int:
+    lost, same, total = await _rmw_workload(None, users, rounds)
+    print(f"rmw without lanes  lost_updates={lost:5d} peak_same_user={same} peak_concurrency={total}")
+    lost, same, total = await _rmw_workload(KeyedLanes(), users, rounds)
+    print(f"rmw with lanes     lost_updates={lost:5d} peak_same_user={same} peak_concurrency={total}")
+    failed = lost != 0 or same != 1 or total < 2
+
+    fake, elapsed, user_ids = await _agent_workload(users)
+    problems = _check_drafts(fake, user_ids)
+    turns = users * len(_conversation(0))
+    print(f"agent turns        {turns} in {elapsed * 1000:.0f} ms, draft problems={len(problems)}")
+    for p in problems[:10]:
+        print("  ", p)
+    return 1 if failed or problems else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=4)
+    args = parser.parse_args()
+    code = asyncio.run(run(args.users, args.rounds))
+    print("ok" if code == 0 else "FAILED")
+    raise SystemExit(code)
+
+
+if __name__ == "__main__":
+    main()
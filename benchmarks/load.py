@@ -0,0 +1,255 @@
+"""End-to-end load harness for `/agent/run`.
+
+    python -m benchmarks.load --conversations 400 --concurrency 32 --db-latency-ms 8 --openai-latency-ms 400
+    python -m benchmarks.load --url http://127.0.0.1:8000 --conversations 100   # against a running server
+
+By default everything runs in-process: the app is driven through an ASGI transport, Supabase
+is replaced by `benchmarks.fake_supabase` (seeded with active listings) and OpenAI by
+`benchmarks.openai_stub` on a local port, both with configurable latency. Virtual users replay
+scripted multi-turn conversations (create → collect → preview → publish, and search flows);
+the report lists throughput and latency percentiles per resolved intent. Any failed turn
+(HTTP error or exception) makes the run exit non-zero: the flows did not run as scripted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Any
+
+import httpx
+
+from benchmarks import openai_stub
+from benchmarks._serve import serve_in_thread
+from benchmarks.corpus import CITIES, DISTRICTS, build_corpus
+
+
+def sell_message(listing: dict[str, Any]) -> str:
+    """The opening sell turn: title, price and an explicit `kategori:` so the parser collects all three."""
+    return f"{listing['title']} satıyorum {listing['price']} TL kategori: {listing['category']}"
+
+
+def collectable(listing: dict[str, Any]) -> bool:
+    """Whether `sell_message` yields a create turn with title, price and the listing's category.
+
+    Some corpus listings do not (8-digit prices, titles containing a search verb); virtual users
+    only sell the ones that do, so every sell conversation can reach publish.
+    """
+    from app.core.helpers import detect_intent
+    from app.services.parsing import extract_simple_fields
+
+    text = sell_message(listing)
+    fields = extract_simple_fields(text)
+    return (
+        detect_intent(text)[0] == "CREATE_LISTING"
+        and bool(fields.get("title"))
+        and fields.get("price") is not None
+        and fields.get("category") == listing["category"]
+    )
+
+
+def sell_script(rng: random.Random, listing: dict[str, Any]) -> list[str]:
+    """create → collect → preview → publish, phrased the way the draft flow collects each turn.
+
+    A bare category or price turn would be routed to search or a clarify question, so the
+    create turn carries them; the location comes as `konum:`, and the answer to the
+    description question restates it with a neighbourhood (as in `query_budget`), which
+    moves the draft to the preview.
+    """
+    district = rng.choice(DISTRICTS)
+    return [
+        "merhaba",
+        sell_message(listing),
+        f"konum: {district}",
+        f"konum: {district} merkez",
+        "onaylıyorum",
+    ]
+
+
+def search_script(rng: random.Random, query: str) -> list[str]:
+    turns = [rng.choice(["selam", "merhaba", "iyi günler"]), query]
+    if rng.random() < 0.5:
+        turns.append(rng.choice(CITIES))
+    if rng.random() < 0.3:
+        turns.append(f"{rng.choice(['iphone', 'bisiklet', 'daire', 'golf'])} var mı")
+    return turns
+
+
+def build_conversations(n: int, search_ratio: float, seed: int) -> list[list[str]]:
+    rng = random.Random(seed)
+    corpus = build_corpus(max(200, n * 2), seed)
+    sellable = [listing for listing in corpus.listings if collectable(listing)]
+    conversations: list[list[str]] = []
+    for i in range(n):
+        if rng.random() < search_ratio and corpus.queries:
+            conversations.append(search_script(rng, rng.choice(corpus.queries)))
+        else:
+            conversations.append(sell_script(rng, rng.choice(sellable)))
+    return conversations
+
+
+def seed_listings(fake: Any, count: int, seed: int) -> None:
+    from app.services.gazetteer import location_codes
+
+    rng = random.Random(seed + 1)
+    corpus = build_corpus(count * 3, seed + 1)
+    for data in corpus.listings[:count]:
+        location = data.get("location") or rng.choice(CITIES)
+        province_code, district_code = location_codes(location)
+        fake.tables["listings"].append(
+            fake.with_defaults(
+                "listings",
+                {
+                    "user_id": str(uuid.uuid4()),
+                    "title": data["title"],
+                    "description": data.get("description_notes") or data["title"],
+                    "category": data["category"],
+                    "price": float(data["price"]),
+                    "condition": "used",
+                    "location": location,
+                    "province_code": province_code,
+                    "district_code": district_code,
+                    "images": [f"https://cdn.example.com/{uuid.uuid4()}.jpg"],
+                    "status": "active",
+                    "metadata": {"keywords_text": data["title"].lower()},
+                },
+            )
+        )
+
+
+def _pct(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def drive(client: httpx.AsyncClient, conversations: list[list[str]], concurrency: int) -> tuple[dict[str, list[float]], int, float]:
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors = 0
+    queue: asyncio.Queue[list[str]] = asyncio.Queue()
+    for conv in conversations:
+        queue.put_nowait(conv)
+
+    async def virtual_user() -> None:
+        nonlocal errors
+        while True:
+            try:
+                script = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            user_id = str(uuid.uuid4())
+            for message in script:
+                started = time.perf_counter()
+                try:
+                    resp = await client.post("/agent/run", json={"user_id": user_id, "message": message})
+                    intent = resp.json().get("intent", f"http_{resp.status_code}") if resp.status_code == 200 else f"http_{resp.status_code}"
+                except Exception:
+                    intent = "exception"
+                elapsed = (time.perf_counter() - started) * 1000.0
+                if intent.startswith("http_") or intent == "exception":
+                    errors += 1
+                latencies[intent].append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def report(latencies: dict[str, list[float]], errors: int, wall: float, conversations: int) -> int:
+    total = sum(len(v) for v in latencies.values())
+    print(f"\n{conversations} conversations, {total} turns in {wall:.2f} s → {total / wall:.1f} turns/s, errors={errors}")
+    print(f"{'intent':24s} {'n':>6s} {'mean':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}  (ms)")
+    everything: list[float] = []
+    for intent, values in sorted(latencies.items(), key=lambda kv: -len(kv[1])):
+        everything.extend(values)
+        print(
+            f"{intent:24s} {len(values):6d} {statistics.fmean(values):8.1f} {_pct(values, 50):8.1f} "
+            f"{_pct(values, 95):8.1f} {_pct(values, 99):8.1f} {max(values):8.1f}"
+        )
+    if everything:
+        print(
+            f"{'ALL':24s} {len(everything):6d} {statistics.fmean(everything):8.1f} {_pct(everything, 50):8.1f} "
+            f"{_pct(everything, 95):8.1f} {_pct(everything, 99):8.1f} {max(everything):8.1f}"
+        )
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="drive an already running server instead of the in-process app")
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--search-ratio", type=float, default=0.6)
+    parser.add_argument("--listings", type=int, default=2000, help="seeded listings (in-process mode)")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--db-jitter-ms", type=float, default=3.0)
+    parser.add_argument("--openai-latency-ms", type=float, default=300.0)
+    parser.add_argument("--openai-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--draft-store", choices=["supabase", "local"], default="supabase")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.url:
+        conversations = build_conversations(args.conversations, args.search_ratio, args.seed)
+
+        async def remote() -> int:
+            async with httpx.AsyncClient(base_url=args.url, timeout=60.0) as client:
+                return report(*await drive(client, conversations, args.concurrency), len(conversations))
+
+        check_errors(asyncio.run(remote()))
+        return
+
+    stub_url, stop_stub = serve_in_thread(openai_stub.app)
+    openai_stub.configure(
+        latency_ms=args.openai_latency_ms, jitter_ms=args.openai_jitter_ms, error_rate=args.openai_error_rate
+    )
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"{stub_url}/v1",
+            "RATE_LIMIT_ENABLED": "false",
+            "DRAFT_STORE": args.draft_store,
+            "DRAFT_STORE_PATH": os.path.join(tempfile.mkdtemp(prefix="pg-load-"), "drafts.sqlite3"),
+        }
+    )
+
+    from app.clients.supabase import set_supabase_client
+    from benchmarks.fake_supabase import FakeSupabase
+    from main import app
+
+    conversations = build_conversations(args.conversations, args.search_ratio, args.seed)
+
+    fake = FakeSupabase(latency_ms=args.db_latency_ms, jitter_ms=args.db_jitter_ms)
+    seed_listings(fake, args.listings, args.seed)
+    set_supabase_client(fake)
+
+    async def local() -> int:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://agent.local", timeout=60.0) as client:
+            return report(*await drive(client, conversations, args.concurrency), len(conversations))
+
+    try:
+        errors = asyncio.run(local())
+    finally:
+        stop_stub()
+    print(f"supabase calls: {len(fake.calls)}, openai requests: {openai_stub.stats['requests']}")
+    check_errors(errors)
+
+
+def check_errors(errors: int) -> None:
+    """Failed turns mean the scripted flows broke, so the latency numbers above describe a different run."""
+    if errors:
+        print(f"\n!!! {errors} turns failed (HTTP errors or exceptions); the run is not a valid measurement !!!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Exercise the OpenAI breaker, retries and hedging against the local stub.
+
+    python -m benchmarks.openai_resilience
+
+Each scenario asserts the expected behaviour and prints timings; exit code is non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from benchmarks import openai_stub
+from benchmarks._serve import serve_in_thread
+
+
+async def _timed(coro) -> tuple[float, object]:
+    started = time.perf_counter()
+    try:
+        result: object = await coro
+    except Exception as exc:  # noqa: BLE001 - scenarios inspect the error type
+        result = exc
+    return (time.perf_counter() - started) * 1000.0, result
+
+
+async def run() -> None:
+    from app.clients import openai as oa
+    from app.services.metadata_keywords import generate_listing_keywords
+
+    # 1) Healthy: fills the latency window used by hedging.
+    openai_stub.configure(latency_ms=20, jitter_ms=10)
+    for _ in range(30):
+        await oa.openai_chat("sys", "merhaba")
+    ms, res = await _timed(oa.openai_chat("sys", "merhaba"))
+    assert isinstance(res, str), res
+    print(f"healthy              {ms:7.1f} ms  breaker={oa.breaker.state}")
+
+    # 2) Transient 503s are retried with jitter and succeed.
+    openai_stub.configure(latency_ms=5, fail_next=2)
+    ms, res = await _timed(oa.openai_chat("sys", "merhaba"))
+    assert isinstance(res, str), res
+    assert openai_stub.stats["requests"] == 3, openai_stub.stats
+    print(f"retry 2x503          {ms:7.1f} ms  attempts={openai_stub.stats['requests']}")
+
+    # 3) 429 with Retry-After is honoured.
+    openai_stub.configure(latency_ms=5, fail_next=1, error_status=429, retry_after=0.2)
+    ms, res = await _timed(oa.openai_chat("sys", "merhaba"))
+    assert isinstance(res, str) and ms >= 200, (ms, res)
+    print(f"retry 429+RA         {ms:7.1f} ms")
+
+    # 4) Outage: breaker opens, then calls fail instantly without touching the network.
+    openai_stub.configure(latency_ms=5, error_rate=1.0)
+    while oa.breaker.state != "open":
+        await _timed(oa.openai_chat("sys", "merhaba"))
+    seen = openai_stub.stats["requests"]
+    ms, res = await _timed(oa.openai_chat("sys", "merhaba"))
+    assert isinstance(res, oa.OpenAIUnavailable), res
+    assert openai_stub.stats["requests"] == seen
+    assert not oa.openai_available()
+    print(f"open (rejected)      {ms:7.3f} ms  upstream_requests={seen}")
+
+    # Keyword generation degrades to the deterministic baseline instantly.
+    started = time.perf_counter()
+    kw = await generate_listing_keywords(
+        title="iPhone 13 128GB", category="Elektronik", llm_generate=oa.openai_chat if oa.openai_available() else None
+    )
+    ms = (time.perf_counter() - started) * 1000.0
+    assert kw["keywords"] and "stub" not in kw["keywords"], kw
+    print(f"keywords (open)      {ms:7.3f} ms  {kw['keywords_text']}")
+
+    # 5) Half-open: a probe cancelled by the caller hands its slot back...
+    openai_stub.configure(latency_ms=2000)
+    await asyncio.sleep(oa.breaker.reset_timeout + 0.05)
+    assert oa.breaker.state == "half_open"
+    ms, res = await _timed(asyncio.wait_for(oa.openai_chat("sys", "merhaba"), timeout=0.1))
+    assert isinstance(res, TimeoutError), res
+    assert oa.breaker.state == "half_open" and oa.breaker._probes == 0, (oa.breaker.state, oa.breaker._probes)
+    print(f"half-open cancelled  {ms:7.1f} ms  breaker={oa.breaker.state} probes={oa.breaker._probes}")
+
+    # ...and the next probe goes through and closes the breaker.
+    openai_stub.configure(latency_ms=5)
+    ms, res = await _timed(oa.openai_chat("sys", "merhaba"))
+    assert isinstance(res, str) and oa.breaker.state == "closed", (res, oa.breaker.state)
+    print(f"half-open probe      {ms:7.1f} ms  breaker={oa.breaker.state}")
+
+    # 6) Hedging: every other upstream request stalls for 1.5 s; the hedge caps the tail near p90 + base latency.
+    openai_stub.configure(latency_ms=20, slow_every=2, slow_ms=1500)
+    worst = 0.0
+    for _ in range(10):
+        ms, res = await _timed(oa.openai_chat("sys", "merhaba"))
+        assert isinstance(res, str), res
+        worst = max(worst, ms)
+    assert worst < 1500, worst
+    print(f"hedged worst of 10   {worst:7.1f} ms  upstream_requests={openai_stub.stats['requests']}")
+
+    await oa.aclose_openai()
+
+
+def main() -> None:
+    base_url, stop = serve_in_thread(openai_stub.app)
+    os.environ.update(
+        {
+            "OPENAI_BASE_URL": f"{base_url}/v1",
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BREAKER_FAILURES": "3",
+            "OPENAI_BREAKER_RESET_S": "0.5",
+            "OPENAI_RETRY_BASE_S": "0.01",
+            "OPENAI_RETRY_CAP_S": "0.05",
+            "OPENAI_HEDGE_PERCENTILE": "90",
+        }
+    )
+    try:
+        asyncio.run(run())
+    finally:
+        stop()
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
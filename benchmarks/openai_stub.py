@@ -0,0 +1,123 @@
+"""Local OpenAI chat-completions stand-in with latency and error injection.
+
+Run standalone:
+    uvicorn benchmarks.openai_stub:app --port 8900
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 OPENAI_API_KEY=stub uvicorn main:app
+
+Behaviour is changed at runtime with `POST /_control` (any subset of the fields below)
+and inspected with `GET /_control`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULTS: dict[str, Any] = {
+    "latency_ms": 20.0,  # base latency of every request
+    "jitter_ms": 0.0,  # uniform extra latency
+    "slow_ratio": 0.0,  # share of requests that take `slow_ms` instead
+    "slow_every": 0,  # every Nth request (1st, N+1th, ...) takes `slow_ms`
+    "slow_ms": 2000.0,
+    "error_rate": 0.0,  # share of requests that fail with `error_status`
+    "error_status": 503,
+    "fail_next": 0,  # fail exactly this many upcoming requests, then recover
+    "retry_after": None,  # Retry-After header sent with 429 responses
+    "reply": '{"keywords": ["stub", "ilan"]}',
+    # Requests with an image_url part get a vision answer: the first `vision_by_url` key
+    # contained in the image URL wins, otherwise `vision_reply`.
+    "vision_reply": '{"brand": "Apple", "model": "iPhone 13", "color": "Mavi", "condition": "İyi"}',
+    "vision_by_url": {},
+}
+
+state: dict[str, Any] = dict(DEFAULTS)
+stats: dict[str, int] = {"requests": 0, "errors": 0, "vision_requests": 0, "active": 0, "max_active": 0}
+
+app = FastAPI(title="openai-stub")
+
+
+def configure(**overrides: Any) -> None:
+    state.clear()
+    state.update(DEFAULTS)
+    state.update(overrides)
+    for key in stats:
+        stats[key] = 0
+
+
+@app.get("/_control")
+async def get_control() -> dict[str, Any]:
+    return {"state": state, "stats": stats}
+
+
+@app.post("/_control")
+async def set_control(request: Request) -> dict[str, Any]:
+    body = await request.json()
+    if body.pop("reset", False):
+        configure()
+    state.update({k: v for k, v in body.items() if k in DEFAULTS})
+    return {"state": state, "stats": stats}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request) -> JSONResponse:
+    payload = await request.json()
+    stats["requests"] += 1
+    stats["active"] += 1
+    stats["max_active"] = max(stats["max_active"], stats["active"])
+    try:
+        return await _complete(payload)
+    finally:
+        stats["active"] -= 1
+
+
+@app.get("/v1/models")
+async def models() -> dict[str, Any]:
+    # Readiness probes (app/core/readiness.py) hit this; not counted as a completion request.
+    return {"object": "list", "data": [{"id": "stub", "object": "model"}]}
+
+
+def _image_url(payload: dict[str, Any]) -> str | None:
+    for message in payload.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "image_url":
+                    return str((part.get("image_url") or {}).get("url") or "")
+    return None
+
+
+async def _complete(payload: dict[str, Any]) -> JSONResponse:
+    slow_every = int(state["slow_every"])
+    if random.random() < float(state["slow_ratio"]) or (slow_every and (stats["requests"] - 1) % slow_every == 0):
+        delay_ms = float(state["slow_ms"])
+    else:
+        delay_ms = float(state["latency_ms"]) + random.uniform(0.0, float(state["jitter_ms"]))
+    await asyncio.sleep(delay_ms / 1000.0)
+
+    failing = state["fail_next"] > 0 or random.random() < float(state["error_rate"])
+    if failing:
+        if state["fail_next"] > 0:
+            state["fail_next"] -= 1
+        stats["errors"] += 1
+        status = int(state["error_status"])
+        headers = {"Retry-After": str(state["retry_after"])} if status == 429 and state["retry_after"] is not None else None
+        return JSONResponse({"error": {"message": "injected failure"}}, status_code=status, headers=headers)
+
+    reply = state["reply"]
+    image_url = _image_url(payload)
+    if image_url is not None:
+        stats["vision_requests"] += 1
+        reply = next((r for key, r in state["vision_by_url"].items() if key in image_url), state["vision_reply"])
+
+    return JSONResponse(
+        {
+            "id": f"chatcmpl-stub-{stats['requests']}",
+            "object": "chat.completion",
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+        }
+    )
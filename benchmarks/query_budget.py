@@ -0,0 +1,105 @@
+"""Per-scenario Supabase query budgets (N+1 regression gate).
+
+    python -m benchmarks.query_budget
+
+Runs scripted turns through `/agent/run` against the in-memory Supabase stand-in and fails
+if any turn issues more queries than its budget. Lower a budget when a change removes
+queries; raising one should be a deliberate, reviewed decision.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from app.clients.supabase import set_supabase_client
+from app.core.ratelimit import TokenBucketLimiter
+from app.core.request_stats import RequestStats, track_request
+from app.routers import agent_run as agent_run_module
+from app.routers.agent_run import agent_run
+from app.schemas import AgentRunRequest
+from benchmarks.fake_supabase import FakeSupabase
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def max_queries(limit: int, label: str = "") -> Iterator[RequestStats]:
+    """Assert that the enclosed code issues at most `limit` Supabase queries."""
+    with track_request() as stats:
+        yield stats
+    if stats.query_count > limit:
+        detail = ", ".join(f"{t}.{op}" for t, op, _ in stats.queries)
+        raise QueryBudgetExceeded(f"{label or 'block'}: {stats.query_count} queries > budget {limit} ({detail})")
+
+
+# (label, message, budget) — one user, in order; the draft carries over between turns.
+SCENARIO: list[tuple[str, str, int]] = [
+    ("small_talk", "selam", 2),
+    ("search", "iphone arıyorum", 3),
+    ("search_fallback", "bisiklet arıyorum", 5),
+    ("draft_collect", "iPhone 13 128GB satıyorum 25000 TL", 8),
+    ("description_collect", "konum: Kadıköy", 9),
+    ("draft_preview", "konum: Kadıköy Moda", 9),
+    ("publish", "onaylıyorum", 8),
+    ("cancel", "iptal", 3),
+]
+
+
+def _seed(fake: FakeSupabase, user_id: str) -> None:
+    fake.tables["profiles"].append({"id": user_id, "phone": None, "display_name": "Ayşe", "credits": 100})
+    fake.tables["listings"].append(
+        {
+            "id": str(uuid.uuid4()),
+            "title": "iPhone 12 64GB",
+            "description": "temiz",
+            "price": 18000.0,
+            "location": "İstanbul",
+            "province_code": 34,
+            "district_code": None,
+            "category": "Elektronik",
+            "condition": "used",
+            "images": [],
+            "status": "active",
+            "metadata": {"keywords_text": "telefon iphone"},
+            "created_at": "2026-01-01T00:00:00+00:00",
+        }
+    )
+
+
+async def run() -> int:
+    fake = FakeSupabase()
+    set_supabase_client(fake)
+    # The scripted turns arrive back to back; budgets are about queries, not rate limits.
+    agent_run_module.rate_limiter = TokenBucketLimiter(capacity=1e9, refill_per_s=1e9)
+    user_id = str(uuid.uuid4())
+    _seed(fake, user_id)
+
+    failures = 0
+    for label, message, budget in SCENARIO:
+        payload = AgentRunRequest(user_id=user_id, message=message)
+        result: dict[str, Any] = {}
+        try:
+            with max_queries(budget, label) as stats:
+                result = await agent_run(payload, None)  # type: ignore[arg-type]
+            status = "ok"
+        except QueryBudgetExceeded as exc:
+            failures += 1
+            status = f"OVER: {exc}"
+        tables = ", ".join(f"{t}×{n}" for t, (n, _) in sorted(stats.by_table().items()))
+        print(f"{label:20s} {stats.query_count:2d}/{budget:<2d} {result.get('intent', '-'):22s} {tables}  {status}")
+    return failures
+
+
+def main() -> None:
+    failures = asyncio.run(run())
+    print("ok" if not failures else f"FAILED ({failures})")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Listing reindex backfill (app/maintenance/reindex.py) against the in-memory Supabase.
+
+    python -m benchmarks.reindex_backfill
+    python -m benchmarks.reindex_backfill --rows 20000 --workers 2
+
+Seeds listings with the keywords publish would have stored (deterministic plus one
+model-style extra), some stale keyword sets, some retired category names and some empty
+descriptions, then asserts: a dry run writes nothing and reports every change; the run
+keeps model keywords, puts no prices or phone numbers into keywords and does not revert a
+listing sold and repriced while it was running; a run that crashes half way resumes from
+its checkpoint and ends in the same state as an uninterrupted one without rereading
+finished pages; a second run writes nothing; seller descriptions survive `--descriptions`.
+Prints rows/s inline and with the process pool. Exit code is non-zero on failure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from app.maintenance.reindex import run_reindex
+from app.services.metadata_keywords import generate_listing_keywords_deterministic
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.load import seed_listings
+
+EXTRA_KEYWORD = "orijinal"  # stands in for a keyword the model added at publish
+
+
+class _EditingSupabase(FakeSupabase):
+    """Marks one listing sold and repriced just before the first listings write, as a seller would."""
+
+    def __init__(self, listing_id: str) -> None:
+        super().__init__()
+        self.listing_id = listing_id
+
+    def before_execute(self, table: str, op: str) -> None:
+        super().before_execute(table, op)
+        if table == "listings" and op == "upsert" and self.listing_id:
+            row = next(r for r in self.tables["listings"] if r["id"] == self.listing_id)
+            row.update(status="sold", price=1.0)
+            self.listing_id = ""
+
+
+class _CrashingSupabase(FakeSupabase):
+    """Fails the N-th listings upsert, as a killed job would stop mid-run."""
+
+    def __init__(self, crash_at: int) -> None:
+        super().__init__()
+        self.crash_at = crash_at
+        self.upserts = 0
+
+    def before_execute(self, table: str, op: str) -> None:
+        super().before_execute(table, op)
+        if table == "listings" and op == "upsert":
+            self.upserts += 1
+            if self.upserts == self.crash_at:
+                raise SystemExit("simulated crash")
+
+
+def _seed(fake: FakeSupabase, rows: int) -> None:
+    seed_listings(fake, rows, 11)
+    for i, row in enumerate(fake.tables["listings"]):
+        if i % 10 == 3:
+            row["category"] = "Eski Kategori"  # retired from the taxonomy
+        if i % 10 == 5:
+            row["description"] = ""
+        if i % 10 != 7:  # the rest keep the stale title-only keywords
+            base = generate_listing_keywords_deterministic(
+                title=row["title"], category=row["category"], description=row["description"], condition=row["condition"]
+            )["keywords"]
+            keywords = [*base, EXTRA_KEYWORD][:12]  # publish: base first, model extras while under the cap
+            row["metadata"] = {"keywords": keywords, "keywords_text": " ".join(keywords)}
+
+
+def _copy(source: FakeSupabase, target: FakeSupabase) -> FakeSupabase:
+    target.tables["listings"] = copy.deepcopy(source.tables["listings"])
+    return target
+
+
+def _selects(fake: FakeSupabase) -> int:
+    return sum(1 for table, op in fake.calls if table == "listings" and op == "select")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=250)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    pages = -(-args.rows // args.batch_size)
+
+    seeded = FakeSupabase()
+    _seed(seeded, args.rows)
+    retired = sum(1 for row in seeded.tables["listings"] if row["category"] == "Eski Kategori")
+
+    # 1) Dry run: every change reported, nothing written.
+    fake = _copy(seeded, FakeSupabase())
+    before = copy.deepcopy(fake.tables["listings"])
+    diffs: list[dict[str, Any]] = []
+    dry = run_reindex(fake, batch_size=args.batch_size, dry_run=True, on_diff=diffs.append)
+    assert fake.tables["listings"] == before, "dry run modified rows"
+    assert not any(op in ("upsert", "update") for _, op in fake.calls), fake.calls[-3:]
+    assert dry["scanned"] == args.rows and dry["changed"] == len(diffs) > 0, dry
+    # Retired names are reclassified from the title; unclassifiable ones keep their name.
+    assert 0 < dry["category"] <= retired, (dry, retired)
+    print(
+        f"dry run              changed={dry['changed']} category={dry['category']}/{retired} retired "
+        f"keywords={dry['keywords']}"
+    )
+    print(f"  e.g. {diffs[0]}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 2) Reference: one uninterrupted run.
+        reference = _copy(seeded, FakeSupabase())
+        started = time.perf_counter()
+        full = run_reindex(reference, batch_size=args.batch_size, checkpoint=Path(tmp) / "ref.json")
+        inline_s = time.perf_counter() - started
+        # One upsert per page and set of changed columns ({metadata}, {category, metadata}, ...).
+        assert full["written"] == dry["changed"] and full["upserts"] <= 3 * pages, full
+        kept = sum(EXTRA_KEYWORD in (r["metadata"].get("keywords") or []) for r in reference.tables["listings"])
+        seeded_extra = sum(EXTRA_KEYWORD in (r["metadata"].get("keywords") or []) for r in seeded.tables["listings"])
+        assert kept >= seeded_extra, (kept, seeded_extra)
+        numbers = [
+            r["id"] for r in reference.tables["listings"] if re.search(r"\b\d{4,}\b", r["metadata"].get("keywords_text") or "")
+        ]
+        assert not numbers, numbers[:3]
+        print(f"keywords             model keyword kept on {kept}/{seeded_extra} rows, no prices or phone numbers")
+
+        # 2b) A listing sold and repriced while the job runs keeps that edit.
+        target = next(r for r in seeded.tables["listings"] if r["category"] == "Eski Kategori")
+        editing = _copy(seeded, _EditingSupabase(str(target["id"])))
+        run_reindex(editing, batch_size=args.batch_size)
+        edited = next(r for r in editing.tables["listings"] if r["id"] == target["id"])
+        assert edited["status"] == "sold" and edited["price"] == 1.0, edited
+        print("concurrent edit      sold + repriced during the run, kept")
+
+        # 3) Crash after a few pages, then resume from the checkpoint.
+        checkpoint = Path(tmp) / "crash.json"
+        crashing = _copy(seeded, _CrashingSupabase(crash_at=4))
+        try:
+            run_reindex(crashing, batch_size=args.batch_size, checkpoint=checkpoint)
+            raise AssertionError("expected the simulated crash")
+        except SystemExit:
+            pass
+        first_selects = _selects(crashing)
+        done_id = json.loads(checkpoint.read_text())["last_id"]
+        done_pages = sum(1 for r in seeded.tables["listings"] if str(r["id"]) <= done_id) // args.batch_size
+        crashing.crash_at = 0
+        crashing.calls.clear()
+        resumed = run_reindex(crashing, batch_size=args.batch_size, checkpoint=checkpoint)
+        assert crashing.tables["listings"] == reference.tables["listings"], "resumed run diverged"
+        # Rows of the page cut short that were already written are up to date when it is re-read.
+        assert resumed["scanned"] == args.rows and resumed["written"] <= full["written"], resumed
+        # Pages written and checkpointed before the crash are not read again.
+        assert done_pages >= 1 and _selects(crashing) <= pages - done_pages + 1, (done_pages, _selects(crashing))
+        print(f"crash + resume       pages read {first_selects} + {_selects(crashing)} of {pages}, same end state")
+
+        # 4) Nothing left to do.
+        again = run_reindex(reference, batch_size=args.batch_size, checkpoint=Path(tmp) / "ref.json")
+        assert again["changed"] == 0 and again["upserts"] == 0, again
+        print(f"second run           scanned={again['scanned']} changed=0 upserts=0")
+
+        # 5) Descriptions: empty ones are composed, seller text is kept.
+        with_desc = run_reindex(reference, batch_size=args.batch_size, descriptions=True)
+        rows = reference.tables["listings"]
+        originals = {row["id"]: row["description"] for row in seeded.tables["listings"]}
+        assert with_desc["description"] == sum(1 for d in originals.values() if not d), with_desc
+        for row in rows:
+            if originals[row["id"]]:
+                assert row["description"] == originals[row["id"]], row["id"]
+            else:
+                assert row["description"].endswith("Doğru alıcı için iyi bir seçenek."), row["description"]
+                assert "description_inputs" in row["metadata"], row["metadata"]
+        print(f"descriptions         composed={with_desc['description']} seller texts untouched")
+
+        # 6) Throughput.
+        pooled = _copy(seeded, FakeSupabase())
+        started = time.perf_counter()
+        pooled_stats = run_reindex(pooled, batch_size=args.batch_size, workers=args.workers)
+        pooled_s = time.perf_counter() - started
+        assert pooled_stats["written"] == full["written"], pooled_stats
+        print(
+            f"throughput           inline {args.rows / inline_s:8.0f} rows/s, "
+            f"{args.workers} workers {args.rows / pooled_s:8.0f} rows/s"
+        )
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Import-time profile of the service entrypoint.
+
+    python -m benchmarks.startup_profile                 # top modules + per-package totals
+    python -m benchmarks.startup_profile --top 40 --module main
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter (so nothing is cached in
+this process) and aggregates the report. It also fails when a package that must be loaded
+lazily (`--forbid`, default: the Supabase SDK, httpx, python-dotenv, openai) shows up in the
+startup import graph.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LAZY_PACKAGES = ("supabase", "postgrest", "gotrue", "realtime", "storage3", "httpx", "dotenv", "openai")
+
+
+def profile(module: str, runs: int) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) rows of the fastest of `runs` imports."""
+    best: list[tuple[str, int, int]] = []
+    best_total = None
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "0"}
+    for _ in range(runs + 1):  # the first run only warms the .pyc cache
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        rows: list[tuple[str, int, int]] = []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+            rows.append((name, int(self_us), int(cumulative_us)))
+        top = next((cum for name, _, cum in rows if name == module), None)
+        if top is not None and (best_total is None or top < best_total):
+            best, best_total = rows, top
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--forbid", default=",".join(LAZY_PACKAGES), help="comma separated; empty disables")
+    args = parser.parse_args()
+
+    rows = profile(args.module, args.runs)
+    total = next(cum for name, _, cum in rows if name == args.module)
+
+    print(f"import {args.module}: {total / 1000:.1f} ms (fastest of {args.runs})\n")
+    print(f"{'module':48s} {'self ms':>9s} {'cum ms':>9s}")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[: args.top]:
+        print(f"{name:48s} {self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}")
+
+    per_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        per_package[name.split(".")[0]] += self_us
+    print(f"\n{'package (self time summed)':48s} {'ms':>9s} {'share':>7s}")
+    for package, self_us in sorted(per_package.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"{package:48s} {self_us / 1000:9.1f} {self_us / total:7.1%}")
+
+    forbidden = {p.strip() for p in args.forbid.split(",") if p.strip()}
+    leaked = sorted(forbidden & set(per_package))
+    if leaked:
+        print(f"\nimported at startup but expected to be lazy: {', '.join(leaked)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
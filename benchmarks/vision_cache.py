@@ -0,0 +1,168 @@
+"""Vision fan-out and perceptual-hash cache against the local OpenAI stub.
+
+    python -m benchmarks.vision_cache
+
+Each scenario asserts the expected behaviour and prints timings; exit code is non-zero on
+failure. Media entries are synthetic (URL + dHash), as `ingest_media` would store them,
+except the perceptual-hit scenario, which hashes a real JPEG and a resized, re-encoded copy
+with `media.analyze` (skipped with a note when Pillow is not installed).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+import time
+import uuid
+from typing import Any
+
+from benchmarks import openai_stub
+from benchmarks._serve import serve_in_thread
+
+
+def _media(n: int, seed: int) -> list[dict[str, Any]]:
+    # Unrelated photos: pseudo-random dHashes (about 32 bits apart from each other).
+    return [
+        {"url": f"https://cdn.example.com/{seed}/{i}.jpg", "dhash": hashlib.sha256(f"{seed}/{i}".encode()).hexdigest()[:16]}
+        for i in range(n)
+    ]
+
+
+def _photo_pair() -> tuple[bytes, bytes]:
+    """A synthetic product photo as JPEG, and the same photo downscaled and re-encoded at lower quality."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (360, 240))
+    draw = ImageDraw.Draw(image)
+    for i, level in enumerate((30, 200, 90, 250, 10, 160, 60, 220, 120)):
+        draw.rectangle([i * 40, 0, i * 40 + 39, 239], fill=(level, level, max(0, level - 20)))
+    draw.ellipse([100, 60, 260, 200], fill=(235, 225, 40))
+    original, copy = io.BytesIO(), io.BytesIO()
+    image.save(original, "JPEG", quality=92)
+    image.resize((240, 160)).save(copy, "JPEG", quality=55)
+    return original.getvalue(), copy.getvalue()
+
+
+async def _timed(coro: Any) -> tuple[float, Any]:
+    started = time.perf_counter()
+    result = await coro
+    return (time.perf_counter() - started) * 1000.0, result
+
+
+async def run() -> None:
+    from app.clients import openai as oa
+    from app.services import vision
+    from app.services.description_composer import compose_description
+
+    openai_stub.configure(latency_ms=0)
+    await asyncio.gather(*(oa.openai_chat("sys", "merhaba") for _ in range(4)))  # warm the connection pool
+
+    # 1) Fan-out: 4 new images at 100 ms each finish together, not one after another.
+    openai_stub.configure(latency_ms=100)
+    photos = _media(4, 1)
+    ms, merged = await _timed(vision.analyze_images(photos, concurrency=4))
+    assert openai_stub.stats["vision_requests"] == 4, openai_stub.stats
+    assert ms < 250, ms
+    assert merged["brand"] == "Apple" and merged["images_analyzed"] == 4, merged
+    print(f"fan-out 4 images     {ms:7.1f} ms  requests={openai_stub.stats['vision_requests']}")
+
+    # 2) Same photos again (another draft, re-upload): served from the cache.
+    openai_stub.configure(latency_ms=100)
+    ms, again = await _timed(vision.analyze_images(photos))
+    assert openai_stub.stats["vision_requests"] == 0 and again == merged, (openai_stub.stats, again)
+    print(f"cached 4 images      {ms:7.3f} ms  requests=0")
+
+    # 3) Re-encoded copy: dHash 3 bits away still hits.
+    near = [{"url": "https://cdn.example.com/reupload.jpg", "dhash": f"{int(photos[0]['dhash'], 16) ^ 0b1011:016x}"}]
+    ms, _ = await _timed(vision.analyze_images(near))
+    assert openai_stub.stats["vision_requests"] == 0, openai_stub.stats
+    print(f"near-duplicate hit   {ms:7.3f} ms  requests=0")
+
+    # 3b) The same through media.analyze: a real photo and its resized, re-encoded copy differ
+    # byte for byte (different sha256) but their dHashes are close enough to share the entry.
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("perceptual hit       skipped: Pillow not installed (keys fall back to sha256, only exact copies hit)")
+    else:
+        from app.config import MEDIA_DUP_DISTANCE
+        from app.services.media import analyze
+
+        original, copy = (analyze(data) for data in _photo_pair())
+        assert original["dhash"] and copy["dhash"] and original["sha256"] != copy["sha256"], (original, copy)
+        distance = (int(original["dhash"], 16) ^ int(copy["dhash"], 16)).bit_count()
+        assert distance <= MEDIA_DUP_DISTANCE, (distance, original["dhash"], copy["dhash"])
+        openai_stub.configure(latency_ms=20)
+        first = await vision.analyze_images([{"url": "https://cdn.example.com/photo.jpg", **original}])
+        assert openai_stub.stats["vision_requests"] == 1, openai_stub.stats
+        ms, second = await _timed(vision.analyze_images([{"url": "https://cdn.example.com/photo-small.jpg", **copy}]))
+        assert openai_stub.stats["vision_requests"] == 1 and second == first, (openai_stub.stats, second)
+        print(f"perceptual hit       {ms:7.3f} ms  requests=0  dHash distance={distance}")
+
+    # 4) Two requests for the same new photo at once share one model call.
+    openai_stub.configure(latency_ms=100)
+    shared = _media(1, 2)
+    await asyncio.gather(vision.analyze_images(shared), vision.analyze_images(list(shared)))
+    assert openai_stub.stats["vision_requests"] == 1, openai_stub.stats
+    print("concurrent same photo          requests=1")
+
+    # 5) Per-request cap: 6 images (VISION_MAX_IMAGES), 2 at a time -> 3 waves; extra images are skipped.
+    openai_stub.configure(latency_ms=50)
+    ms, _ = await _timed(vision.analyze_images(_media(8, 3), concurrency=2))
+    stats = openai_stub.stats
+    assert stats["vision_requests"] == 6 and stats["max_active"] <= 2 and ms >= 140, (stats, ms)
+    print(f"cap 2, 8 images      {ms:7.1f} ms  requests={stats['vision_requests']} max in flight={stats['max_active']}")
+
+    # 6) Merge: majority vote per field, failures and empty answers ignored.
+    openai_stub.configure(
+        latency_ms=5,
+        vision_by_url={
+            "/4/0": '{"brand": "Samsung", "color": "Siyah"}',
+            "/4/1": '{"brand": "samsung", "model": "Galaxy S21", "color": "Gri"}',
+            "/4/2": '{"brand": "Apple", "color": "Siyah", "condition": "Çok iyi"}',
+            "/4/3": "not json",
+        },
+    )
+    merged = await vision.analyze_images(_media(4, 4))
+    assert merged == {
+        "brand": "Samsung",
+        "model": "Galaxy S21",
+        "color": "Siyah",
+        "condition": "Çok iyi",
+        "images_analyzed": 3,
+    }, merged
+    print(f"merged               {merged}")
+
+    # 7) Draft: attach_vision stores the merged dict where the description composer reads it.
+    from app.clients.supabase import set_supabase_client
+    from app.services.drafts import get_or_create_draft, store_media
+    from benchmarks.fake_supabase import FakeSupabase
+
+    supabase = FakeSupabase()
+    set_supabase_client(supabase)
+    draft = get_or_create_draft(supabase, str(uuid.uuid4()))
+    draft = store_media(supabase, draft["id"], _media(4, 4))
+    draft = await vision.attach_vision(supabase, draft["id"], draft)
+    assert draft["vision"]["brand"] == "Samsung", draft
+    description = compose_description({"title": "Telefon", "category": "Elektronik"}, draft["vision"])
+    assert "Marka: Samsung" in description and "Görsellerdeki durum: Çok iyi" in description, description
+    print(f"draft vision         {draft['vision']}")
+    print(f"cache                entries={len(vision.cache)} hits={vision.cache.hits} misses={vision.cache.misses}")
+
+    await oa.aclose_openai()
+
+
+def main() -> None:
+    base_url, stop = serve_in_thread(openai_stub.app)
+    os.environ.update({"OPENAI_BASE_URL": f"{base_url}/v1", "OPENAI_API_KEY": "stub", "OPENAI_HEDGE_PERCENTILE": "0"})
+    try:
+        asyncio.run(run())
+    finally:
+        stop()
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
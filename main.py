@@ -6,25 +6,39 @@ from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import (
     APP_NAME,
+    CLASSIFY_API_TOKENS,
+    CLASSIFY_MAX_BYTES,
     CORS_ALLOW_CREDENTIALS,
     CORS_ALLOW_HEADERS,
     CORS_ALLOW_METHODS,
     CORS_ALLOW_ORIGINS,
+    ENABLE_DEBUG_ROUTES,
+    GZIP_MIN_BYTES,
+    IMPORT_API_TOKEN,
+    IMPORT_MAX_BYTES,
+    MAX_REQUEST_BYTES,
 )
+from app.core.body_limit import BodySizeLimitMiddleware
 from app.core.helpers import now_iso
+from app.core.readiness import lifespan
+from app.core.readiness import state as readiness
+from app.core.request_stats import ServerTimingMiddleware
 from app.routers.agent_run import router as agent_router
 from app.routers.webchat import router as webchat_router
-from app.routers.debug import router as debug_router
+from app.routers.metrics import router as metrics_router
 
 # Prioritize local package resolution when running via `uvicorn agent.main:app`.
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="PazarGlobal Agent Backend")
+    # orjson renders dict responses several times faster than the stdlib encoder.
+    app = FastAPI(title="PazarGlobal Agent Backend", default_response_class=ORJSONResponse, lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -32,15 +46,42 @@ def create_app() -> FastAPI:
         allow_credentials=CORS_ALLOW_CREDENTIALS,
         allow_methods=CORS_ALLOW_METHODS,
         allow_headers=CORS_ALLOW_HEADERS,
+        expose_headers=["Server-Timing"],
+    )
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
+    app.add_middleware(ServerTimingMiddleware)
+    # Outermost: oversized bodies are refused before anything reads or parses them.
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        max_bytes=MAX_REQUEST_BYTES,
+        path_limits={"/listings/import": IMPORT_MAX_BYTES, "/classify/batch": CLASSIFY_MAX_BYTES},
     )
 
     @app.get("/healthz")
     def healthz() -> dict[str, Any]:  # noqa: F841, reportUnusedFunction
         return {"ok": True, "service": APP_NAME, "time": now_iso()}
 
+    @app.get("/readyz")
+    def readyz() -> ORJSONResponse:  # noqa: F841, reportUnusedFunction
+        # Cached state only: warm-up and dependency probes run in the background (app/core/readiness.py).
+        report = readiness.report()
+        return ORJSONResponse(report, status_code=200 if report["ready"] else 503)
+
     app.include_router(webchat_router)
     app.include_router(agent_router)
-    app.include_router(debug_router)
+    if ENABLE_DEBUG_ROUTES:
+        from app.routers.debug import router as debug_router
+
+        app.include_router(debug_router)
+    if IMPORT_API_TOKEN:
+        from app.routers.imports import router as imports_router
+
+        app.include_router(imports_router)
+    if CLASSIFY_API_TOKENS:
+        from app.routers.classify import router as classify_router
+
+        app.include_router(classify_router)
+    app.include_router(metrics_router)
 
     return app
 